@@ -0,0 +1,478 @@
+"""Esquema inicial
+
+Crea el esquema completo de los modelos (tablas, índices y la vista
+account_logins) en una base vacía.
+
+En una base creada antes de Alembic (create_all al arrancar, el ALTER TABLE
+de app/main.py y los scripts migrate_*), crea solo las tablas que falten y
+completa lo que esos scripts hacían a mano: columnas agregadas después,
+el índice único de answers (borrando duplicados) y el índice de la serie
+temporal. Si crea user_survey_response_counts o las tablas de rollups de
+resultados en una base con respuestas, las llena (después de borrar las
+answers duplicadas), con el mismo recálculo que
+`python -m scripts.check_result_rollups --fix`.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial_schema"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+# Identificadores de login de las tres tablas de cuentas (una consulta en /auth/login)
+ACCOUNT_LOGINS_VIEW_SQL = """
+CREATE OR REPLACE VIEW account_logins AS
+    SELECT email AS login, 'email' AS login_kind, 'admin' AS account_type,
+           id, hashed_password, 1 AS priority
+    FROM admins
+    UNION ALL
+    SELECT email, 'email', 'client', id, hashed_password, 2
+    FROM clients
+    UNION ALL
+    SELECT email, 'email', 'user', id, hashed_password, 3
+    FROM users
+    UNION ALL
+    SELECT cuil, 'cuil', 'user', id, hashed_password, 1
+    FROM users
+"""
+
+# Respuestas completadas con grupo de edad, ciudad, barrio y mes, igual que
+# SurveyResultsAggregator.respondents_subquery. Copiado acá (y no importado de
+# app) para que la migración no cambie si cambia el código
+ROLLUP_RESPONDENTS_CTE = """
+WITH respondents AS (
+    SELECT r.id AS response_id, r.survey_id,
+           CASE
+               WHEN u.birth_date IS NULL THEN 'Sin especificar'
+               WHEN date_part('year', age(COALESCE(r.started_at, r.completed_at, current_date), u.birth_date)) < 18 THEN 'Menor de 18'
+               WHEN date_part('year', age(COALESCE(r.started_at, r.completed_at, current_date), u.birth_date)) < 31 THEN '18-30'
+               WHEN date_part('year', age(COALESCE(r.started_at, r.completed_at, current_date), u.birth_date)) < 46 THEN '31-45'
+               WHEN date_part('year', age(COALESCE(r.started_at, r.completed_at, current_date), u.birth_date)) < 61 THEN '46-60'
+               ELSE '60+'
+           END AS age_group,
+           COALESCE(NULLIF(u.city, ''), 'Sin especificar') AS city,
+           COALESCE(NULLIF(u.neighborhood, ''), 'Sin especificar') AS neighborhood,
+           COALESCE(to_char(COALESCE(r.started_at, r.completed_at), 'YYYY-MM'), '') AS month_key
+    FROM survey_responses r
+    JOIN users u ON u.id = r.user_id
+    WHERE r.completed = true
+)
+"""
+
+# Mismas filas que SurveyRollupService.rebuild, para todas las encuestas
+FILL_RESPONDENT_ROLLUPS_SQL = ROLLUP_RESPONDENTS_CTE + """
+INSERT INTO survey_respondent_rollups (survey_id, age_group, city, neighborhood, month_key, response_count)
+SELECT survey_id, age_group, city, neighborhood, month_key, COUNT(*)
+FROM respondents
+GROUP BY survey_id, age_group, city, neighborhood, month_key
+"""
+
+FILL_ANSWER_ROLLUPS_SQL = ROLLUP_RESPONDENTS_CTE + """
+INSERT INTO survey_answer_rollups (survey_id, question_id, age_group, month_key, metric, option_key, count, value_sum)
+SELECT p.survey_id, a.question_id, p.age_group, p.month_key, 'answers', '', COUNT(*), 0
+FROM answers a JOIN respondents p ON p.response_id = a.response_id
+GROUP BY p.survey_id, a.question_id, p.age_group, p.month_key
+UNION ALL
+SELECT p.survey_id, a.question_id, p.age_group, p.month_key, 'vote', a.option_id::text, COUNT(*), 0
+FROM answers a JOIN respondents p ON p.response_id = a.response_id
+WHERE a.option_id IS NOT NULL
+GROUP BY p.survey_id, a.question_id, p.age_group, p.month_key, a.option_id
+UNION ALL
+SELECT p.survey_id, a.question_id, p.age_group, p.month_key, 'rating', a.rating::text, COUNT(*), 0
+FROM answers a JOIN respondents p ON p.response_id = a.response_id
+WHERE a.rating IS NOT NULL
+GROUP BY p.survey_id, a.question_id, p.age_group, p.month_key, a.rating
+UNION ALL
+SELECT p.survey_id, a.question_id, p.age_group, p.month_key, 'percentage', e.key,
+       COUNT(e.value::float), COALESCE(SUM(e.value::float), 0)
+FROM answers a
+JOIN respondents p ON p.response_id = a.response_id
+CROSS JOIN LATERAL jsonb_each_text(a.percentage_data) e
+WHERE jsonb_typeof(a.percentage_data) = 'object'
+GROUP BY p.survey_id, a.question_id, p.age_group, p.month_key, e.key
+"""
+
+
+def _create_admins():
+    op.create_table('admins',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('tokens_valid_after', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admins_email'), 'admins', ['email'], unique=True)
+
+
+def _create_auth_sessions():
+    op.create_table('auth_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('account_type', sa.String(length=6), nullable=False),
+    sa.Column('account_id', sa.UUID(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('previous_token_hash', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_hash')
+    )
+    op.create_index('ix_auth_sessions_account', 'auth_sessions', ['account_type', 'account_id'], unique=False)
+    op.create_index(op.f('ix_auth_sessions_previous_token_hash'), 'auth_sessions', ['previous_token_hash'], unique=False)
+
+
+def _create_clients():
+    op.create_table('clients',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('cuit', sa.String(length=11), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('contact_person', sa.String(length=255), nullable=True),
+    sa.Column('contact_position', sa.String(length=255), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('city', sa.String(length=255), nullable=True),
+    sa.Column('postal_code', sa.String(length=20), nullable=True),
+    sa.Column('website', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('tokens_valid_after', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_clients_cuit'), 'clients', ['cuit'], unique=True)
+    op.create_index(op.f('ix_clients_email'), 'clients', ['email'], unique=True)
+
+
+def _create_users():
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('cuil', sa.String(length=11), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('birth_date', sa.Date(), nullable=True),
+    sa.Column('gender', sa.String(length=20), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('neighborhood', sa.String(length=255), nullable=True),
+    sa.Column('city', sa.String(length=255), nullable=True),
+    sa.Column('postal_code', sa.String(length=20), nullable=True),
+    sa.Column('tokens_valid_after', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_cuil'), 'users', ['cuil'], unique=True)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+
+def _create_surveys():
+    op.create_table('surveys',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('client_id', sa.UUID(), nullable=True),
+    sa.Column('points_per_question', sa.Integer(), nullable=True),
+    sa.Column('bonus_points', sa.Integer(), nullable=True),
+    sa.Column('max_responses_per_user', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_user_points():
+    op.create_table('user_points',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total_points', sa.Integer(), nullable=True),
+    sa.Column('available_points', sa.Integer(), nullable=True),
+    sa.Column('redeemed_points', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+
+
+def _create_ai_insights():
+    op.create_table('ai_insights',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('responses_hash', sa.String(), nullable=False),
+    sa.Column('total_responses', sa.Integer(), nullable=False),
+    sa.Column('insights', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+    sa.Column('predictions', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ai_insights_responses_hash'), 'ai_insights', ['responses_hash'], unique=False)
+
+
+def _create_questions():
+    op.create_table('questions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('question_text', sa.Text(), nullable=False),
+    sa.Column('question_type', sa.Enum('MULTIPLE_CHOICE', 'SINGLE_CHOICE', 'PERCENTAGE_DISTRIBUTION', 'RATING', 'OPEN_TEXT', name='questiontype'), nullable=False),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('is_required', sa.Boolean(), nullable=True),
+    sa.Column('config', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_survey_respondent_rollups():
+    op.create_table('survey_respondent_rollups',
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('age_group', sa.String(length=50), nullable=False),
+    sa.Column('city', sa.String(length=255), nullable=False),
+    sa.Column('neighborhood', sa.String(length=255), nullable=False),
+    sa.Column('month_key', sa.String(length=7), nullable=False),
+    sa.Column('response_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('survey_id', 'age_group', 'city', 'neighborhood', 'month_key')
+    )
+
+
+def _create_survey_responses():
+    op.create_table('survey_responses',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('points_earned', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('ip_address', postgresql.INET(), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_survey_responses_survey_completed_at', 'survey_responses', ['survey_id', 'completed_at'], unique=False)
+
+
+def _create_user_survey_response_counts():
+    op.create_table('user_survey_response_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'survey_id')
+    )
+
+
+def _create_point_transactions():
+    op.create_table('point_transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('transaction_type', sa.String(length=50), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('related_response_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['related_response_id'], ['survey_responses.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_question_options():
+    op.create_table('question_options',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('option_text', sa.Text(), nullable=False),
+    sa.Column('option_value', sa.String(length=255), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_submission_queue():
+    op.create_table('submission_queue',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('ip_address', postgresql.INET(), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('response_id', sa.UUID(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['response_id'], ['survey_responses.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_submission_queue_pending', 'submission_queue', ['created_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def _create_survey_answer_rollups():
+    op.create_table('survey_answer_rollups',
+    sa.Column('survey_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('age_group', sa.String(length=50), nullable=False),
+    sa.Column('month_key', sa.String(length=7), nullable=False),
+    sa.Column('metric', sa.String(length=20), nullable=False),
+    sa.Column('option_key', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['survey_id'], ['surveys.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('survey_id', 'question_id', 'age_group', 'month_key', 'metric', 'option_key')
+    )
+
+
+def _create_answers():
+    op.create_table('answers',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('response_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('option_id', sa.UUID(), nullable=True),
+    sa.Column('answer_text', sa.Text(), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('percentage_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('rating IS NULL OR (rating >= 1 AND rating <= 5)', name='valid_rating'),
+    sa.ForeignKeyConstraint(['option_id'], ['question_options.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.ForeignKeyConstraint(['response_id'], ['survey_responses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'uq_answers_response_question_option', 'answers',
+        ['response_id', 'question_id', sa.text(f"COALESCE(option_id, '{NIL_UUID}'::uuid)")],
+        unique=True
+    )
+
+# En orden de dependencias (foreign keys)
+TABLES = [
+    ("admins", _create_admins),
+    ("clients", _create_clients),
+    ("users", _create_users),
+    ("auth_sessions", _create_auth_sessions),
+    ("surveys", _create_surveys),
+    ("user_points", _create_user_points),
+    ("ai_insights", _create_ai_insights),
+    ("questions", _create_questions),
+    ("survey_respondent_rollups", _create_survey_respondent_rollups),
+    ("survey_responses", _create_survey_responses),
+    ("user_survey_response_counts", _create_user_survey_response_counts),
+    ("point_transactions", _create_point_transactions),
+    ("question_options", _create_question_options),
+    ("submission_queue", _create_submission_queue),
+    ("survey_answer_rollups", _create_survey_answer_rollups),
+    ("answers", _create_answers),
+]
+
+
+def _upgrade_legacy_schema(created):
+    """Completa una base creada por create_all y los scripts migrate_*"""
+    # Columnas que create_all no agrega a tablas existentes
+    op.execute("ALTER TABLE surveys ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE")
+    op.execute("ALTER TABLE surveys ADD COLUMN IF NOT EXISTS max_responses_per_user INTEGER DEFAULT 0")
+    op.execute("ALTER TABLE surveys ADD COLUMN IF NOT EXISTS client_id UUID REFERENCES clients (id)")
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS gender VARCHAR(20)")
+    for table in ("users", "admins", "clients"):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS tokens_valid_after TIMESTAMP WITH TIME ZONE")
+
+    if "user_survey_response_counts" in created:
+        op.execute("""
+            INSERT INTO user_survey_response_counts (user_id, survey_id, completed_count)
+            SELECT user_id, survey_id, COUNT(*)
+            FROM survey_responses
+            WHERE completed = true
+            GROUP BY user_id, survey_id
+        """)
+    bind = op.get_bind()
+    unique_index_exists = bind.execute(
+        sa.text("SELECT to_regclass('uq_answers_response_question_option') IS NOT NULL")
+    ).scalar()
+    if not unique_index_exists:
+        # Conserva la answer más reciente de cada (respuesta, pregunta, opción)
+        op.execute(f"""
+            DELETE FROM answers a
+            USING (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY response_id, question_id, COALESCE(option_id, '{NIL_UUID}'::uuid)
+                    ORDER BY created_at DESC, id DESC
+                ) AS position
+                FROM answers
+            ) ranked
+            WHERE a.id = ranked.id AND ranked.position > 1
+        """)
+
+    # Rollups de resultados sobre las respuestas existentes (ya sin duplicados)
+    if "survey_respondent_rollups" in created:
+        op.execute(FILL_RESPONDENT_ROLLUPS_SQL)
+    if "survey_answer_rollups" in created:
+        op.execute(FILL_ANSWER_ROLLUPS_SQL)
+
+    # Índices sobre tablas con datos: CONCURRENTLY, fuera de la transacción
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_answers_response_question_option
+            ON answers (response_id, question_id, COALESCE(option_id, '{NIL_UUID}'::uuid))
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_survey_responses_survey_completed_at
+            ON survey_responses (survey_id, completed_at)
+        """)
+
+
+def upgrade() -> None:
+    # Con --sql no hay base que inspeccionar: se genera el esquema completo
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+    legacy = "surveys" in existing
+    created = set()
+    for name, create in TABLES:
+        if name not in existing:
+            create()
+            created.add(name)
+
+    if legacy:
+        _upgrade_legacy_schema(created)
+
+    op.execute(ACCOUNT_LOGINS_VIEW_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS account_logins")
+    for name, _ in reversed(TABLES):
+        op.drop_table(name)
+    sa.Enum(name="questiontype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,75 @@
+"""Índices para las consultas más frecuentes
+
+- survey_responses: índice parcial WHERE completed sobre (survey_id,
+  completed_at) que incluye user_id y started_at, para resultados, serie
+  temporal, conteos y ETags. Reemplaza a ix_survey_responses_survey_completed_at.
+  (user_id, survey_id, started_at) para my-responses, borradores y can-respond.
+- questions (survey_id, order_index) y question_options (question_id,
+  order_index) para cargar una encuesta.
+- answers (question_id). WHERE response_id = ? ya lo resuelve el índice único
+  uq_answers_response_question_option.
+- point_transactions (user_id, created_at) para el historial de puntos.
+- BRIN sobre los timestamps de las tablas append-only (survey_responses.started_at,
+  answers.created_at, point_transactions.created_at): ocupan unas pocas páginas
+  y sirven a las consultas por ventana de tiempo.
+
+Los índices se crean con CONCURRENTLY (fuera de una transacción) para no
+bloquear los envíos. Si la creación se interrumpe queda un índice INVALID:
+borrarlo con DROP INDEX CONCURRENTLY y volver a correr la migración.
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_hot_path_indexes"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nombre, tabla, columnas, opciones) en el mismo orden que en los modelos
+INDEXES = [
+    ("ix_survey_responses_survey_completed", "survey_responses", ["survey_id", "completed_at"], {
+        "postgresql_include": ["user_id", "started_at"],
+        "postgresql_where": sa.text("completed"),
+    }),
+    ("ix_survey_responses_user_survey", "survey_responses", ["user_id", "survey_id", "started_at"], {}),
+    ("ix_survey_responses_started_at_brin", "survey_responses", ["started_at"], {"postgresql_using": "brin"}),
+    ("ix_questions_survey_order", "questions", ["survey_id", "order_index"], {}),
+    ("ix_question_options_question_order", "question_options", ["question_id", "order_index"], {}),
+    ("ix_answers_question_id", "answers", ["question_id"], {}),
+    ("ix_answers_created_at_brin", "answers", ["created_at"], {"postgresql_using": "brin"}),
+    ("ix_point_transactions_user_created", "point_transactions", ["user_id", "created_at"], {}),
+    ("ix_point_transactions_created_at_brin", "point_transactions", ["created_at"], {"postgresql_using": "brin"}),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True, **options
+            )
+        # Cubierto por ix_survey_responses_survey_completed: todas sus consultas filtran completed
+        op.drop_index(
+            "ix_survey_responses_survey_completed_at", table_name="survey_responses",
+            postgresql_concurrently=True, if_exists=True
+        )
+    for table in sorted({table for _, table, _, _ in INDEXES}):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_survey_responses_survey_completed_at", "survey_responses", ["survey_id", "completed_at"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import users, surveys, auth, responses, admin, ai_insights
+from app.api.endpoints import users, surveys, auth, responses, admin, ai_insights, metrics
 
 api_router = APIRouter()
 
@@ -9,3 +9,4 @@ api_router.include_router(surveys.router, prefix="/surveys", tags=["surveys"])
 api_router.include_router(responses.router, prefix="/responses", tags=["responses"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 api_router.include_router(ai_insights.router, tags=["ai-insights"])
+api_router.include_router(metrics.router, tags=["metrics"])
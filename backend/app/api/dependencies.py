@@ -1,28 +1,35 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, Union
+from typing import Union, Dict, Any, Optional, Tuple
+from uuid import UUID
+import time
 
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
+from app.db.replicas import replica_router
 from app.models.user import User
 from app.models.admin import Admin
 from app.models.client import Client
+from app.models.account_login import ACCOUNT_MODELS
 from app.core.security import decode_access_token
+from app.core.cache import cache, run_cache_io
+from app.core.config import settings
+from app.core.principal import ACCOUNT_TYPES, Principal, principal_cache_key, is_revoked
 
 security = HTTPBearer()
 
 
-def get_current_account(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Union[User, Admin, Client]:
+async def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
     """
-    Get current authenticated account from JWT token.
-    Returns User, Admin, or Client based on account_type in token.
+    Decode and validate the JWT without touching the database.
+    Guarantees that "sub" is an account id and "account_type" a known type.
+    Async (it only does CPU work) so it doesn't take a threadpool slot.
     """
-
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token(credentials.credentials)
 
     if payload is None:
         raise HTTPException(
@@ -31,41 +38,171 @@ def get_current_account(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    account_id: Optional[str] = payload.get("sub")
-    account_type: Optional[str] = payload.get("account_type")
+    try:
+        valid_claims = payload.get("account_type") in ACCOUNT_TYPES and bool(UUID(str(payload.get("sub"))))
+    except ValueError:
+        valid_claims = False
 
-    if account_id is None or account_type is None:
+    if not valid_claims:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Buscar en la tabla correspondiente según account_type
-    account = None
-    if account_type == "user":
-        account = db.query(User).filter(User.id == account_id).first()
-    elif account_type == "admin":
-        account = db.query(Admin).filter(Admin.id == account_id).first()
-    elif account_type == "client":
-        account = db.query(Client).filter(Client.id == account_id).first()
+    return payload
 
-    if account is None:
+
+def _revoked_session() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="La sesión fue cerrada, vuelve a iniciar sesión",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _account_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Cuenta no encontrada"
+    )
+
+
+def _cached_principal(payload: Dict[str, Any]) -> Tuple[Principal, Optional[Principal]]:
+    """
+    Cache half of the principal lookup: the principal from the token and the
+    cached one (None on a miss). Raises if the token was revoked.
+    """
+    principal = Principal.from_claims(payload)
+    if is_revoked(principal):
+        raise _revoked_session()
+
+    if principal.token_id:
+        cached = cache.get(principal_cache_key(principal.token_id))
+        if cached is not None:
+            return principal, Principal.from_cache(cached)
+    return principal, None
+
+
+def _verify_and_cache_principal(principal: Principal, payload: Dict[str, Any], row) -> Principal:
+    """
+    Check the account row of a cache miss (it exists and the token was not
+    revoked) and cache the principal.
+    """
+    if row is None:
+        raise _account_not_found()
+    if is_revoked(principal, row.tokens_valid_after):
+        raise _revoked_session()
+
+    if principal.token_id:
+        # No cachear más allá del vencimiento del token
+        ttl = settings.CACHE_PRINCIPAL_TTL_SECONDS
+        if payload.get("exp"):
+            ttl = min(ttl, int(payload["exp"] - time.time()))
+        if ttl > 0:
+            cache.set(principal_cache_key(principal.token_id), principal.to_cache(), ttl=ttl)
+    return principal
+
+
+def get_principal(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Get the authenticated principal (id, account type, tenant) from the token.
+    Cached per token id (jti): cache hits don't touch the database; misses
+    check that the account still exists and the token was not revoked.
+    """
+    principal, cached = _cached_principal(payload)
+    if cached is not None:
+        return cached
+
+    model = ACCOUNT_MODELS[principal.account_type]
+    row = db.query(model.id, model.tokens_valid_after).filter(model.id == principal.id).first()
+    return _verify_and_cache_principal(principal, payload, row)
+
+
+async def get_async_principal(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    adb: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    get_principal for async endpoints: a cache miss looks the account up with
+    the async session (no sync pool connection, no threadpool slot) and cache
+    calls go through run_cache_io, off the event loop when they do network I/O.
+    """
+    principal, cached = await run_cache_io(_cached_principal, payload)
+    if cached is not None:
+        return cached
+
+    model = ACCOUNT_MODELS[principal.account_type]
+    row = (await adb.execute(
+        select(model.id, model.tokens_valid_after).where(model.id == principal.id)
+    )).first()
+    return await run_cache_io(_verify_and_cache_principal, principal, payload, row)
+
+
+def get_read_db(principal: Principal = Depends(get_principal)):
+    """
+    Read-only session for analytics and listings: a replica in sync, or the
+    primary if the principal wrote recently or no replica qualifies.
+    """
+    db = replica_router.read_session(principal.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_user_read_db(user_id: UUID):
+    """Like get_read_db, for public reads about the user in the path."""
+    db = replica_router.read_session(user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_admin_principal(principal: Principal = Depends(get_principal)) -> Principal:
+    """Verify that the principal is an admin."""
+    if not principal.is_admin:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cuenta no encontrada"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos de administrador"
         )
+    return principal
+
+
+def get_current_account(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> Union[User, Admin, Client]:
+    """
+    Get current authenticated account from JWT token.
+    Returns User, Admin, or Client based on account_type in token.
+    Use get_principal instead when the endpoint only needs id and type.
+    """
+    principal = Principal.from_claims(payload)
+    model = ACCOUNT_MODELS[principal.account_type]
+
+    # Buscar en la tabla correspondiente según account_type
+    account = db.query(model).filter(model.id == principal.id).first()
+
+    if account is None:
+        raise _account_not_found()
+    if is_revoked(principal, account.tokens_valid_after):
+        raise _revoked_session()
 
     return account
 
 
 # Alias para mantener compatibilidad con código existente
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    payload: Dict[str, Any] = Depends(get_token_payload),
     db: Session = Depends(get_db)
 ) -> Union[User, Admin, Client]:
     """Get current authenticated account (user, admin, or client)."""
-    return get_current_account(credentials, db)
+    return get_current_account(payload, db)
 
 
 def get_current_admin(
@@ -4,16 +4,16 @@ from typing import List
 from uuid import UUID
 
 from app.db.base import get_db
-from app.models.admin import Admin
 from app.models.client import Client
-from app.api.dependencies import get_current_admin
+from app.api.dependencies import get_admin_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
 
 @router.get("/clients", response_model=List[dict])
 def get_all_clients(
-    current_admin: Admin = Depends(get_current_admin),
+    principal: Principal = Depends(get_admin_principal),
     db: Session = Depends(get_db)
 ):
     """Get all clients - Admin only"""
@@ -37,7 +37,7 @@ def get_all_clients(
 @router.get("/clients/{client_id}")
 def get_client_detail(
     client_id: UUID,
-    current_admin: Admin = Depends(get_current_admin),
+    principal: Principal = Depends(get_admin_principal),
     db: Session = Depends(get_db)
 ):
     """Get client detail - Admin only"""
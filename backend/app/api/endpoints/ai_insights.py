@@ -2,6 +2,8 @@
 AI Insights endpoint - Genera análisis inteligente usando Claude AI
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from anthropic import Anthropic
 import json
@@ -9,15 +11,12 @@ import os
 from typing import List, Dict, Any
 from datetime import datetime
 
-from app.db.base import get_db
-from app.api.dependencies import get_current_user
+from app.db.base import get_db, get_async_db
+from app.api.dependencies import get_async_principal, get_principal, get_read_db
 from app.services.survey_service import SurveyService
 from app.core.config import settings
 from uuid import UUID
-from typing import Union
-from app.models.admin import Admin
-from app.models.client import Client
-from app.models.user import User
+from app.core.principal import Principal
 from app.models.ai_insight import AIInsight
 import hashlib
 
@@ -27,16 +26,19 @@ router = APIRouter()
 @router.get("/surveys/{survey_id}/ai-insights")
 async def get_ai_insights(
     survey_id: str,
-    db: Session = Depends(get_db),
-    current_user: Union[User, Admin, Client] = Depends(get_current_user)
+    adb: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_async_principal)
 ):
     """
     Obtiene los insights de IA cacheados para una encuesta.
     Retorna None si no hay insights generados aún.
     """
-    cached_insight = db.query(AIInsight).filter(
-        AIInsight.survey_id == UUID(survey_id)
-    ).order_by(AIInsight.created_at.desc()).first()
+    cached_insight = (await adb.execute(
+        select(AIInsight)
+        .where(AIInsight.survey_id == UUID(survey_id))
+        .order_by(AIInsight.created_at.desc())
+        .limit(1)
+    )).scalars().first()
 
     if not cached_insight:
         return {
@@ -54,12 +56,14 @@ async def get_ai_insights(
     }
 
 
+# Sin async: la sesión y el cliente de Anthropic son bloqueantes, corren en el threadpool
 @router.post("/surveys/{survey_id}/ai-insights")
-async def generate_ai_insights(
+def generate_ai_insights(
     survey_id: str,
     force_regenerate: bool = False,  # Parámetro para forzar regeneración
     db: Session = Depends(get_db),
-    current_user: Union[User, Admin, Client] = Depends(get_current_user)
+    read_db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_principal)
 ):
     """
     Genera insights inteligentes usando Claude AI basándose en los datos de la encuesta.
@@ -78,7 +82,7 @@ async def generate_ai_insights(
 
     try:
         # 2. Obtener datos de la encuesta
-        results = SurveyService.get_survey_results(db, UUID(survey_id))
+        results = SurveyService.get_survey_results(read_db, UUID(survey_id))
 
         if not results:
             raise HTTPException(
@@ -108,7 +112,7 @@ async def generate_ai_insights(
                 }
 
         # 5. Si no hay cache o se forzó regeneración, generar nuevos insights
-        results = SurveyService.get_survey_results(db, UUID(survey_id))
+        results = SurveyService.get_survey_results(read_db, UUID(survey_id))
 
         if not results:
             raise HTTPException(
@@ -167,7 +171,11 @@ Responde SOLO con el JSON, sin texto adicional:
   }}
 ]"""
 
-        # 4. Llamar a Claude AI
+        # 4. Llamar a Claude AI sin retener conexiones mientras tanto: la de
+        # lectura y la del primario (el principal y la búsqueda en cache dejan
+        # una transacción abierta); db vuelve a tomar una para guardar
+        read_db.close()
+        db.close()
         client = Anthropic(api_key=api_key)
 
         message = client.messages.create(
@@ -295,10 +303,11 @@ Responde SOLO con el JSON, sin texto adicional:
 
 
 @router.post("/surveys/{survey_id}/ai-predictions")
-async def generate_ai_predictions(
+def generate_ai_predictions(
     survey_id: str,
     db: Session = Depends(get_db),
-    current_user: Union[User, Admin, Client] = Depends(get_current_user)
+    read_db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_principal)
 ):
     """
     Genera predicciones y proyecciones usando Claude AI basándose en los datos de la encuesta.
@@ -314,7 +323,7 @@ async def generate_ai_predictions(
 
     try:
         # 2. Obtener datos de la encuesta
-        results = SurveyService.get_survey_results(db, UUID(survey_id))
+        results = SurveyService.get_survey_results(read_db, UUID(survey_id))
 
         if not results:
             raise HTTPException(
@@ -369,7 +378,11 @@ Responde SOLO con el JSON:
   }}
 ]"""
 
-        # 4. Llamar a Claude AI
+        # 4. Llamar a Claude AI sin retener conexiones mientras tanto: la de
+        # lectura y la del primario (el principal y la búsqueda en cache dejan
+        # una transacción abierta); db vuelve a tomar una para guardar
+        read_db.close()
+        db.close()
         client = Anthropic(api_key=api_key)
 
         message = client.messages.create(
@@ -1,52 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import timedelta
 from typing import Union
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-logger.info("AUTH ENDPOINT MODULE LOADED - VERSION 2.0")
-
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
 from app.models.user import User
 from app.models.admin import Admin
 from app.models.client import Client
-from app.schemas.auth import LoginRequest, RegisterRequest, Token
+from app.schemas.auth import LoginRequest, RegisterRequest, RefreshRequest, Token
 from app.schemas.user import UserResponse
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    PasswordHashingBusy,
+)
 from app.core.config import settings
-from app.api.dependencies import get_current_user
+from app.core.cache import cache, cache_key
+from app.core.principal import Principal
+from app.core.rate_limit import check_account_limit_async
+from app.models.account_login import ACCOUNT_MODELS
+from app.services.auth_service import AuthService
+from app.api.dependencies import get_principal
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    adb: AsyncSession = Depends(get_async_db)
 ):
-    """Register a new regular user (citizen)."""
+    """
+    Register a new regular user (citizen).
+    Async: el hash de bcrypt se espera sin ocupar un thread del threadpool.
+    """
 
-    # Check if CUIL already exists
-    existing_user = db.query(User).filter(User.cuil == user_data.cuil).first()
-    if existing_user:
+    # Check if CUIL or email already exists
+    existing = (await adb.execute(
+        select(User.cuil, User.email).where(
+            or_(User.cuil == user_data.cuil, User.email == user_data.email)
+        )
+    )).all()
+    if any(row.cuil == user_data.cuil for row in existing):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="CUIL ya registrado"
         )
-
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email ya registrado"
         )
 
     # Create new user (citizen)
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         cuil=user_data.cuil,
         hashed_password=hashed_password,
@@ -61,9 +74,8 @@ def register(
         postal_code=user_data.postal_code
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    adb.add(new_user)
+    await adb.commit()
 
     return {
         "id": str(new_user.id),
@@ -75,58 +87,22 @@ def register(
 
 
 @router.post("/login", response_model=Token)
-def login_v2(
+async def login_v2(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    adb: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with CUIL/Email and password.
-    Busca en las tres tablas: users (CUIL), admins (email), clients (email).
-    VERSION 2 - Fixed to search in admins table first
+    Busca en las tres tablas con una sola consulta a la vista account_logins:
+    emails en admins, clients y users (en ese orden) y CUIL en users.
+    Async: bcrypt corre en el pool de procesos y se espera sin ocupar un
+    thread; la capa de servicios (sync) corre con run_sync sobre asyncpg.
     """
-    logger.warning(f"=== LOGIN ATTEMPT V2 === Email/CUIL: {credentials.cuil}")
-
-    account: Union[User, Admin, Client, None] = None
-    account_type = None
-
-    # Si contiene @, es email (buscar en admins y clients)
-    if "@" in credentials.cuil:
-        logger.warning(f"Email detected ({credentials.cuil}), searching in admins first")
-
-        # Primero buscar en admins
-        admin = db.query(Admin).filter(Admin.email == credentials.cuil).first()
-        logger.warning(f"Admin query result: {admin is not None}")
-
-        if admin:
-            logger.warning(f"✅ Admin found - ID: {admin.id}, Email: {admin.email}")
-            account = admin
-            account_type = "admin"
-        else:
-            logger.warning(f"No admin found, checking clients...")
-            # Luego buscar en clients
-            client = db.query(Client).filter(Client.email == credentials.cuil).first()
-            if client:
-                logger.warning(f"✅ Client found - ID: {client.id}")
-                account = client
-                account_type = "client"
-            else:
-                logger.warning(f"No client found, checking users...")
-                # Por último, buscar en users por si algún user tiene email
-                user = db.query(User).filter(User.email == credentials.cuil).first()
-                if user:
-                    logger.warning(f"✅ User found - ID: {user.id}")
-                    account = user
-                    account_type = "user"
-    else:
-        logger.warning(f"CUIL detected ({credentials.cuil}), searching in users only")
-        # Es CUIL, buscar solo en users
-        user = db.query(User).filter(User.cuil == credentials.cuil).first()
-        if user:
-            account = user
-            account_type = "user"
-
-    if not account:
-        logger.warning(f"❌ NO ACCOUNT FOUND for: {credentials.cuil}")
+    await check_account_limit_async("login", credentials.cuil.lower())
+    account = await adb.run_sync(AuthService.find_login, credentials.cuil)
+
+    if account is None:
+        logger.info("auth.login_failed reason=unknown_account")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -134,63 +110,121 @@ def login_v2(
         )
 
     # Verify password
-    logger.warning(f"Account found ({account_type}), verifying password...")
-    password_valid = verify_password(credentials.password, account.hashed_password)
-    logger.warning(f"Password verification result: {password_valid}")
-
-    if not password_valid:
-        logger.warning(f"❌ INVALID PASSWORD for: {credentials.cuil}")
+    if not await verify_password_async(credentials.password, account.hashed_password):
+        logger.info("auth.login_failed reason=invalid_password account_type=%s", account.account_type)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Create access token with account type
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(account.id), "account_type": account_type},
-        expires_delta=access_token_expires
-    )
+    # Re-hashear si la contraseña se guardó con otro costo (BCRYPT_ROUNDS)
+    if password_needs_rehash(account.hashed_password):
+        try:
+            hashed_password = await get_password_hash_async(credentials.password)
+            await adb.run_sync(
+                AuthService.update_password_hash, account.account_type, account.id, hashed_password
+            )
+            logger.debug("auth.password_rehashed account_type=%s", account.account_type)
+        except PasswordHashingBusy:
+            # No es necesario para iniciar sesión: se reintenta en el próximo login
+            pass
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    logger.debug("auth.login_succeeded account_type=%s", account.account_type)
 
+    # Access token corto más refresh token de una sesión nueva
+    return await adb.run_sync(AuthService.issue_tokens, account.account_type, account.id)
 
-@router.get("/me")
-def get_current_user_info(current_user: Union[User, Admin, Client] = Depends(get_current_user)):
-    """Get current user information from token."""
-    # Determinar el tipo de cuenta y retornar con campo account_type
-    if isinstance(current_user, Admin):
+
+@router.post("/refresh", response_model=Token)
+def refresh_token(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Emite un access token nuevo y rota el refresh token (sin bcrypt)."""
+    tokens = AuthService.refresh(db, refresh_data.refresh_token)
+    if tokens is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="La sesión expiró, vuelve a iniciar sesión",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return tokens
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Cierra la sesión del refresh token."""
+    AuthService.revoke_session(db, refresh_data.refresh_token)
+
+
+@router.post("/sessions/revoke-all")
+def revoke_all_sessions(
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """Cierra todas las sesiones de la cuenta y revoca sus access tokens."""
+    revoked = AuthService.revoke_all(db, principal.account_type, principal.id)
+    return {"revoked_sessions": revoked}
+
+
+def account_info(account: Union[User, Admin, Client]) -> dict:
+    """Información pública de una cuenta, con campo account_type"""
+    if isinstance(account, Admin):
         return {
-            "id": str(current_user.id),
-            "email": current_user.email,
-            "name": current_user.name,
+            "id": str(account.id),
+            "email": account.email,
+            "name": account.name,
             "account_type": "admin",
-            "created_at": current_user.created_at
+            "created_at": account.created_at
         }
-    elif isinstance(current_user, Client):
+    elif isinstance(account, Client):
         return {
-            "id": str(current_user.id),
-            "email": current_user.email,
-            "name": current_user.name,
+            "id": str(account.id),
+            "email": account.email,
+            "name": account.name,
             "account_type": "client",
-            "cuit": current_user.cuit,
-            "phone": current_user.phone,
-            "created_at": current_user.created_at
+            "cuit": account.cuit,
+            "phone": account.phone,
+            "created_at": account.created_at
         }
     else:  # User
         return {
-            "id": str(current_user.id),
-            "cuil": current_user.cuil,
-            "email": current_user.email,
-            "name": current_user.name,
+            "id": str(account.id),
+            "cuil": account.cuil,
+            "email": account.email,
+            "name": account.name,
             "account_type": "user",
-            "phone": current_user.phone,
-            "birth_date": current_user.birth_date,
-            "gender": current_user.gender,
-            "address": current_user.address,
-            "neighborhood": current_user.neighborhood,
-            "city": current_user.city,
-            "postal_code": current_user.postal_code,
-            "created_at": current_user.created_at
+            "phone": account.phone,
+            "birth_date": account.birth_date,
+            "gender": account.gender,
+            "address": account.address,
+            "neighborhood": account.neighborhood,
+            "city": account.city,
+            "postal_code": account.postal_code,
+            "created_at": account.created_at
         }
+
+
+@router.get("/me")
+def get_current_user_info(
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """Get current user information from token (cached per account)."""
+    key = cache_key("me", principal.account_type, principal.id)
+    info = cache.get(key)
+    if info is None:
+        model = ACCOUNT_MODELS[principal.account_type]
+        account = db.query(model).filter(model.id == principal.id).first()
+        if account is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cuenta no encontrada"
+            )
+        info = jsonable_encoder(account_info(account))
+        cache.set(key, info, ttl=settings.CACHE_PRINCIPAL_TTL_SECONDS)
+    return info
@@ -0,0 +1,101 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import cache, CacheStats
+from app.core.security import password_hasher
+from app.core.rate_limit import rate_limiter
+from app.db.pool import CHECKOUT_BUCKETS, PoolStats, cumulative_buckets, pool_stats
+from app.db.replicas import replica_router
+
+router = APIRouter()
+
+
+def render_cache_metrics() -> str:
+    """Contadores del cache en formato de texto de Prometheus"""
+    stats = cache.stats()
+    lines = []
+    for field in CacheStats.FIELDS + ("entries",):
+        samples = [(tier, counts[field]) for tier, counts in stats.items() if field in counts]
+        if not samples:
+            continue
+        kind = "gauge" if field == "entries" else "counter"
+        name = f"pad_cache_{field}" if kind == "gauge" else f"pad_cache_{field}_total"
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f'{name}{{tier="{tier}"}} {value}' for tier, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def render_password_hasher_metrics() -> str:
+    """Uso del pool de bcrypt en formato de texto de Prometheus"""
+    return "\n".join([
+        "# TYPE pad_password_hashing_in_flight gauge",
+        f"pad_password_hashing_in_flight {password_hasher.in_flight}",
+        "# TYPE pad_password_hashing_rejected_total counter",
+        f"pad_password_hashing_rejected_total {password_hasher.rejected}",
+    ]) + "\n"
+
+
+def render_rate_limit_metrics() -> str:
+    """Requests rechazados por el rate limiting, por ruta o scope"""
+    lines = ["# TYPE pad_rate_limit_rejected_total counter"]
+    lines.extend(
+        f'pad_rate_limit_rejected_total{{limit="{name}"}} {count}'
+        for name, count in sorted(rate_limiter.rejected.items())
+    )
+    return "\n".join(lines) + "\n"
+
+
+def render_db_pool_metrics() -> str:
+    """Estado y contadores de los pools de conexiones, por engine"""
+    snapshots = [(name, stats.snapshot()) for name, stats in sorted(pool_stats.items())]
+    lines = []
+    for field in PoolStats.COUNTERS:
+        lines.append(f"# TYPE pad_db_pool_{field}_total counter")
+        lines.extend(f'pad_db_pool_{field}_total{{engine="{name}"}} {stats[field]}' for name, stats in snapshots)
+    for field in ("size", "max_overflow", "timeout", "in_use", "idle", "overflow", "max_in_use"):
+        samples = [(name, stats[field]) for name, stats in snapshots if field in stats]
+        if not samples:
+            continue
+        lines.append(f"# TYPE pad_db_pool_{field} gauge")
+        lines.extend(f'pad_db_pool_{field}{{engine="{name}"}} {value}' for name, value in samples)
+
+    lines.append("# TYPE pad_db_pool_checkout_seconds histogram")
+    for name, stats in snapshots:
+        bounds = [str(bound) for bound in CHECKOUT_BUCKETS] + ["+Inf"]
+        lines.extend(
+            f'pad_db_pool_checkout_seconds_bucket{{engine="{name}",le="{bound}"}} {count}'
+            for bound, count in zip(bounds, cumulative_buckets(stats))
+        )
+        lines.append(f'pad_db_pool_checkout_seconds_sum{{engine="{name}"}} {stats["checkout_seconds_sum"]:.6f}')
+        lines.append(f'pad_db_pool_checkout_seconds_count{{engine="{name}"}} {stats["checkouts"]}')
+    return "\n".join(lines) + "\n"
+
+
+def render_replica_metrics() -> str:
+    """Lecturas ruteadas por destino y atraso de cada réplica"""
+    lines = ["# TYPE pad_db_routed_reads_total counter"]
+    lines.extend(
+        f'pad_db_routed_reads_total{{target="{target}"}} {count}'
+        for target, count in sorted(replica_router.reads.items())
+    )
+    lags = replica_router.lags()
+    if lags:
+        lines.append("# TYPE pad_db_replica_lag_seconds gauge")
+        lines.extend(
+            f'pad_db_replica_lag_seconds{{replica="{name}"}} {"NaN" if lag is None else f"{lag:.3f}"}'
+            for name, lag in sorted(lags.items())
+        )
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Métricas del proceso en formato Prometheus (por worker)"""
+    return PlainTextResponse(
+        render_cache_metrics()
+        + render_password_hasher_metrics()
+        + render_rate_limit_metrics()
+        + render_db_pool_metrics()
+        + render_replica_metrics(),
+        media_type="text/plain; version=0.0.4"
+    )
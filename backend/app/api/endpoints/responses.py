@@ -1,50 +1,61 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
+from uuid import UUID
 
-from app.db.base import get_db
-from app.models.user import User
+from app.db.base import get_async_db
 from app.models.response import SurveyResponse, Answer
-from app.models.survey import Survey, Question, QuestionOption
-from app.api.dependencies import get_current_user
+from app.models.survey import Question
+from app.api.dependencies import get_async_principal
+from app.core.principal import Principal
 from app.schemas.response import UserResponseListItem, UserResponseDetail
 
 router = APIRouter()
 
 
 @router.get("/my-responses", response_model=List[UserResponseListItem])
-def get_my_responses(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_my_responses(
+    principal: Principal = Depends(get_async_principal),
+    adb: AsyncSession = Depends(get_async_db)
 ):
     """Get all survey responses for the current user."""
 
-    responses = db.query(SurveyResponse)\
-        .filter(SurveyResponse.user_id == current_user.id)\
-        .order_by(SurveyResponse.started_at.desc())\
-        .all()
+    responses = (await adb.execute(
+        select(SurveyResponse)
+        .options(selectinload(SurveyResponse.survey))
+        .where(SurveyResponse.user_id == principal.id)
+        .order_by(SurveyResponse.started_at.desc())
+    )).scalars().all()
 
     # Manually convert to schema
     return [UserResponseListItem.model_validate(r) for r in responses]
 
 
 @router.get("/my-responses/{response_id}", response_model=UserResponseDetail)
-def get_response_detail(
-    response_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_response_detail(
+    response_id: UUID,
+    principal: Principal = Depends(get_async_principal),
+    adb: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed information about a specific response."""
 
-    response = db.query(SurveyResponse)\
-        .filter(
+    # Sin lazy loading en AsyncSession: cargar todo lo que usa el schema
+    response = (await adb.execute(
+        select(SurveyResponse)
+        .options(
+            selectinload(SurveyResponse.survey),
+            selectinload(SurveyResponse.answers).selectinload(Answer.question).selectinload(Question.options),
+            selectinload(SurveyResponse.answers).selectinload(Answer.option),
+        )
+        .where(
             SurveyResponse.id == response_id,
-            SurveyResponse.user_id == current_user.id
-        )\
-        .first()
+            SurveyResponse.user_id == principal.id
+        )
+    )).scalars().first()
 
     if not response:
-        from fastapi import HTTPException, status
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Respuesta no encontrada"
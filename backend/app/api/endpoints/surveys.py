@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import Optional, List, Union
+from typing import Optional, List
+from datetime import datetime
 
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
+from app.db.replicas import mark_write
 from app.services.survey_service import SurveyService
+from app.services.survey_definition import survey_definitions
+from app.services.submission_queue import SubmissionQueueService, receipt_payload
 from app.schemas.survey import SurveyResponse, SurveyCreate
-from app.schemas.response import SurveyResponseCreate, SurveyResponseResponse
-from app.api.dependencies import get_current_user, get_current_admin, get_current_account
-from app.models.user import User
-from app.models.admin import Admin
-from app.models.client import Client
+from app.schemas.response import (
+    SurveyResponseCreate,
+    SurveyResponseResponse,
+    SurveyResponsePatch,
+    SurveyResponsePatchResult,
+    BulkSurveyResponseCreate,
+    BulkSurveyResponseResult,
+)
+from app.api.dependencies import get_principal, get_read_db
+from app.core.etag import make_etag, etag_matches, not_modified
+from app.core.cache import cache, run_cache_io
+from app.core.config import settings
+from app.core.idempotency import idempotency_record
+from app.core.principal import Principal
+from app.core.rate_limit import check_account_limit
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -20,10 +37,43 @@ class ToggleSurveyRequest(BaseModel):
     is_active: bool
 
 
+def _definition_response(request: Request, definition: dict) -> Response:
+    """Responde una definición cacheada: 304 si el cliente ya la tiene"""
+    etag = definition["etag"]
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse(
+        content=definition["payload"],
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+
+async def _cached_definition(adb: AsyncSession, survey_id: Optional[UUID] = None) -> Optional[dict]:
+    """
+    Definición serializada de la encuesta (o de la activa) desde el cache; si
+    no está, la carga con la sesión async y la guarda. El cache se usa con
+    run_cache_io, así un round trip a Redis no frena el event loop.
+    """
+    key = SurveyService.definition_cache_key(survey_id)
+    definition = await run_cache_io(cache.get, key)
+    if definition is not None:
+        return definition
+
+    if survey_id is None:
+        loaded = await adb.run_sync(SurveyService.load_active_survey_definition)
+    else:
+        loaded = await adb.run_sync(SurveyService.load_survey_definition, survey_id)
+    if loaded is None:
+        return None
+    definition, ttl = loaded
+    await run_cache_io(cache.set, key, definition, ttl)
+    return definition
+
+
 @router.get("/", response_model=List[SurveyResponse])
 def get_surveys(
-    current_user: Union[User, Admin, Client] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtiene las encuestas según el tipo de cuenta:
@@ -31,12 +81,12 @@ def get_surveys(
     - Client: ve solo sus encuestas
     - User: no tiene acceso a esta ruta
     """
-    if isinstance(current_user, Admin):
+    if principal.is_admin:
         # Admin ve todas las encuestas
         surveys = SurveyService.get_all_surveys(db)
-    elif isinstance(current_user, Client):
+    elif principal.is_client:
         # Cliente ve solo sus encuestas
-        surveys = SurveyService.get_all_surveys(db, client_id=current_user.id)
+        surveys = SurveyService.get_all_surveys(db, client_id=principal.tenant_id)
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -47,27 +97,30 @@ def get_surveys(
 
 
 @router.get("/active", response_model=SurveyResponse)
-def get_active_survey(db: Session = Depends(get_db)):
-    """Obtiene la encuesta activa actual"""
-    survey = SurveyService.get_active_survey(db)
-    if not survey:
+async def get_active_survey(request: Request, adb: AsyncSession = Depends(get_async_db)):
+    """Obtiene la encuesta activa actual (cacheada, soporta If-None-Match)"""
+    # Con la definición cacheada no se toma ninguna conexión
+    definition = await _cached_definition(adb)
+    if not definition:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No hay encuesta activa disponible"
         )
-    return survey
+
+    return _definition_response(request, definition)
 
 
 @router.get("/{survey_id}", response_model=SurveyResponse)
-def get_survey(survey_id: UUID, db: Session = Depends(get_db)):
-    """Obtiene una encuesta por ID"""
-    survey = SurveyService.get_survey_by_id(db, survey_id)
-    if not survey:
+async def get_survey(survey_id: UUID, request: Request, adb: AsyncSession = Depends(get_async_db)):
+    """Obtiene una encuesta por ID (cacheada, soporta If-None-Match)"""
+    definition = await _cached_definition(adb, survey_id)
+    if not definition:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Encuesta no encontrada"
         )
-    return survey
+
+    return _definition_response(request, definition)
 
 
 @router.post("/", response_model=SurveyResponse, status_code=status.HTTP_201_CREATED)
@@ -83,38 +136,97 @@ def create_survey(survey_data: SurveyCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.post("/responses", response_model=SurveyResponseResponse, status_code=status.HTTP_201_CREATED)
-def submit_survey_response(
+@router.post(
+    "/responses",
+    response_model=SurveyResponseResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        202: {"description": "Envío encolado (SUBMISSION_INGESTION_MODE=queue); retorna un comprobante"},
+        409: {"description": "Hay un envío en curso con la misma Idempotency-Key"},
+        422: {"description": "Idempotency-Key reutilizada con otro contenido"},
+        503: {"description": "Cola de envíos llena, reintentar más tarde"},
+    }
+)
+async def submit_survey_response(
     response_data: SurveyResponseCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    adb: AsyncSession = Depends(get_async_db)
 ):
-    """Envía una respuesta de encuesta"""
+    """
+    Envía una respuesta de encuesta.
+    Con el header Idempotency-Key, los reintentos devuelven la respuesta original.
+    """
+    # Sin autenticación el user_id del body no identifica a quien llama: el
+    # límite es el de la IP (RATE_LIMIT_ROUTES). Las claves se separan por
+    # encuesta y usuario, no por IP, para que un reintento desde otra red (wifi
+    # a datos móviles, CGNAT) encuentre el envío original
+    owner = f"{response_data.survey_id}:{response_data.user_id}"
+    record = idempotency_record(request, "survey-response", owner, response_data)
+    if record:
+        replay = await run_cache_io(record.claim)
+        if replay is not None:
+            return replay
+
     try:
-        # Verificar que la encuesta esté activa
-        survey = SurveyService.get_survey_by_id(db, response_data.survey_id)
-        if not survey:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Encuesta no encontrada"
-            )
-        if not survey.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Esta encuesta no está disponible actualmente"
-            )
-
-        # Capturar IP y User Agent
-        ip_address = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
+        # La capa de servicios es sync: run_sync la corre sobre la conexión
+        # asyncpg, sin ocupar un thread mientras espera a la base. run_sync
+        # corre en el event loop, así que el cache se usa antes y después
+        version = await run_cache_io(survey_definitions.version, response_data.survey_id)
+        response = await adb.run_sync(_process_submission, request, response_data, version)
+    except BaseException:
+        if record:
+            await run_cache_io(record.release)
+        raise
+
+    if response.status_code == status.HTTP_201_CREATED and response_data.completed:
+        await run_cache_io(SurveyService.invalidate_results_cache, response_data.survey_id)
+    # Sus próximas lecturas (puntos) van al primario hasta que las réplicas lo vean
+    await run_cache_io(mark_write, response_data.user_id)
+    if record:
+        await run_cache_io(record.save, response)
+    return response
+
+
+def _process_submission(
+    db: Session,
+    request: Request,
+    response_data: SurveyResponseCreate,
+    version: str
+) -> JSONResponse:
+    """Guarda (o encola) el envío y arma la respuesta HTTP, sin tocar el cache"""
+    # Verificar que la encuesta esté activa (definición compilada, con la versión ya leída)
+    definition = survey_definitions.get(db, response_data.survey_id, version)
+    if not definition:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Encuesta no encontrada"
+        )
+    if not definition.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Esta encuesta no está disponible actualmente"
+        )
+
+    # Capturar IP y User Agent
+    ip_address = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+
+    if settings.SUBMISSION_INGESTION_MODE == "queue":
+        return _enqueue_submission(db, response_data, definition, ip_address, user_agent)
 
+    try:
         response = SurveyService.submit_response(
             db,
             response_data,
             ip_address=ip_address,
-            user_agent=user_agent
+            user_agent=user_agent,
+            definition=definition,
+            invalidate_cache=False
+        )
+        return JSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=jsonable_encoder(SurveyResponseResponse.model_validate(response))
         )
-        return response
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -127,6 +239,210 @@ def submit_survey_response(
         )
 
 
+def _enqueue_submission(db: Session, response_data: SurveyResponseCreate, definition, ip_address, user_agent):
+    """Valida el envío, lo encola y responde 202 con el comprobante"""
+    if SubmissionQueueService.is_full(db):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Estamos recibiendo muchas respuestas, intenta de nuevo en unos segundos",
+            headers={"Retry-After": str(max(1, int(settings.SUBMISSION_QUEUE_POLL_SECONDS * 10)))}
+        )
+
+    error = definition.validate_answers(response_data.answers)
+    if not error and not SurveyService.user_can_respond(db, response_data.user_id, definition.id, definition):
+        error = "Ya alcanzaste el límite de respuestas para esta encuesta"
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+
+    item = SubmissionQueueService.enqueue(db, response_data, ip_address=ip_address, user_agent=user_agent)
+    receipt = receipt_payload(item)
+    receipt["status_url"] = f"{settings.API_V1_PREFIX}/surveys/responses/receipts/{item.id}"
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(receipt),
+        headers={"Location": receipt["status_url"]}
+    )
+
+
+@router.get("/responses/receipts/{receipt_id}")
+def get_submission_receipt(receipt_id: UUID, db: Session = Depends(get_db)):
+    """Estado de un envío encolado: pending, done (con response_id) o failed (con error)"""
+    item = SubmissionQueueService.get_receipt(db, receipt_id)
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comprobante no encontrado"
+        )
+    return receipt_payload(item)
+
+
+@router.get("/responses/draft/{survey_id}", response_model=SurveyResponseResponse)
+def get_draft_response(
+    survey_id: UUID,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """Respuesta en curso del usuario para la encuesta, para retomarla donde la dejó"""
+    survey_response = SurveyService.get_draft_response(db, principal.id, survey_id)
+    if not survey_response:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No tienes respuestas en curso para esta encuesta"
+        )
+    return survey_response
+
+
+@router.patch("/responses/{response_id}", response_model=SurveyResponsePatchResult)
+def update_survey_response(
+    response_id: UUID,
+    patch: SurveyResponsePatch,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Autoguardado: envía solo las answers que cambiaron. Las de cada pregunta
+    incluida reemplazan a las guardadas; `cleared_question_ids` las borra.
+    """
+    try:
+        result = SurveyService.update_response_answers(db, response_id, principal.id, patch)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Respuesta no encontrada"
+        )
+    return result
+
+
+@router.post("/responses/{response_id}/finalize", response_model=SurveyResponseResponse)
+def finalize_survey_response(
+    response_id: UUID,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Completa una respuesta en curso y acredita los puntos. Reintentar sobre
+    una respuesta ya finalizada la devuelve sin volver a sumar puntos.
+    """
+    try:
+        survey_response = SurveyService.finalize_response(db, response_id, principal.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if survey_response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Respuesta no encontrada"
+        )
+    mark_write(principal.id)
+    return survey_response
+
+
+@router.post("/responses/bulk", response_model=BulkSurveyResponseResult)
+def submit_survey_responses_bulk(
+    bulk_data: BulkSurveyResponseCreate,
+    request: Request,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Envía muchas respuestas de una encuesta en un solo request (kioscos y
+    equipos de campo). Accesible para admin y cliente dueño de la encuesta.
+    Retorna el resultado de cada respuesta; las inválidas no frenan al resto.
+    Con el header Idempotency-Key, reintentar el lote devuelve el resultado original.
+    """
+    if principal.is_user:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para esta acción"
+        )
+
+    check_account_limit("submit-bulk", principal.id)
+
+    record = idempotency_record(request, "survey-responses-bulk", principal.id, bulk_data)
+    if record:
+        replay = record.claim()
+        if replay is not None:
+            return replay
+
+    try:
+        response = _process_bulk_submission(db, request, bulk_data, principal)
+    except BaseException:
+        if record:
+            record.release()
+        raise
+
+    if record:
+        record.save(response)
+    return response
+
+
+def _process_bulk_submission(
+    db: Session,
+    request: Request,
+    bulk_data: BulkSurveyResponseCreate,
+    principal: Principal
+) -> JSONResponse:
+    """Valida permisos y límites del lote, lo guarda y arma la respuesta HTTP"""
+    if len(bulk_data.responses) > settings.BULK_SUBMIT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Se admiten hasta {settings.BULK_SUBMIT_MAX_ITEMS} respuestas por envío"
+        )
+
+    definition = survey_definitions.get(db, bulk_data.survey_id)
+    if not definition:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Encuesta no encontrada"
+        )
+    if principal.is_client and definition.client_id != principal.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para esta encuesta"
+        )
+
+    ip_address = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+
+    try:
+        results = SurveyService.submit_responses_bulk(
+            db,
+            bulk_data.survey_id,
+            bulk_data.responses,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    # Los puntos que cambiaron son de los ciudadanos del lote, no del admin/cliente:
+    # sus próximas lecturas van al primario hasta que las réplicas lo vean
+    for user_id in {item.user_id for item, result in zip(bulk_data.responses, results) if result["success"]}:
+        mark_write(user_id)
+
+    succeeded = sum(1 for result in results if result["success"])
+    return JSONResponse(content=jsonable_encoder(BulkSurveyResponseResult(
+        survey_id=bulk_data.survey_id,
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )))
+
+
 @router.get("/can-respond/{survey_id}/{user_id}")
 def check_can_respond(
     survey_id: UUID,
@@ -141,17 +457,8 @@ def check_can_respond(
     }
 
 
-@router.get("/{survey_id}/results")
-def get_survey_results(
-    survey_id: UUID,
-    current_user: Union[User, Admin, Client] = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Obtiene los resultados y estadísticas de una encuesta.
-    Solo accesible para admin y cliente dueño de la encuesta.
-    """
-    # Verificar que la encuesta existe
+def _check_results_access(db: Session, survey_id: UUID, principal: Principal):
+    """Verifica que la encuesta exista y que la cuenta pueda ver sus resultados"""
     survey = SurveyService.get_survey_by_id(db, survey_id)
     if not survey:
         raise HTTPException(
@@ -159,36 +466,132 @@ def get_survey_results(
             detail="Encuesta no encontrada"
         )
 
-    # Verificar permisos
-    if isinstance(current_user, User):
+    if principal.is_user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para ver resultados"
         )
 
-    if isinstance(current_user, Client) and survey.client_id != current_user.id:
+    if principal.is_client and survey.client_id != principal.tenant_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para ver esta encuesta"
         )
 
+
+@router.get("/{survey_id}/results")
+def get_survey_results(
+    survey_id: UUID,
+    request: Request,
+    response: Response,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Obtiene los resultados y estadísticas de una encuesta.
+    Solo accesible para admin y cliente dueño de la encuesta.
+    Si If-None-Match coincide con la versión actual responde 304 sin recalcular.
+    """
+    _check_results_access(db, survey_id, principal)
+
+    etag = make_etag(*SurveyService.get_results_version(db, survey_id))
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control="private, no-cache")
+
     # Obtener resultados
-    results = SurveyService.get_survey_results(db, survey_id)
+    results = SurveyService.get_survey_results(db, survey_id, version=etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return results
 
 
+@router.get("/{survey_id}/results/timeseries")
+def get_survey_results_timeseries(
+    survey_id: UUID,
+    request: Request,
+    response: Response,
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Serie temporal de resultados por día, semana o mes de completado.
+    `from` (incluido) y `to` (excluido) acotan la ventana.
+    Solo accesible para admin y cliente dueño de la encuesta.
+    """
+    _check_results_access(db, survey_id, principal)
+
+    etag = make_etag(
+        *SurveyService.get_results_version(db, survey_id),
+        granularity,
+        from_.isoformat() if from_ else None,
+        to.isoformat() if to else None
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control="private, no-cache")
+
+    try:
+        timeseries = SurveyService.get_results_timeseries(db, survey_id, granularity, from_, to)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return timeseries
+
+
+@router.get("/{survey_id}/results/breakdown")
+def get_survey_results_breakdown(
+    survey_id: UUID,
+    request: Request,
+    response: Response,
+    group_by: str = Query("age_group", description="Dimensiones separadas por coma (age_group, gender, city, neighborhood)"),
+    cross: bool = False,
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Resultados por pregunta desglosados por dimensiones demográficas.
+    Con cross=true devuelve el producto cruzado de las dimensiones.
+    Solo accesible para admin y cliente dueño de la encuesta.
+    """
+    _check_results_access(db, survey_id, principal)
+
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    etag = make_etag(*SurveyService.get_results_version(db, survey_id), tuple(dimensions), cross)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control="private, no-cache")
+
+    try:
+        breakdown = SurveyService.get_results_breakdown(db, survey_id, dimensions, cross)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return breakdown
+
+
 @router.patch("/{survey_id}/toggle")
 def toggle_survey_status(
     survey_id: UUID,
     toggle_data: ToggleSurveyRequest,
-    current_account: Union[Admin, Client] = Depends(get_current_account),
+    principal: Principal = Depends(get_principal),
     db: Session = Depends(get_db)
 ):
     """
     Activa o desactiva una encuesta.
-    Accesible para admin y client.
+    Accesible para admin y cliente dueño de la encuesta.
     """
-    if not isinstance(current_account, (Admin, Client)):
+    if principal.is_user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No tienes permisos para esta acción"
@@ -201,12 +604,15 @@ def toggle_survey_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Encuesta no encontrada"
         )
+    if principal.is_client and survey.client_id != principal.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para esta encuesta"
+        )
 
-    # Actualizar estado
-    survey.is_active = toggle_data.is_active
-    survey.status = "active" if toggle_data.is_active else "inactive"
-    db.commit()
-    db.refresh(survey)
+    # Actualizar estado (invalida las definiciones cacheadas)
+    survey = SurveyService.set_survey_active(db, survey, toggle_data.is_active)
+    mark_write(principal.id)
 
     return {
         "id": str(survey.id),
@@ -6,9 +6,10 @@ from app.db.base import get_db
 from app.services.user_service import UserService
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, PasswordChange
 from app.schemas.points import UserPointsResponse
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, get_user_read_db
 from app.models.user import User
 from app.core.security import verify_password, get_password_hash
+from app.services.auth_service import AuthService
 
 router = APIRouter()
 
@@ -52,7 +53,7 @@ def update_user(user_id: UUID, user_data: UserUpdate, db: Session = Depends(get_
 
 
 @router.get("/{user_id}/points", response_model=UserPointsResponse)
-def get_user_points(user_id: UUID, db: Session = Depends(get_db)):
+def get_user_points(user_id: UUID, db: Session = Depends(get_user_read_db)):
     """Obtiene los puntos de un usuario"""
     points = UserService.get_user_points(db, user_id)
     if not points:
@@ -95,8 +96,13 @@ def change_password(
             detail="La nueva contraseña debe tener al menos 6 caracteres"
         )
 
-    # Update password
+    # Update password y cerrar todas las sesiones abiertas hasta ahora
     current_user.hashed_password = get_password_hash(password_data.new_password)
     db.commit()
+    AuthService.revoke_all(db, "user", current_user.id)
 
-    return {"message": "Contraseña actualizada exitosamente"}
+    # Sesión nueva para que el dispositivo actual siga conectado
+    return {
+        "message": "Contraseña actualizada exitosamente",
+        **AuthService.issue_tokens(db, "user", current_user.id)
+    }
@@ -0,0 +1,309 @@
+"""
+Pluggable cache shared by the API.
+
+- LRUCache: in-process tier, bounded by entry count, with per-entry TTL.
+- RedisCache: shared tier across uvicorn workers (any redis-py compatible
+  client, including fakeredis for tests).
+- TieredCache: LRU in front of Redis. The local tier keeps entries only for a
+  few seconds, so invalidations done by another worker are seen quickly.
+
+Values must be JSON-serializable and must not be mutated by callers (the
+local tier returns the stored object). Backend errors are logged and treated
+as misses so a cache outage never fails a request.
+
+The interface is synchronous. Async endpoints call it through run_cache_io,
+which moves the call to the threadpool when the backend does network I/O
+(`blocking`), so a Redis round trip never stalls the event loop.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import json
+import logging
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for one cache tier."""
+
+    FIELDS = ("hits", "misses", "sets", "deletes", "evictions", "errors")
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self._lock = threading.Lock()
+        self._counts = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class CacheBackend(ABC):
+    """Interface implemented by every cache tier."""
+
+    # True if calls do network I/O and must not run on the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set only if the key is absent. Returns True if the value was stored."""
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        ...
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU cache with per-entry expiration."""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[int] = None, max_ttl: Optional[int] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats("local")
+
+    def _expiry(self, ttl: Optional[int]) -> Optional[float]:
+        ttl = ttl if ttl is not None else self.default_ttl
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl) if ttl is not None else self.max_ttl
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def _live_entry(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self._stats.incr("evictions")
+            return None
+        return entry
+
+    def _store(self, key: str, value: Any, ttl: Optional[int]):
+        self._entries[key] = (self._expiry(ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.incr("evictions")
+        self._stats.incr("sets")
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self._stats.incr("misses")
+                return None
+            self._entries.move_to_end(key)
+            self._stats.incr("hits")
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        with self._lock:
+            if self._live_entry(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._stats.incr("deletes")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        snapshot = self._stats.snapshot()
+        with self._lock:
+            snapshot["entries"] = len(self._entries)
+        return {self._stats.tier: snapshot}
+
+
+class RedisCache(CacheBackend):
+    """Shared cache tier backed by Redis (or a redis-py compatible client)."""
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "pad:", default_ttl: Optional[int] = None):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self._stats = CacheStats("redis")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning("cache.redis.error op=get key=%s error=%s", key, e)
+            self._stats.incr("errors")
+            return None
+        if raw is None:
+            self._stats.incr("misses")
+            return None
+        self._stats.incr("hits")
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        try:
+            self.client.set(self._key(key), json.dumps(value, default=str), ex=ttl)
+            self._stats.incr("sets")
+        except Exception as e:
+            logger.warning("cache.redis.error op=set key=%s error=%s", key, e)
+            self._stats.incr("errors")
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        ttl = ttl if ttl is not None else self.default_ttl
+        try:
+            stored = bool(self.client.set(self._key(key), json.dumps(value, default=str), ex=ttl, nx=True))
+        except Exception as e:
+            logger.warning("cache.redis.error op=add key=%s error=%s", key, e)
+            self._stats.incr("errors")
+            return False
+        if stored:
+            self._stats.incr("sets")
+        return stored
+
+    def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            self.client.delete(*[self._key(key) for key in keys])
+            self._stats.incr("deletes", len(keys))
+        except Exception as e:
+            logger.warning("cache.redis.error op=delete keys=%s error=%s", keys, e)
+            self._stats.incr("errors")
+
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=f"{self.prefix}*"):
+                self.client.delete(key)
+        except Exception as e:
+            logger.warning("cache.redis.error op=clear error=%s", e)
+            self._stats.incr("errors")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {self._stats.tier: self._stats.snapshot()}
+
+
+class TieredCache(CacheBackend):
+    """Short-lived in-process tier in front of a shared tier."""
+
+    def __init__(self, local: LRUCache, shared: CacheBackend):
+        self.local = local
+        self.shared = shared
+        self.blocking = shared.blocking
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.shared.set(key, value, ttl)
+        self.local.set(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        # The shared tier decides who wins across workers
+        stored = self.shared.add(key, value, ttl)
+        if stored:
+            self.local.set(key, value, ttl)
+        return stored
+
+    def delete(self, *keys: str):
+        self.shared.delete(*keys)
+        self.local.delete(*keys)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {**self.local.stats(), **self.shared.stats()}
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Build a cache key like "survey-results:<id>"."""
+    return ":".join([namespace, *(str(part) for part in parts)])
+
+
+def build_cache() -> CacheBackend:
+    """Build the cache configured by CACHE_BACKEND (memory, redis or fakeredis)."""
+    backend = settings.CACHE_BACKEND.lower()
+
+    if backend == "memory":
+        return LRUCache(max_entries=settings.CACHE_LOCAL_MAX_ENTRIES)
+
+    if backend == "redis":
+        import redis
+        client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        )
+    elif backend == "fakeredis":
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    else:
+        raise ValueError(f"CACHE_BACKEND desconocido: {settings.CACHE_BACKEND}")
+
+    local = LRUCache(
+        max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+        max_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+    )
+    return TieredCache(local, RedisCache(client))
+
+
+cache = build_cache()
+
+
+async def run_cache_io(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Call fn, which uses the cache, from async code: in the threadpool when the
+    cache is blocking (Redis), inline when it is in-process.
+    """
+    if cache.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
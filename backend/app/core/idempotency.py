@@ -0,0 +1,115 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first request with a given key claims it with an atomic set-if-absent in
+the shared cache (a short-lived "pending" marker). When it finishes, the
+response is stored under the same key for IDEMPOTENCY_TTL_SECONDS, and retries
+are answered from the cache without reaching the service layer. A retry that
+arrives while the first request is still running gets 409. If the same key is
+reused with a different payload the request is rejected with 422.
+
+With CACHE_BACKEND=memory keys are per worker; use redis so retries that land
+on another uvicorn worker are deduplicated too.
+"""
+from typing import Any, Optional
+import hashlib
+import json
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Response headers worth replaying
+REPLAYED_HEADERS = ("location",)
+
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of the request payload."""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyRecord:
+    """Cache entry guarding one Idempotency-Key."""
+
+    def __init__(self, key: str, fingerprint: str):
+        self.key = key
+        self.fingerprint = fingerprint
+
+    def claim(self) -> Optional[Response]:
+        """
+        Claim the key for this request. Returns None if the caller should
+        process the request, or the stored response if it is a replay.
+        """
+        pending = {"state": "pending", "fingerprint": self.fingerprint}
+        if cache.add(self.key, pending, ttl=settings.IDEMPOTENCY_PENDING_TTL_SECONDS):
+            return None
+
+        stored = cache.get(self.key)
+        if stored is None:
+            # Expired between add and get: try once more
+            if cache.add(self.key, pending, ttl=settings.IDEMPOTENCY_PENDING_TTL_SECONDS):
+                return None
+            stored = cache.get(self.key) or pending
+
+        if stored["fingerprint"] != self.fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"La {IDEMPOTENCY_HEADER} ya se usó con otro contenido"
+            )
+        if stored["state"] == "pending":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Ya hay un envío en curso con esta Idempotency-Key",
+                headers={"Retry-After": "1"}
+            )
+
+        return JSONResponse(
+            status_code=stored["status_code"],
+            content=stored["body"],
+            headers={**stored.get("headers", {}), "Idempotent-Replayed": "true"}
+        )
+
+    def save(self, response: JSONResponse):
+        """Store the final response so retries replay it."""
+        cache.set(self.key, {
+            "state": "done",
+            "fingerprint": self.fingerprint,
+            "status_code": response.status_code,
+            "body": json.loads(response.body),
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name in REPLAYED_HEADERS
+            },
+        }, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+
+    def release(self):
+        """Drop the pending marker after a failure so the client can retry."""
+        cache.delete(self.key)
+
+
+def idempotency_record(request: Request, scope: str, owner: Any, payload: Any) -> Optional[IdempotencyRecord]:
+    """
+    Build the record for the request's Idempotency-Key, or None if the header
+    is absent. Keys are namespaced by endpoint (scope) and owner: the
+    authenticated account, or the survey and user of an unauthenticated
+    submission. The owner must not depend on the client's network (retries may
+    come from another IP); taking over a key in someone else's scope means
+    guessing their random key, and the payload fingerprint rejects reuse with
+    different content.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La {IDEMPOTENCY_HEADER} no puede superar {MAX_KEY_LENGTH} caracteres"
+        )
+    return IdempotencyRecord(cache_key("idempotency", scope, owner, key), fingerprint(payload))
@@ -0,0 +1,141 @@
+"""
+Authenticated principal built from JWT claims.
+
+Access tokens carry everything authorization checks need (account id, account
+type, tenant for clients) plus a token id (jti) and issue time (iat). After the
+first request a token's principal is cached under its jti for
+CACHE_PRINCIPAL_TTL_SECONDS, so most authenticated requests never touch the
+database.
+
+Invalidation: password changes and revoke-all (AuthService.revoke_all) take
+one cutoff from the app clock, write it to the account's tokens_valid_after
+column (checked on every cache miss) and pass it to revoke_tokens, which
+stores it per account in the cache (checked on every request). Tokens whose
+iat is at or before the cutoff are rejected; iat has microsecond precision,
+so the token handed out right after the revocation is not.
+
+Accounts that no longer exist are rejected on every cache miss, so a removed
+account's tokens stop working once its cached principals expire
+(CACHE_PRINCIPAL_TTL_SECONDS).
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+import time
+
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+
+ACCOUNT_TYPES = ("user", "admin", "client")
+
+
+class Principal:
+    """Account identity and authorization claims, without the ORM row."""
+
+    __slots__ = ("id", "account_type", "tenant_id", "token_id", "issued_at")
+
+    def __init__(
+        self,
+        id: UUID,
+        account_type: str,
+        tenant_id: Optional[UUID] = None,
+        token_id: Optional[str] = None,
+        issued_at: float = 0.0
+    ):
+        self.id = id
+        self.account_type = account_type
+        self.tenant_id = tenant_id
+        self.token_id = token_id
+        self.issued_at = issued_at
+
+    @property
+    def is_user(self) -> bool:
+        return self.account_type == "user"
+
+    @property
+    def is_admin(self) -> bool:
+        return self.account_type == "admin"
+
+    @property
+    def is_client(self) -> bool:
+        return self.account_type == "client"
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> "Principal":
+        """Build the principal from a decoded token (tokens without tid/jti/iat are accepted)."""
+        account_id = UUID(payload["sub"])
+        account_type = payload["account_type"]
+        tenant_id = payload.get("tid")
+        if tenant_id is None and account_type == "client":
+            tenant_id = account_id
+        return cls(
+            id=account_id,
+            account_type=account_type,
+            tenant_id=UUID(str(tenant_id)) if tenant_id else None,
+            token_id=payload.get("jti"),
+            issued_at=float(payload.get("iat") or 0),
+        )
+
+    def to_cache(self) -> Dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "account_type": self.account_type,
+            "tenant_id": str(self.tenant_id) if self.tenant_id else None,
+            "token_id": self.token_id,
+            "issued_at": self.issued_at,
+        }
+
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any]) -> "Principal":
+        return cls(
+            id=UUID(data["id"]),
+            account_type=data["account_type"],
+            tenant_id=UUID(data["tenant_id"]) if data["tenant_id"] else None,
+            token_id=data["token_id"],
+            issued_at=data["issued_at"],
+        )
+
+
+def principal_claims(account_id: UUID, account_type: str) -> Dict[str, Any]:
+    """Claims to put in an access token for the account."""
+    claims = {"sub": str(account_id), "account_type": account_type}
+    if account_type == "client":
+        # Clients are the tenants: surveys and results are scoped by client_id
+        claims["tid"] = str(account_id)
+    return claims
+
+
+def principal_cache_key(token_id: str) -> str:
+    return cache_key("principal", token_id)
+
+
+def revoked_before(account_type: str, account_id: Any) -> Optional[float]:
+    """Epoch time up to which the account's tokens are revoked, if any."""
+    return cache.get(cache_key("revoked-before", account_type, account_id))
+
+
+def is_revoked(principal: Principal, valid_after: Optional[datetime] = None) -> bool:
+    """
+    True if the token was issued at or before the account's revocation point.
+    `valid_after` is the account's tokens_valid_after column, when loaded.
+    """
+    cutoff = revoked_before(principal.account_type, principal.id)
+    if valid_after is not None:
+        cutoff = max(cutoff or 0.0, valid_after.timestamp())
+    return bool(cutoff) and principal.issued_at <= cutoff
+
+
+def revoke_tokens(account_type: str, account_id: Any, at: Optional[datetime] = None):
+    """
+    Reject the account's tokens issued up to `at` (default: now) on every
+    worker sharing the cache, without waiting for cached principals to expire.
+    Callers also persist `at` as tokens_valid_after so the revocation survives
+    the cache.
+    """
+    cutoff = at.timestamp() if at else time.time()
+    cache.set(
+        cache_key("revoked-before", account_type, account_id),
+        cutoff,
+        ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+    cache.delete(cache_key("me", account_type, account_id))
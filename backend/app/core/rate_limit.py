@@ -0,0 +1,250 @@
+"""
+Token-bucket rate limiting.
+
+Two kinds of limits:
+
+- Per IP, enforced by RateLimitMiddleware before routing, for the routes listed
+  in RATE_LIMIT_ROUTES ("POST /auth/login": "10/minute"). Requests to other
+  routes pay one dict lookup.
+- Per account (login identifier, admin/client id), enforced by the endpoints
+  with check_account_limit for the scopes in RATE_LIMIT_ACCOUNTS (async
+  endpoints use check_account_limit_async, which runs a Redis store in the
+  threadpool). Only use it with keys the caller cannot choose: an
+  unauthenticated body field would let anyone drain someone else's bucket.
+
+Buckets live in a bounded in-process LRU (RATE_LIMIT_BACKEND=memory, per
+worker) or in Redis (RATE_LIMIT_BACKEND=redis, shared by all workers, updated
+atomically with a Lua script). If Redis fails the request is allowed.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional
+import logging
+import math
+import threading
+import time
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimitPolicy:
+    """Bucket of `capacity` tokens refilled at capacity/period per second."""
+
+    __slots__ = ("capacity", "refill_per_second")
+
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.refill_per_second = capacity / period_seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimitPolicy":
+        """Parse "10/minute" (or second, hour, day)."""
+        count, _, period = spec.partition("/")
+        if period not in PERIODS or not count.strip().isdigit():
+            raise ValueError(f"Límite inválido: {spec!r} (formato: 10/minute)")
+        return cls(int(count), PERIODS[period])
+
+
+class MemoryBucketStore:
+    """Token buckets in an LRU bounded to max_keys entries (per process)."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, policy: RateLimitPolicy) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(policy.capacity), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(policy.capacity, bucket[0] + (now - bucket[1]) * policy.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / policy.refill_per_second
+
+
+# Same algorithm as MemoryBucketStore.take, atomically in Redis
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis."""
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "pad:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def take(self, key: str, policy: RateLimitPolicy) -> float:
+        try:
+            return float(self._take(
+                keys=[f"{self.prefix}{key}"],
+                args=[policy.capacity, policy.refill_per_second, time.time()]
+            ))
+        except Exception as e:
+            logger.warning("rate_limit.redis.error key=%s error=%s", key, e)
+            return 0.0
+
+
+class RateLimiter:
+    """Per-route (IP) and per-scope (account) policies over a bucket store."""
+
+    def __init__(
+        self,
+        store,
+        route_policies: Dict[str, RateLimitPolicy],
+        account_policies: Dict[str, RateLimitPolicy]
+    ):
+        self.store = store
+        self.route_policies = route_policies
+        self.account_policies = account_policies
+        self.rejected: Dict[str, int] = {}
+
+    def _rejected(self, name: str):
+        self.rejected[name] = self.rejected.get(name, 0) + 1
+
+    def take(self, key: str, policy: RateLimitPolicy, name: str) -> float:
+        retry_after = self.store.take(key, policy)
+        if retry_after:
+            self._rejected(name)
+        return retry_after
+
+
+def _too_many_requests_detail(retry_after: float) -> str:
+    return f"Demasiadas solicitudes, intenta de nuevo en {math.ceil(retry_after)} segundos"
+
+
+def build_rate_limiter() -> RateLimiter:
+    """Build the limiter configured by RATE_LIMIT_BACKEND and the RATE_LIMIT_* policies."""
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend == "memory":
+        store = MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+    elif backend == "redis":
+        import redis
+        store = RedisBucketStore(redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        ))
+    else:
+        raise ValueError(f"RATE_LIMIT_BACKEND desconocido: {settings.RATE_LIMIT_BACKEND}")
+
+    route_policies = {}
+    for route, spec in settings.RATE_LIMIT_ROUTES.items():
+        method, _, path = route.partition(" ")
+        route_policies[f"{method.upper()} {settings.API_V1_PREFIX}{path}"] = RateLimitPolicy.parse(spec)
+
+    return RateLimiter(
+        store,
+        route_policies,
+        {scope: RateLimitPolicy.parse(spec) for scope, spec in settings.RATE_LIMIT_ACCOUNTS.items()},
+    )
+
+
+rate_limiter = build_rate_limiter()
+
+
+def client_ip(scope) -> str:
+    """Client address of an ASGI scope (X-Forwarded-For when trusted)."""
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def check_account_limit(scope: str, account_key) -> None:
+    """Take a token from the account's bucket for `scope`; raise 429 if empty."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    policy = rate_limiter.account_policies.get(scope)
+    if policy is None:
+        return
+    retry_after = rate_limiter.take(f"account:{scope}:{account_key}", policy, scope)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=_too_many_requests_detail(retry_after),
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+async def check_account_limit_async(scope: str, account_key) -> None:
+    """check_account_limit for async endpoints: a blocking store (Redis) runs in the threadpool."""
+    if rate_limiter.store.blocking:
+        await run_in_threadpool(check_account_limit, scope, account_key)
+    else:
+        check_account_limit(scope, account_key)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the per-IP policies of RATE_LIMIT_ROUTES."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        route = f"{scope['method']} {scope['path']}"
+        policy = self.limiter.route_policies.get(route)
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        key = f"ip:{route}:{client_ip(scope)}"
+        if self.limiter.store.blocking:
+            retry_after = await run_in_threadpool(self.limiter.take, key, policy, route)
+        else:
+            retry_after = self.limiter.take(key, policy, route)
+
+        if retry_after:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": _too_many_requests_detail(retry_after)},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            return await response(scope, receive, send)
+        return await self.app(scope, receive, send)
@@ -1,38 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
+import multiprocessing
+import threading
+import time
+import uuid
 from app.core.config import settings
 
 ALGORITHM = "HS256"
 
 
+class PasswordHashingBusy(Exception):
+    """Too many password hashes queued; the request should be retried later (503)."""
+
+
+def _checkpw(password_bytes: bytes, hashed_bytes: bytes) -> bool:
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def _hashpw(password_bytes: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds))
+
+
+class PasswordHasherPool:
+    """
+    Runs bcrypt in a dedicated, size-capped process pool so login and
+    registration bursts don't starve the threadpool shared by the sync
+    endpoints. At most BCRYPT_POOL_SIZE hashes run at once and at most
+    BCRYPT_POOL_MAX_PENDING more wait; beyond that PasswordHashingBusy is
+    raised. With BCRYPT_POOL_SIZE=0 hashing runs inline (scripts).
+    """
+
+    def __init__(self, size: int, max_pending: int):
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size + max_pending) if size > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the workers don't inherit DB connections or threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashingBusy()
+        with self._lock:
+            self.in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        if self._slots is None:
+            return fn(*args)
+        self._acquire()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    async def run_async(self, fn, *args):
+        """Like run, but awaits the result instead of blocking a thread."""
+        if self._slots is None:
+            return await asyncio.to_thread(fn, *args)
+        self._acquire()
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            self._release()
+
+
+password_hasher = PasswordHasherPool(settings.BCRYPT_POOL_SIZE, settings.BCRYPT_POOL_MAX_PENDING)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     # Bcrypt has a 72 byte limit, truncate if necessary
     password_bytes = plain_password[:72].encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return password_hasher.run(_checkpw, password_bytes, hashed_bytes)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
+    """Hash a password with the configured cost factor (BCRYPT_ROUNDS)."""
     # Bcrypt has a 72 byte limit, truncate if necessary
     password_bytes = password[:72].encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    hashed = password_hasher.run(_hashpw, password_bytes, settings.BCRYPT_ROUNDS)
+    return hashed.decode('utf-8')
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for async endpoints: waits for the pool without holding a thread."""
+    password_bytes = plain_password[:72].encode('utf-8')
+    hashed_bytes = hashed_password.encode('utf-8')
+    return await password_hasher.run_async(_checkpw, password_bytes, hashed_bytes)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async endpoints: waits for the pool without holding a thread."""
+    password_bytes = password[:72].encode('utf-8')
+    hashed = await password_hasher.run_async(_hashpw, password_bytes, settings.BCRYPT_ROUNDS)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a cost factor other than BCRYPT_ROUNDS."""
+    try:
+        # $2b$<rounds>$<salt+hash>
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token with a unique token id (jti) and issue time (iat)."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    issued_at = time.time()
+    expire = datetime.utcfromtimestamp(issued_at) + (
+        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
 
-    to_encode.update({"exp": expire})
+    # iat with microseconds: revoke_tokens compares it with a cutoff taken from
+    # the same clock, so a token issued right after a revocation stays valid
+    to_encode.update({"exp": expire, "iat": round(issued_at, 6), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
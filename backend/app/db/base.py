@@ -1,18 +1,65 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_pool
+
+
+def pool_options() -> dict:
+    """Opciones de pool comunes a los dos engines (DB_POOL_* en Settings)"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
+    poolclass=TimedQueuePool,
+    echo=settings.DEBUG,
+    **pool_options()
 )
+instrument_pool(engine, "sync")
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL, o DATABASE_URL con el driver asyncpg"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Engine async (asyncpg) para los endpoints I/O-bound; corre junto al sync.
+# Se crea al primer uso, así los scripts y el worker no necesitan asyncpg.
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            async_database_url(),
+            poolclass=TimedAsyncAdaptedQueuePool,
+            echo=settings.DEBUG,
+            **pool_options()
+        )
+        instrument_pool(_async_engine, "async")
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
 # Base class for models
 Base = declarative_base()
 
@@ -24,3 +71,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async DB session
+async def get_async_db():
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
@@ -0,0 +1,145 @@
+"""
+Connection pool telemetry.
+
+Both engines (sync psycopg2 and async asyncpg) use a QueuePool subclass that
+times every checkout: the wait for a free connection plus opening a new one or
+the pre-ping. Pool event listeners count new connections, connections opened
+beyond pool_size (overflow) and invalidations, and track the peak number of
+connections checked out at once. GET /api/v1/metrics exposes the counters and
+the current pool state per engine, so DB_POOL_SIZE / DB_MAX_OVERFLOW can be
+sized against the number of uvicorn workers.
+"""
+from bisect import bisect_left
+from typing import Dict, List
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds (seconds) of the checkout latency histogram
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolStats:
+    """Counters for one engine's pool."""
+
+    COUNTERS = ("checkouts", "checkout_timeouts", "connections", "overflow_connections", "invalidations")
+
+    def __init__(self, engine_name: str):
+        self.engine_name = engine_name
+        self.pool = None
+        self._lock = threading.Lock()
+        self._counts = {name: 0 for name in self.COUNTERS}
+        self._buckets = [0] * (len(CHECKOUT_BUCKETS) + 1)
+        self._checkout_seconds = 0.0
+        self.max_in_use = 0
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def observe_checkout(self, seconds: float):
+        with self._lock:
+            self._counts["checkouts"] += 1
+            self._checkout_seconds += seconds
+            self._buckets[bisect_left(CHECKOUT_BUCKETS, seconds)] += 1
+
+    def observe_in_use(self, in_use: int):
+        if in_use > self.max_in_use:
+            with self._lock:
+                self.max_in_use = max(self.max_in_use, in_use)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            snapshot = dict(self._counts)
+            snapshot["checkout_seconds_sum"] = self._checkout_seconds
+            snapshot["checkout_buckets"] = list(self._buckets)
+            snapshot["max_in_use"] = self.max_in_use
+        pool = self.pool
+        if pool is not None:
+            snapshot.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        return snapshot
+
+
+# Stats per engine name ("sync", "async"), read by the metrics endpoint
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class _TimedPoolMixin:
+    """Times Pool.connect() and reports it to the pool's PoolStats."""
+
+    stats: PoolStats = None
+
+    def connect(self):
+        began = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.incr("checkout_timeouts")
+            raise
+        if self.stats is not None:
+            self.stats.observe_checkout(time.perf_counter() - began)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; listeners are carried over, the stats are rebound
+        pool = super().recreate()
+        if self.stats is not None:
+            pool.stats = self.stats
+            self.stats.pool = pool
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool with checkout timing, for the sync engine."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout timing, for the async engine."""
+
+
+def instrument_pool(engine, engine_name: str) -> PoolStats:
+    """Register listeners on the engine's pool and its stats under `engine_name`."""
+    # AsyncEngine wraps a sync Engine that owns the pool
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = PoolStats(engine_name)
+    pool_stats[engine_name] = stats
+    if not isinstance(pool, _TimedPoolMixin):
+        return stats
+    pool.stats = stats
+    stats.pool = pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.incr("connections")
+        # The overflow counter already includes this connection
+        if stats.pool.overflow() > 0:
+            stats.incr("overflow_connections")
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.observe_in_use(stats.pool.checkedout())
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.incr("invalidations")
+
+    return stats
+
+
+def cumulative_buckets(stats: Dict[str, object]) -> List[int]:
+    """Histogram buckets as Prometheus expects them (cumulative, last = +Inf)."""
+    total, cumulative = 0, []
+    for count in stats["checkout_buckets"]:
+        total += count
+        cumulative.append(total)
+    return cumulative
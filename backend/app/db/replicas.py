@@ -0,0 +1,139 @@
+"""
+Read-replica routing for analytics and listing reads.
+
+DATABASE_REPLICA_URLS lists streaming replicas of DATABASE_URL. Endpoints that
+only read (results, survey listing, AI insight inputs, points balance) ask
+replica_router for a session instead of using the primary:
+
+- Replicas are used round-robin. Each replica's lag is measured at most every
+  REPLICA_LAG_CHECK_SECONDS per worker; a replica lagging more than
+  REPLICA_MAX_LAG_SECONDS, or failing to answer, is skipped until the next check.
+  When no replica qualifies the read goes to the primary.
+- Read-your-writes: endpoints that write on behalf of an account call
+  mark_write. For REPLICA_READ_YOUR_WRITES_SECONDS afterwards that account's
+  routed reads go to the primary, so a user never reads a replica that has not
+  replayed their own submission yet. With CACHE_BACKEND=memory the mark is per
+  worker; use redis so it holds across workers.
+
+With no replicas configured every read goes to the primary and mark_write is a
+no-op, so local development needs a single Postgres.
+"""
+from typing import Any, List, Optional
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+from app.db.base import SessionLocal, pool_options
+from app.db.pool import TimedQueuePool, instrument_pool
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction; 0 when there is nothing left to
+# replay (an idle primary would otherwise look like lag) or the server is not
+# a standby (two independent instances in local testing).
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class Replica:
+    """One replica engine and its last measured lag."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(
+            url,
+            poolclass=TimedQueuePool,
+            connect_args={"connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS},
+            echo=settings.DEBUG,
+            **pool_options()
+        )
+        instrument_pool(self.engine, name)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.lag: Optional[float] = None  # None = unknown or unreachable
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current_lag(self) -> Optional[float]:
+        """Lag in seconds, re-measured if the last check is older than REPLICA_LAG_CHECK_SECONDS."""
+        if time.monotonic() - self.checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+            return self.lag
+        # One thread measures; the rest keep using the previous value
+        if not self._lock.acquire(blocking=False):
+            return self.lag
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(LAG_SQL).scalar()
+            self.lag = float(lag) if lag is not None else None
+        except Exception as e:
+            logger.warning("replica.lag_check.error replica=%s error=%s", self.name, e)
+            self.lag = None
+        finally:
+            self.checked_at = time.monotonic()
+            self._lock.release()
+        return self.lag
+
+    def is_usable(self) -> bool:
+        lag = self.current_lag()
+        return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """Picks a replica (or the primary) for read-only sessions."""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls)]
+        self._next = itertools.count()
+        # Routed reads per target, for /metrics
+        self.reads = {"primary": 0, **{replica.name: 0 for replica in self.replicas}}
+
+    def _pick(self) -> Optional[Replica]:
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.is_usable():
+                return replica
+        return None
+
+    def read_session(self, account_key: Any = None) -> Session:
+        """
+        Session for read-only work. `account_key` identifies the account the
+        read is for (see mark_write); pass None for reads no account wrote.
+        """
+        replica = None
+        if self.replicas and not (account_key is not None and recently_wrote(account_key)):
+            replica = self._pick()
+        target = replica.name if replica else "primary"
+        self.reads[target] = self.reads.get(target, 0) + 1
+        return replica.session_factory() if replica else SessionLocal()
+
+    def lags(self) -> dict:
+        """Last measured lag per replica (None = unknown or unreachable)."""
+        return {replica.name: replica.lag for replica in self.replicas}
+
+
+def _write_key(account_key: Any) -> str:
+    return cache_key("recent-write", account_key)
+
+
+def mark_write(account_key: Any):
+    """Route the account's reads to the primary for REPLICA_READ_YOUR_WRITES_SECONDS."""
+    if replica_router.replicas:
+        cache.set(_write_key(account_key), 1, ttl=settings.REPLICA_READ_YOUR_WRITES_SECONDS)
+
+
+def recently_wrote(account_key: Any) -> bool:
+    return cache.get(_write_key(account_key)) is not None
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
@@ -1,26 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text, inspect
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.security import PasswordHashingBusy
+from app.core.rate_limit import RateLimitMiddleware
 from app.api.api import api_router
-from app.db.base import engine, Base
 from dotenv import load_dotenv
+import logging
 import os
 
 # Cargar .env file
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
 load_dotenv(env_path)
 
-# Crear tablas
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=settings.LOG_LEVEL)
 
-# Migraciones manuales: agregar columnas nuevas a tablas existentes
-with engine.connect() as conn:
-    inspector = inspect(engine)
-    columns = [col["name"] for col in inspector.get_columns("users")]
-    if "gender" not in columns:
-        conn.execute(text("ALTER TABLE users ADD COLUMN gender VARCHAR(20)"))
-        conn.commit()
+# El esquema lo manejan las migraciones (alembic upgrade head), no el arranque
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -31,6 +26,10 @@ app = FastAPI(
     redirect_slashes=False
 )
 
+# Rate limiting por IP (RATE_LIMIT_ROUTES); va dentro de CORS para que los 429
+# también lleven los headers de CORS
+app.add_middleware(RateLimitMiddleware)
+
 # CORS - Must be added before routes
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +40,16 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+@app.exception_handler(PasswordHashingBusy)
+def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Pool de bcrypt saturado: se descarta el request en lugar de encolarlo"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Hay muchos inicios de sesión en curso, intenta de nuevo en unos segundos"},
+        headers={"Retry-After": "1"}
+    )
+
+
 # Incluir routers
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -2,9 +2,12 @@ from app.models.user import User
 from app.models.admin import Admin
 from app.models.client import Client
 from app.models.survey import Survey, Question, QuestionOption
-from app.models.response import SurveyResponse, Answer
+from app.models.response import SurveyResponse, Answer, UserSurveyResponseCount
 from app.models.points import UserPoints, PointTransaction
 from app.models.ai_insight import AIInsight
+from app.models.rollup import SurveyRespondentRollup, SurveyAnswerRollup
+from app.models.submission_queue import SubmissionQueueItem
+from app.models.auth_session import AuthSession
 
 __all__ = [
     "User",
@@ -15,7 +18,12 @@ __all__ = [
     "QuestionOption",
     "SurveyResponse",
     "Answer",
+    "UserSurveyResponseCount",
     "UserPoints",
     "PointTransaction",
     "AIInsight",
+    "SurveyRespondentRollup",
+    "SurveyAnswerRollup",
+    "SubmissionQueueItem",
+    "AuthSession",
 ]
@@ -0,0 +1,26 @@
+from sqlalchemy import Table, Column, MetaData, String, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.user import User
+from app.models.admin import Admin
+from app.models.client import Client
+
+# account_type del token -> modelo de la cuenta
+ACCOUNT_MODELS = {"user": User, "admin": Admin, "client": Client}
+
+# Vista con todos los identificadores de login: email de admins, clients y
+# users, y CUIL de users. Cada rama de la UNION ALL usa el índice único de su
+# tabla, así el login es una sola consulta indexada. `priority` resuelve un
+# email repetido entre tablas (admin > client > user, como antes). La crea la
+# migración 0001_initial_schema; si cambia, va en una migración nueva.
+# Va en su propio MetaData para que autogenerate no la trate como tabla.
+account_logins = Table(
+    "account_logins",
+    MetaData(),
+    Column("login", String(255)),
+    Column("login_kind", String(5)),
+    Column("account_type", String(6)),
+    Column("id", UUID(as_uuid=True)),
+    Column("hashed_password", String(255)),
+    Column("priority", Integer),
+)
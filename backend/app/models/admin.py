@@ -12,5 +12,6 @@ class Admin(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     name = Column(String(255), nullable=False)
+    tokens_valid_after = Column(DateTime(timezone=True))  # Tokens emitidos antes quedan revocados
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
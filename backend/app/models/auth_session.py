@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, func, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from app.db.base import Base
+
+
+class AuthSession(Base):
+    """
+    Sesión de una cuenta con su refresh token. Solo se guarda el SHA-256 del
+    token: /auth/refresh es una búsqueda por índice, sin bcrypt. Cada refresh
+    rota el token en la misma fila (previous_token_hash guarda el anterior para
+    detectar reuso); revocar todas las sesiones de una cuenta es un UPDATE.
+    """
+    __tablename__ = "auth_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account_type = Column(String(6), nullable=False)  # user, admin o client
+    account_id = Column(UUID(as_uuid=True), nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    previous_token_hash = Column(String(64), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Revocación masiva y limpieza de sesiones por cuenta
+        Index("ix_auth_sessions_account", "account_type", "account_id"),
+    )
@@ -31,6 +31,7 @@ class Client(Base):
     website = Column(String(255))
     description = Column(String)  # Descripción de la organización
 
+    tokens_valid_after = Column(DateTime(timezone=True))  # Tokens emitidos antes quedan revocados
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
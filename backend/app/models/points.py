@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func, Numeric, Text, UniqueConstraint
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func, Numeric, Text, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -33,3 +33,10 @@ class PointTransaction(Base):
 
     # Relationships
     user = relationship("User", back_populates="point_transactions")
+
+    __table_args__ = (
+        # Historial de puntos de un usuario, del más reciente al más viejo
+        Index("ix_point_transactions_user_created", "user_id", "created_at"),
+        # Ventanas de tiempo (append-only, created_at sigue el orden físico)
+        Index("ix_point_transactions_created_at_brin", "created_at", postgresql_using="brin"),
+    )
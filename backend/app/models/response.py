@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func, Text, CheckConstraint
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func, text, Text, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
 from sqlalchemy.orm import relationship
 import uuid
@@ -24,6 +24,24 @@ class SurveyResponse(Base):
     user = relationship("User", back_populates="responses")
     answers = relationship("Answer", back_populates="response", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Resultados, serie temporal, conteos y ETag: WHERE survey_id = ? AND completed
+        # [AND completed_at BETWEEN ...]. Parcial (sin borradores) y con user_id y
+        # started_at incluidos, así los respondents salen de un index-only scan.
+        Index(
+            "ix_survey_responses_survey_completed",
+            "survey_id",
+            "completed_at",
+            postgresql_include=["user_id", "started_at"],
+            postgresql_where=text("completed"),
+        ),
+        # my-responses, borrador en curso y can-respond: WHERE user_id = ? [AND survey_id = ?]
+        # ORDER BY started_at DESC
+        Index("ix_survey_responses_user_survey", "user_id", "survey_id", "started_at"),
+        # Ventanas de tiempo sobre todas las encuestas; las filas llegan en orden de started_at
+        Index("ix_survey_responses_started_at_brin", "started_at", postgresql_using="brin"),
+    )
+
 
 class Answer(Base):
     __tablename__ = "answers"
@@ -50,7 +68,35 @@ class Answer(Base):
     question = relationship("Question", back_populates="answers")
     option = relationship("QuestionOption", back_populates="answers")
 
-    # Constraint: rating debe estar en rango válido si existe
+    # Constraint: rating debe estar en rango válido si existe.
+    # Una fila por (respuesta, pregunta), o por opción en selección múltiple:
+    # el autoguardado reemplaza las answers de cada pregunta sin duplicarlas.
     __table_args__ = (
         CheckConstraint('rating IS NULL OR (rating >= 1 AND rating <= 5)', name='valid_rating'),
+        Index(
+            "uq_answers_response_question_option",
+            "response_id",
+            "question_id",
+            text("COALESCE(option_id, '00000000-0000-0000-0000-000000000000'::uuid)"),
+            unique=True,
+        ),
+        # El índice único ya sirve a WHERE response_id = ?; este cubre las búsquedas
+        # por pregunta (y el FK al borrar una pregunta)
+        Index("ix_answers_question_id", "question_id"),
+        # Ventanas de tiempo: answers es append-only, created_at sigue el orden físico
+        Index("ix_answers_created_at_brin", "created_at", postgresql_using="brin"),
     )
+
+
+class UserSurveyResponseCount(Base):
+    """
+    Respuestas completadas por (usuario, encuesta). Se incrementa con un upsert
+    condicional en la misma transacción del envío, para que max_responses_per_user
+    se respete con envíos concurrentes.
+    """
+    __tablename__ = "user_survey_response_counts"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class SurveyRespondentRollup(Base):
+    """Respuestas completadas por (encuesta, grupo de edad, ciudad, barrio, mes)"""
+    __tablename__ = "survey_respondent_rollups"
+
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), primary_key=True)
+    age_group = Column(String(50), primary_key=True)
+    city = Column(String(255), primary_key=True)
+    neighborhood = Column(String(255), primary_key=True)
+    month_key = Column(String(7), primary_key=True)  # "YYYY-MM", "" si no hay fecha
+    response_count = Column(Integer, nullable=False, default=0)
+
+
+class SurveyAnswerRollup(Base):
+    """
+    Contadores de respuestas por (encuesta, pregunta, grupo de edad, mes, métrica, opción).
+
+    metric:
+      - "answers": cantidad de respuestas a la pregunta (option_key vacío)
+      - "vote": votos por opción (option_key = id de la opción)
+      - "rating": calificaciones por valor (option_key = "1".."5")
+      - "percentage": suma de porcentajes asignados (option_key = clave de percentage_data)
+    """
+    __tablename__ = "survey_answer_rollups"
+
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    age_group = Column(String(50), primary_key=True)
+    month_key = Column(String(7), primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    option_key = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0)
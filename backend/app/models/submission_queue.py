@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func, Text, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
+import uuid
+
+from app.db.base import Base
+
+
+class SubmissionQueueItem(Base):
+    """
+    Envío de respuesta encolado (SUBMISSION_INGESTION_MODE=queue).
+    El id es el comprobante que recibe el cliente; los workers lo procesan con
+    SELECT ... FOR UPDATE SKIP LOCKED.
+
+    status: pending, done (response_id asignado) o failed (error)
+    """
+    __tablename__ = "submission_queue"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    survey_id = Column(UUID(as_uuid=True), ForeignKey("surveys.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(JSONB, nullable=False)  # SurveyResponseCreate serializado
+    ip_address = Column(INET)
+    user_agent = Column(Text)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    response_id = Column(UUID(as_uuid=True), ForeignKey("survey_responses.id", ondelete="SET NULL"), nullable=True)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Cola de pendientes en orden de llegada (y conteo para back-pressure)
+        Index(
+            "ix_submission_queue_pending",
+            "created_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, func, Text, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -58,6 +58,11 @@ class Question(Base):
     options = relationship("QuestionOption", back_populates="question", cascade="all, delete-orphan")
     answers = relationship("Answer", back_populates="question")
 
+    # Carga de la encuesta: WHERE survey_id = ? ORDER BY order_index
+    __table_args__ = (
+        Index("ix_questions_survey_order", "survey_id", "order_index"),
+    )
+
 
 class QuestionOption(Base):
     __tablename__ = "question_options"
@@ -71,3 +76,8 @@ class QuestionOption(Base):
     # Relationships
     question = relationship("Question", back_populates="options")
     answers = relationship("Answer", back_populates="option")
+
+    # selectinload de las opciones: WHERE question_id IN (...) ORDER BY order_index
+    __table_args__ = (
+        Index("ix_question_options_question_order", "question_id", "order_index"),
+    )
@@ -27,6 +27,7 @@ class User(Base):
     city = Column(String(255))
     postal_code = Column(String(20))
 
+    tokens_valid_after = Column(DateTime(timezone=True))  # Tokens emitidos antes quedan revocados
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
@@ -50,6 +50,60 @@ class SurveyResponseCreate(BaseModel):
     completed: bool = False
 
 
+class SurveyResponsePatch(BaseModel):
+    """
+    Cambios sobre una respuesta en curso (autoguardado). Las answers de cada
+    pregunta incluida reemplazan a las guardadas; el resto no se toca.
+    """
+    answers: List[AnswerCreate] = []
+    cleared_question_ids: List[UUID] = []  # Preguntas cuya respuesta se borra
+
+
+class SurveyResponsePatchResult(BaseModel):
+    """Resultado de un autoguardado"""
+    id: UUID
+    survey_id: UUID
+    completed: bool
+    updated_questions: int
+    answered_questions: int
+
+
+class BulkSurveyResponseItem(BaseModel):
+    """Una respuesta dentro de un envío masivo"""
+    user_id: UUID
+    answers: List[AnswerCreate] = []
+    completed: bool = True
+    client_ref: Optional[str] = None  # Identificador local del dispositivo
+    # Momento real en que se respondió (offline); se rechaza si está en el futuro
+    # o tiene más de BULK_OFFLINE_MAX_AGE_DAYS
+    completed_at: Optional[datetime] = None
+
+
+class BulkSurveyResponseCreate(BaseModel):
+    """Schema para enviar muchas respuestas de una encuesta en un solo request"""
+    survey_id: UUID
+    responses: List[BulkSurveyResponseItem] = Field(..., min_length=1)
+
+
+class BulkSurveyResponseItemResult(BaseModel):
+    """Resultado de una respuesta del envío masivo"""
+    index: int
+    client_ref: Optional[str] = None
+    success: bool
+    response_id: Optional[UUID] = None
+    points_earned: int = 0
+    error: Optional[str] = None
+
+
+class BulkSurveyResponseResult(BaseModel):
+    """Resultado de un envío masivo"""
+    survey_id: UUID
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkSurveyResponseItemResult]
+
+
 class SurveyResponseResponse(BaseModel):
     """Schema de respuesta para respuesta de encuesta"""
     id: UUID
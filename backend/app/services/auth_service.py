@@ -0,0 +1,168 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func, or_
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import hashlib
+import logging
+import secrets
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.principal import principal_claims, revoke_tokens
+from app.models.account_login import ACCOUNT_MODELS, account_logins
+from app.models.auth_session import AuthSession
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_refresh_token(refresh_token: str) -> str:
+    """SHA-256 del refresh token: es aleatorio y largo, no necesita bcrypt"""
+    return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+
+def _token_response(account_type: str, account_id: UUID, refresh_token: str) -> Dict[str, Any]:
+    """Access token nuevo más el refresh token de la sesión"""
+    return {
+        "access_token": create_access_token(data=principal_claims(account_id, account_type)),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+
+class AuthService:
+    """Servicio de autenticación de cuentas (users, admins y clients)"""
+
+    @staticmethod
+    def find_login(db: Session, identifier: str):
+        """
+        Busca la cuenta de un identificador de login en una sola consulta a la
+        vista account_logins: si contiene @ es un email (admins, clients y
+        users, en ese orden), si no es un CUIL (solo users).
+        Retorna (account_type, id, hashed_password) o None.
+        """
+        login_kind = "email" if "@" in identifier else "cuil"
+        row = db.execute(
+            select(
+                account_logins.c.account_type,
+                account_logins.c.id,
+                account_logins.c.hashed_password
+            ).where(
+                account_logins.c.login == identifier,
+                account_logins.c.login_kind == login_kind
+            ).order_by(account_logins.c.priority).limit(1)
+        ).first()
+        logger.debug("auth.login_lookup kind=%s found=%s account_type=%s",
+                     login_kind, row is not None, row.account_type if row else None)
+        return row
+
+    @staticmethod
+    def update_password_hash(db: Session, account_type: str, account_id: UUID, hashed_password: str):
+        """Reemplaza el hash de la contraseña de una cuenta y hace commit"""
+        model = ACCOUNT_MODELS[account_type]
+        db.query(model).filter(model.id == account_id).update(
+            {model.hashed_password: hashed_password}, synchronize_session=False
+        )
+        db.commit()
+
+    @staticmethod
+    def issue_tokens(db: Session, account_type: str, account_id: UUID) -> Dict[str, Any]:
+        """
+        Abre una sesión nueva (login) y retorna access y refresh token.
+        De paso borra las sesiones vencidas o revocadas de la cuenta. Hace commit.
+        """
+        db.execute(
+            delete(AuthSession).where(
+                AuthSession.account_type == account_type,
+                AuthSession.account_id == account_id,
+                or_(AuthSession.revoked_at.isnot(None), AuthSession.expires_at < func.now())
+            )
+        )
+        refresh_token = secrets.token_urlsafe(32)
+        db.add(AuthSession(
+            account_type=account_type,
+            account_id=account_id,
+            token_hash=_hash_refresh_token(refresh_token),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db.commit()
+        return _token_response(account_type, account_id, refresh_token)
+
+    @staticmethod
+    def refresh(db: Session, refresh_token: str) -> Optional[Dict[str, Any]]:
+        """
+        Rota el refresh token de una sesión vigente y emite un access token
+        nuevo, con un único UPDATE ... RETURNING por el hash del token.
+        Presentar un token ya rotado revoca la sesión (posible robo), salvo
+        dentro de REFRESH_TOKEN_REUSE_GRACE_SECONDS desde la rotación: dos
+        pestañas que renuevan a la vez o un reintento tras perder la respuesta
+        reciben None sin cerrar la sesión.
+        Retorna None si el token no es válido. Hace commit.
+        """
+        token_hash = _hash_refresh_token(refresh_token)
+        new_refresh_token = secrets.token_urlsafe(32)
+        session = db.execute(
+            update(AuthSession).where(
+                AuthSession.token_hash == token_hash,
+                AuthSession.revoked_at.is_(None),
+                AuthSession.expires_at > func.now()
+            ).values(
+                token_hash=_hash_refresh_token(new_refresh_token),
+                previous_token_hash=token_hash,
+                last_used_at=func.now()
+            ).returning(AuthSession.account_type, AuthSession.account_id)
+        ).first()
+
+        if session is None:
+            grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+            reused = db.execute(
+                update(AuthSession).where(
+                    AuthSession.previous_token_hash == token_hash,
+                    AuthSession.revoked_at.is_(None),
+                    AuthSession.last_used_at < func.now() - grace
+                ).values(revoked_at=func.now())
+            )
+            db.commit()
+            if reused.rowcount:
+                logger.warning("auth.refresh_token_reused sessions_revoked=%s", reused.rowcount)
+            return None
+
+        db.commit()
+        return _token_response(session.account_type, session.account_id, new_refresh_token)
+
+    @staticmethod
+    def revoke_session(db: Session, refresh_token: str) -> bool:
+        """Cierra la sesión de un refresh token (logout). Hace commit"""
+        result = db.execute(
+            update(AuthSession).where(
+                AuthSession.token_hash == _hash_refresh_token(refresh_token),
+                AuthSession.revoked_at.is_(None)
+            ).values(revoked_at=func.now())
+        )
+        db.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def revoke_all(db: Session, account_type: str, account_id: UUID) -> int:
+        """
+        Cierra todas las sesiones de la cuenta y revoca sus access tokens ya
+        emitidos (tokens_valid_after y revoke_tokens). Hace commit.
+        Retorna la cantidad de sesiones cerradas.
+        """
+        result = db.execute(
+            update(AuthSession).where(
+                AuthSession.account_type == account_type,
+                AuthSession.account_id == account_id,
+                AuthSession.revoked_at.is_(None)
+            ).values(revoked_at=func.now())
+        )
+        # El corte sale del reloj de la app, el mismo que firma el iat de los tokens
+        cutoff = datetime.now(timezone.utc)
+        model = ACCOUNT_MODELS[account_type]
+        db.query(model).filter(model.id == account_id).update(
+            {model.tokens_valid_after: cutoff}, synchronize_session=False
+        )
+        db.commit()
+        revoke_tokens(account_type, account_id, at=cutoff)
+        return result.rowcount
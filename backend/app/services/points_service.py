@@ -0,0 +1,112 @@
+"""
+Libro de puntos de los usuarios.
+
+Cada acreditación es una sola sentencia: un CTE que hace el upsert de
+user_points (total_points = total_points + n) y el INSERT de la
+PointTransaction, y devuelve el saldo resultante. No hay SELECT previo ni
+read-modify-write en Python, así que envíos concurrentes del mismo usuario no
+pierden actualizaciones; el lock de la fila dura solo hasta el commit.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, List, Tuple
+from uuid import UUID, uuid4
+
+from app.models.points import UserPoints, PointTransaction
+
+# (user_id, puntos, response_id)
+PointsAward = Tuple[UUID, int, Optional[UUID]]
+
+
+def _balance_upsert(rows: List[dict]):
+    """INSERT ... ON CONFLICT (user_id) DO UPDATE que suma puntos al saldo"""
+    stmt = pg_insert(UserPoints).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserPoints.user_id],
+        set_={
+            "total_points": UserPoints.total_points + stmt.excluded.total_points,
+            "available_points": UserPoints.available_points + stmt.excluded.available_points,
+            "updated_at": func.now(),
+        }
+    )
+
+
+class PointsService:
+    """Acredita puntos de forma atómica"""
+
+    @staticmethod
+    def award(
+        db: Session,
+        user_id: UUID,
+        points: int,
+        response_id: Optional[UUID] = None,
+        description: str = "Encuesta completada"
+    ) -> Tuple[int, int]:
+        """
+        Suma puntos al usuario y registra la transacción en un solo round trip.
+        Retorna (total_points, available_points) después de sumar. No hace commit.
+        """
+        balance = _balance_upsert([{
+            "id": uuid4(),
+            "user_id": user_id,
+            "total_points": points,
+            "available_points": points,
+        }]).returning(
+            UserPoints.total_points,
+            UserPoints.available_points
+        ).cte("balance")
+
+        transaction = insert(PointTransaction).values(
+            id=uuid4(),
+            user_id=user_id,
+            transaction_type="earned",
+            amount=points,
+            description=description,
+            related_response_id=response_id,
+        ).returning(PointTransaction.id).cte("point_transaction")
+
+        row = db.execute(
+            select(balance.c.total_points, balance.c.available_points)
+            .add_cte(transaction)
+        ).one()
+        return row.total_points, row.available_points
+
+    @staticmethod
+    def award_many(
+        db: Session,
+        awards: List[PointsAward],
+        description: str = "Encuesta completada"
+    ):
+        """
+        Acredita muchos puntos con un upsert multi-fila (un saldo por usuario)
+        y un INSERT multi-fila de transacciones. No hace commit.
+        """
+        if not awards:
+            return
+
+        points_by_user = {}
+        for user_id, points, _ in awards:
+            points_by_user[user_id] = points_by_user.get(user_id, 0) + points
+
+        # Orden estable de usuarios para evitar deadlocks entre lotes concurrentes
+        db.execute(_balance_upsert([
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "total_points": points,
+                "available_points": points,
+            }
+            for user_id, points in sorted(points_by_user.items(), key=lambda entry: str(entry[0]))
+        ]))
+        db.execute(insert(PointTransaction), [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "transaction_type": "earned",
+                "amount": points,
+                "description": description,
+                "related_response_id": response_id,
+            }
+            for user_id, points, response_id in awards
+        ])
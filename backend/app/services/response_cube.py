@@ -0,0 +1,417 @@
+"""
+Cubo columnar de respuestas para analítica en memoria.
+
+Cada encuesta se carga una vez como arrays de NumPy codificados como enteros
+(respuesta, pregunta, opción, rating, grupo de edad, barrio, mes) más una matriz
+de porcentajes asignados. Los conteos y promedios por (pregunta, edad, mes) se
+obtienen con np.bincount sobre índices planos, sin recorrer filas en Python.
+
+Los cubos se guardan en un cache LRU y se actualizan de forma incremental con
+las respuestas completadas después de la última carga. completed_at puede venir
+del cliente (envíos offline y cola), así que la marca de agua es solo un atajo:
+después de cada actualización se compara la cantidad de respuestas completadas
+con la del cubo, y si faltan se cargan por id. Si el cubo tiene de más (se
+borraron respuestas) se reconstruye. Como el grupo de edad depende de la fecha
+actual, el cubo también se reconstruye al cambiar el día.
+
+Las lecturas y las actualizaciones de un cubo se hacen con su lock tomado, así
+una lectura nunca ve columnas de distinto largo.
+"""
+from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Tuple
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
+from uuid import UUID
+import threading
+
+import numpy as np
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.models.survey import Question
+from app.models.response import SurveyResponse, Answer
+from app.models.user import User
+from app.services.survey_results import (
+    ResultsAccumulator,
+    response_age_group,
+    UNSPECIFIED,
+)
+
+AGE_GROUPS = ["Menor de 18", "18-30", "31-45", "46-60", "60+", UNSPECIFIED]
+AGE_CODES = {age_group: code for code, age_group in enumerate(AGE_GROUPS)}
+
+# Filas leídas por lote al cargar el cubo
+FETCH_BATCH_SIZE = 10000
+
+# Ids por consulta al cargar las respuestas que la marca de agua no trajo
+MISSING_BATCH_SIZE = 1000
+
+# Margen hacia atrás de la marca de agua, para no perder transacciones que
+# hicieron commit después de otras con completed_at posterior
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+class _Vocabulary:
+    """Asigna códigos enteros consecutivos a valores"""
+
+    def __init__(self, values: Optional[List] = None):
+        self.values: List = []
+        self.codes: Dict = {}
+        for value in values or []:
+            self.code(value)
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ResponseCube:
+    """Arrays columnares con las respuestas completadas de una encuesta"""
+
+    def __init__(self, survey_id: UUID, question_ids: List[UUID]):
+        self.survey_id = survey_id
+        self.built_on = date.today()
+        self.lock = threading.Lock()
+
+        self.questions = _Vocabulary(question_ids)
+        self.options = _Vocabulary()
+        self.cities = _Vocabulary()
+        self.neighborhoods = _Vocabulary()
+        self.months = _Vocabulary()
+        self.percentage_keys = _Vocabulary()
+
+        # Marca de agua para la actualización incremental
+        self.watermark: Optional[datetime] = None
+        self.response_codes: Dict[UUID, int] = {}
+
+        # Columnas por respuesta
+        self.resp_age = np.empty(0, dtype=np.int8)
+        self.resp_city = np.empty(0, dtype=np.int32)
+        self.resp_neighborhood = np.empty(0, dtype=np.int32)
+        self.resp_month = np.empty(0, dtype=np.int32)
+
+        # Columnas por answer
+        self.ans_response = np.empty(0, dtype=np.int32)
+        self.ans_question = np.empty(0, dtype=np.int32)
+        self.ans_option = np.empty(0, dtype=np.int32)    # -1 si no hay opción
+        self.ans_rating = np.empty(0, dtype=np.int8)     # 0 si no hay rating
+        self.ans_age = np.empty(0, dtype=np.int8)
+        self.ans_neighborhood = np.empty(0, dtype=np.int32)
+        self.ans_month = np.empty(0, dtype=np.int32)
+        # Porcentajes asignados: una columna por clave de percentage_data, NaN si no aplica
+        self.ans_percentages = np.empty((0, 0), dtype=np.float32)
+
+    @property
+    def total_responses(self) -> int:
+        return len(self.resp_age)
+
+    def refresh(self, db: Session) -> bool:
+        """
+        Agrega al cubo las respuestas completadas después de la marca de agua y
+        las que falten por tener un completed_at anterior. Retorna False si el
+        cubo tiene respuestas que ya no existen y hay que reconstruirlo.
+        """
+        since = self.watermark - REFRESH_OVERLAP if self.watermark is not None else None
+        self._load(db, since=since)
+
+        completed = db.query(func.count(SurveyResponse.id)).filter(
+            SurveyResponse.survey_id == self.survey_id,
+            SurveyResponse.completed == True
+        ).scalar()
+        if completed > self.total_responses:
+            completed_ids = db.query(SurveyResponse.id).filter(
+                SurveyResponse.survey_id == self.survey_id,
+                SurveyResponse.completed == True
+            ).execution_options(yield_per=FETCH_BATCH_SIZE)
+            missing = [row.id for row in completed_ids if row.id not in self.response_codes]
+            for start in range(0, len(missing), MISSING_BATCH_SIZE):
+                self._load(db, response_ids=missing[start:start + MISSING_BATCH_SIZE])
+        return completed == self.total_responses
+
+    def _load(self, db: Session, since: Optional[datetime] = None, response_ids: Optional[List[UUID]] = None):
+        """Agrega las respuestas completadas desde `since`, o las de `response_ids`"""
+        responses_query = db.query(
+            SurveyResponse.id,
+            SurveyResponse.started_at,
+            SurveyResponse.completed_at,
+            User.birth_date,
+            User.city,
+            User.neighborhood,
+        ).join(
+            User, SurveyResponse.user_id == User.id
+        ).filter(
+            SurveyResponse.survey_id == self.survey_id,
+            SurveyResponse.completed == True
+        )
+        answers_query = db.query(
+            Answer.response_id,
+            Answer.question_id,
+            Answer.option_id,
+            Answer.rating,
+            Answer.percentage_data,
+        ).join(
+            SurveyResponse, Answer.response_id == SurveyResponse.id
+        ).filter(
+            SurveyResponse.survey_id == self.survey_id,
+            SurveyResponse.completed == True
+        )
+        if since is not None:
+            responses_query = responses_query.filter(SurveyResponse.completed_at >= since)
+            answers_query = answers_query.filter(SurveyResponse.completed_at >= since)
+        if response_ids is not None:
+            responses_query = responses_query.filter(SurveyResponse.id.in_(response_ids))
+            answers_query = answers_query.filter(SurveyResponse.id.in_(response_ids))
+
+        new_codes = self._append_responses(
+            responses_query.execution_options(yield_per=FETCH_BATCH_SIZE)
+        )
+        if new_codes:
+            self._append_answers(
+                answers_query.execution_options(yield_per=FETCH_BATCH_SIZE),
+                new_codes
+            )
+
+    def _append_responses(self, rows) -> Dict[UUID, int]:
+        """Codifica las respuestas nuevas; retorna {response_id: código}"""
+        new_codes: Dict[UUID, int] = {}
+        ages: List[int] = []
+        cities: List[int] = []
+        neighborhoods: List[int] = []
+        months: List[int] = []
+
+        watermark = self.watermark
+
+        for response_id, started_at, completed_at, birth_date, city, neighborhood in rows:
+            if response_id in self.response_codes:
+                continue
+
+            response_date = started_at or completed_at
+            month_key = response_date.strftime("%Y-%m") if response_date else None
+
+            new_codes[response_id] = len(self.response_codes) + len(new_codes)
+            ages.append(AGE_CODES[response_age_group(birth_date, response_date)])
+            cities.append(self.cities.code(city or UNSPECIFIED))
+            neighborhoods.append(self.neighborhoods.code(neighborhood or UNSPECIFIED))
+            months.append(self.months.code(month_key))
+
+            if completed_at is not None and (watermark is None or completed_at > watermark):
+                watermark = completed_at
+
+        if not new_codes:
+            return new_codes
+
+        self.response_codes.update(new_codes)
+        self.watermark = watermark
+
+        self.resp_age = np.concatenate([self.resp_age, np.array(ages, dtype=np.int8)])
+        self.resp_city = np.concatenate([self.resp_city, np.array(cities, dtype=np.int32)])
+        self.resp_neighborhood = np.concatenate([self.resp_neighborhood, np.array(neighborhoods, dtype=np.int32)])
+        self.resp_month = np.concatenate([self.resp_month, np.array(months, dtype=np.int32)])
+        return new_codes
+
+    def _append_answers(self, rows, new_codes: Dict[UUID, int]):
+        """Codifica las answers de las respuestas nuevas"""
+        responses: List[int] = []
+        questions: List[int] = []
+        options: List[int] = []
+        ratings: List[int] = []
+        percentages: List[Tuple[int, int, float]] = []
+
+        for response_id, question_id, option_id, rating, percentage_data in rows:
+            response_code = new_codes.get(response_id)
+            if response_code is None:
+                continue
+            # Preguntas agregadas después de construir el cubo toman un código nuevo
+            question_code = self.questions.code(question_id)
+
+            row_index = len(responses)
+            responses.append(response_code)
+            questions.append(question_code)
+            options.append(self.options.code(option_id) if option_id else -1)
+            ratings.append(rating or 0)
+
+            if isinstance(percentage_data, dict):
+                for key, value in percentage_data.items():
+                    if value is not None:
+                        percentages.append((row_index, self.percentage_keys.code(str(key)), float(value)))
+
+        if not responses:
+            return
+
+        response_codes = np.array(responses, dtype=np.int32)
+        matrix = np.full((len(responses), len(self.percentage_keys)), np.nan, dtype=np.float32)
+        if percentages:
+            rows_idx, cols_idx, values = zip(*percentages)
+            matrix[np.array(rows_idx), np.array(cols_idx)] = np.array(values, dtype=np.float32)
+
+        # Las claves nuevas agregan columnas NaN a las filas existentes
+        existing = self.ans_percentages
+        if existing.shape[1] < matrix.shape[1]:
+            padding = np.full((existing.shape[0], matrix.shape[1] - existing.shape[1]), np.nan, dtype=np.float32)
+            existing = np.hstack([existing, padding])
+
+        self.ans_response = np.concatenate([self.ans_response, response_codes])
+        self.ans_question = np.concatenate([self.ans_question, np.array(questions, dtype=np.int32)])
+        self.ans_option = np.concatenate([self.ans_option, np.array(options, dtype=np.int32)])
+        self.ans_rating = np.concatenate([self.ans_rating, np.array(ratings, dtype=np.int8)])
+        self.ans_age = np.concatenate([self.ans_age, self.resp_age[response_codes]])
+        self.ans_neighborhood = np.concatenate([self.ans_neighborhood, self.resp_neighborhood[response_codes]])
+        self.ans_month = np.concatenate([self.ans_month, self.resp_month[response_codes]])
+        self.ans_percentages = np.vstack([existing, matrix])
+
+    def _cell_index(self) -> Tuple[np.ndarray, int]:
+        """Índice plano (pregunta, edad, mes) de cada answer y cantidad de celdas"""
+        n_ages, n_months = len(AGE_GROUPS), max(len(self.months), 1)
+        index = (self.ans_question.astype(np.int64) * n_ages + self.ans_age) * n_months + self.ans_month
+        return index, len(self.questions) * n_ages * n_months
+
+    def _unravel(self, flat_index: int) -> Tuple[UUID, str, Optional[str]]:
+        n_ages, n_months = len(AGE_GROUPS), max(len(self.months), 1)
+        question_code, rest = divmod(int(flat_index), n_ages * n_months)
+        age_code, month_code = divmod(rest, n_months)
+        return self.questions.values[question_code], AGE_GROUPS[age_code], self.months.values[month_code]
+
+    def to_accumulator(self) -> ResultsAccumulator:
+        """Reduce el cubo a celdas (pregunta, edad, mes) con np.bincount"""
+        accumulator = ResultsAccumulator()
+        if self.total_responses == 0:
+            return accumulator
+
+        # Demografía: conteo conjunto (edad, ciudad, barrio) y mes actual
+        current_month = self.months.codes.get(datetime.now().strftime("%Y-%m"), -1)
+        n_cities, n_neighborhoods = len(self.cities), len(self.neighborhoods)
+        demographic_index = (
+            self.resp_age.astype(np.int64) * n_cities + self.resp_city
+        ) * n_neighborhoods + self.resp_neighborhood
+        size = len(AGE_GROUPS) * n_cities * n_neighborhoods
+        totals = np.bincount(demographic_index, minlength=size)
+        monthly = np.bincount(demographic_index, weights=(self.resp_month == current_month).astype(np.float64), minlength=size)
+
+        for flat in np.flatnonzero(totals):
+            age_code, rest = divmod(int(flat), n_cities * n_neighborhoods)
+            city_code, neighborhood_code = divmod(rest, n_neighborhoods)
+            accumulator.add_respondents(
+                AGE_GROUPS[age_code],
+                self.cities.values[city_code],
+                self.neighborhoods.values[neighborhood_code],
+                int(totals[flat]),
+                int(monthly[flat])
+            )
+
+        if len(self.ans_question) == 0:
+            return accumulator
+
+        cell_index, n_cells = self._cell_index()
+
+        # Cantidad de answers por celda
+        answers = np.bincount(cell_index, minlength=n_cells)
+        for flat in np.flatnonzero(answers):
+            accumulator.cell(*self._unravel(flat)).answers += int(answers[flat])
+
+        # Votos por (celda, opción)
+        has_option = self.ans_option >= 0
+        if has_option.any():
+            n_options = len(self.options)
+            votes = np.bincount(
+                cell_index[has_option] * n_options + self.ans_option[has_option],
+                minlength=n_cells * n_options
+            )
+            for flat in np.flatnonzero(votes):
+                cell_flat, option_code = divmod(int(flat), n_options)
+                accumulator.cell(*self._unravel(cell_flat)).add_votes(
+                    self.options.values[option_code], int(votes[flat])
+                )
+
+        # Distribución de calificaciones por (celda, rating)
+        has_rating = self.ans_rating > 0
+        if has_rating.any():
+            n_ratings = int(self.ans_rating.max()) + 1
+            ratings = np.bincount(
+                cell_index[has_rating] * n_ratings + self.ans_rating[has_rating],
+                minlength=n_cells * n_ratings
+            )
+            for flat in np.flatnonzero(ratings):
+                cell_flat, rating = divmod(int(flat), n_ratings)
+                accumulator.cell(*self._unravel(cell_flat)).add_ratings(rating, int(ratings[flat]))
+
+        # Suma y cantidad de porcentajes por (celda, clave)
+        for key_code, key in enumerate(self.percentage_keys.values):
+            column = self.ans_percentages[:, key_code]
+            present = ~np.isnan(column)
+            if not present.any():
+                continue
+            sums = np.bincount(cell_index[present], weights=column[present], minlength=n_cells)
+            counts = np.bincount(cell_index[present], minlength=n_cells)
+            for flat in np.flatnonzero(counts):
+                accumulator.cell(*self._unravel(flat)).add_percentages(
+                    key, float(sums[flat]), int(counts[flat])
+                )
+
+        return accumulator
+
+
+class ResponseCubeCache:
+    """Cache LRU de cubos por encuesta"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._cubes: "OrderedDict[UUID, ResponseCube]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(db: Session, survey_id: UUID) -> ResponseCube:
+        question_ids = [
+            row.id for row in db.query(Question.id).filter(
+                Question.survey_id == survey_id
+            ).order_by(Question.order_index).all()
+        ]
+        return ResponseCube(survey_id, question_ids)
+
+    def _store(self, survey_id: UUID, cube: ResponseCube):
+        with self._lock:
+            self._cubes[survey_id] = cube
+            self._cubes.move_to_end(survey_id)
+            while len(self._cubes) > self.max_size:
+                self._cubes.popitem(last=False)
+
+    def accumulate(self, db: Session, survey_id: UUID) -> ResultsAccumulator:
+        """
+        Resultados de la encuesta desde su cubo, construyéndolo o actualizándolo
+        si hace falta. El acumulador se arma con el lock del cubo tomado.
+        """
+        with self._lock:
+            cube = self._cubes.get(survey_id)
+            if cube is not None and cube.built_on != date.today():
+                cube = None
+        if cube is None:
+            cube = self._build(db, survey_id)
+        self._store(survey_id, cube)
+
+        with cube.lock:
+            if cube.refresh(db):
+                return cube.to_accumulator()
+
+        # Se borraron respuestas: reconstruir desde cero
+        cube = self._build(db, survey_id)
+        with cube.lock:
+            cube.refresh(db)
+            self._store(survey_id, cube)
+            return cube.to_accumulator()
+
+    def invalidate(self, survey_id: Optional[UUID] = None):
+        """Descarta el cubo de una encuesta (o todos)"""
+        with self._lock:
+            if survey_id is None:
+                self._cubes.clear()
+            else:
+                self._cubes.pop(survey_id, None)
+
+
+response_cubes = ResponseCubeCache(settings.RESULTS_CUBE_CACHE_SIZE)
@@ -0,0 +1,328 @@
+"""
+Agregados incrementales de resultados por encuesta.
+
+submit_response suma cada respuesta completada a las tablas de rollup en la
+misma transacción (INSERT ... ON CONFLICT DO UPDATE SET count = count + n), de
+modo que leer los resultados cuesta O(celdas) en lugar de O(respuestas).
+
+El grupo de edad es la edad del encuestado a la fecha de la respuesta
+(response_age_group), igual que en el recálculo y los demás motores, así que
+no cambia cuando cumple años. check_consistency compara los rollups contra un
+recálculo completo y rebuild los regenera.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from typing import Optional, List, Dict, Any, Tuple, Iterable
+from datetime import datetime
+from uuid import UUID
+
+from app.models.user import User
+from app.models.rollup import SurveyRespondentRollup, SurveyAnswerRollup
+from app.services.survey_results import (
+    ResultsAccumulator,
+    SurveyResultsAggregator,
+    response_age_group,
+    UNSPECIFIED,
+)
+
+# Filas por sentencia INSERT, para acotar la cantidad de parámetros
+UPSERT_CHUNK_SIZE = 1000
+
+# (age_group, city, neighborhood, month_key)
+RespondentKey = Tuple[str, str, str, str]
+# (question_id, age_group, month_key, metric, option_key)
+AnswerKey = Tuple[UUID, str, str, str, str]
+
+
+def _answer_metrics(answer) -> Iterable[Tuple[str, str, float]]:
+    """Métricas (metric, option_key, valor) que aporta una respuesta individual"""
+    yield "answers", "", 0.0
+    if answer.option_id:
+        yield "vote", str(answer.option_id), 0.0
+    if answer.rating is not None:
+        yield "rating", str(answer.rating), 0.0
+    if isinstance(answer.percentage_data, dict):
+        for key, value in answer.percentage_data.items():
+            if value is not None:
+                yield "percentage", str(key), float(value)
+
+
+class SurveyRollupService:
+    """Mantiene y lee los rollups de resultados de encuestas"""
+
+    @staticmethod
+    def record_responses(
+        db: Session,
+        survey_id: UUID,
+        responses: List[Tuple[UUID, List[Any], Optional[datetime]]]
+    ):
+        """
+        Suma respuestas completadas a los rollups de la encuesta.
+        `responses` es una lista de (user_id, answers, answered_at), donde
+        answered_at es el started_at de la respuesta (None: ahora). El mes y el
+        grupo de edad salen de esa fecha; no hace commit.
+        """
+        if not responses:
+            return
+
+        now = datetime.now()
+
+        # Datos demográficos de los usuarios en una sola consulta
+        user_ids = {user_id for user_id, _, _ in responses}
+        demographics = {
+            row.id: row
+            for row in db.query(
+                User.id, User.birth_date, User.city, User.neighborhood
+            ).filter(User.id.in_(user_ids)).all()
+        }
+
+        respondent_deltas: Dict[RespondentKey, int] = {}
+        answer_deltas: Dict[AnswerKey, List[float]] = {}
+
+        for user_id, answers, answered_at in responses:
+            answered_at = answered_at or now
+            month_key = answered_at.strftime("%Y-%m")
+            user = demographics.get(user_id)
+            if user:
+                age_group = response_age_group(user.birth_date, answered_at)
+                city = user.city or UNSPECIFIED
+                neighborhood = user.neighborhood or UNSPECIFIED
+            else:
+                age_group = city = neighborhood = UNSPECIFIED
+            respondent_key = (age_group, city, neighborhood, month_key)
+            respondent_deltas[respondent_key] = respondent_deltas.get(respondent_key, 0) + 1
+
+            for answer in answers:
+                for metric, option_key, value in _answer_metrics(answer):
+                    key = (answer.question_id, age_group, month_key, metric, option_key)
+                    delta = answer_deltas.setdefault(key, [0, 0.0])
+                    delta[0] += 1
+                    delta[1] += value
+
+        SurveyRollupService._upsert(db, survey_id, respondent_deltas, answer_deltas)
+
+    @staticmethod
+    def _upsert(
+        db: Session,
+        survey_id: UUID,
+        respondent_deltas: Dict[RespondentKey, int],
+        answer_deltas: Dict[AnswerKey, List[float]]
+    ):
+        """Incrementa los contadores con un upsert multi-fila por tabla"""
+        # Orden estable de claves para evitar deadlocks entre transacciones concurrentes
+        if respondent_deltas:
+            rows = [
+                {
+                    "survey_id": survey_id,
+                    "age_group": age_group,
+                    "city": city,
+                    "neighborhood": neighborhood,
+                    "month_key": month_key,
+                    "response_count": count,
+                }
+                for (age_group, city, neighborhood, month_key), count in sorted(respondent_deltas.items())
+            ]
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                stmt = insert(SurveyRespondentRollup).values(rows[start:start + UPSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        SurveyRespondentRollup.survey_id,
+                        SurveyRespondentRollup.age_group,
+                        SurveyRespondentRollup.city,
+                        SurveyRespondentRollup.neighborhood,
+                        SurveyRespondentRollup.month_key,
+                    ],
+                    set_={
+                        "response_count": SurveyRespondentRollup.response_count + stmt.excluded.response_count
+                    }
+                )
+                db.execute(stmt)
+
+        if answer_deltas:
+            rows = [
+                {
+                    "survey_id": survey_id,
+                    "question_id": question_id,
+                    "age_group": age_group,
+                    "month_key": month_key,
+                    "metric": metric,
+                    "option_key": option_key,
+                    "count": count,
+                    "value_sum": value_sum,
+                }
+                for (question_id, age_group, month_key, metric, option_key), (count, value_sum)
+                in sorted(answer_deltas.items(), key=lambda item: (str(item[0][0]),) + item[0][1:])
+            ]
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                stmt = insert(SurveyAnswerRollup).values(rows[start:start + UPSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        SurveyAnswerRollup.survey_id,
+                        SurveyAnswerRollup.question_id,
+                        SurveyAnswerRollup.age_group,
+                        SurveyAnswerRollup.month_key,
+                        SurveyAnswerRollup.metric,
+                        SurveyAnswerRollup.option_key,
+                    ],
+                    set_={
+                        "count": SurveyAnswerRollup.count + stmt.excluded.count,
+                        "value_sum": SurveyAnswerRollup.value_sum + stmt.excluded.value_sum,
+                    }
+                )
+                db.execute(stmt)
+
+    @staticmethod
+    def load(db: Session, survey_id: UUID) -> ResultsAccumulator:
+        """Lee los rollups de la encuesta en un ResultsAccumulator"""
+        accumulator = ResultsAccumulator()
+        current_month = datetime.now().strftime("%Y-%m")
+
+        respondent_rows = db.query(SurveyRespondentRollup).filter(
+            SurveyRespondentRollup.survey_id == survey_id
+        ).all()
+        for row in respondent_rows:
+            accumulator.add_respondents(
+                row.age_group,
+                row.city,
+                row.neighborhood,
+                row.response_count,
+                row.response_count if row.month_key == current_month else 0
+            )
+
+        if accumulator.total_responses == 0:
+            return accumulator
+
+        answer_rows = db.query(SurveyAnswerRollup).filter(
+            SurveyAnswerRollup.survey_id == survey_id
+        ).all()
+        for row in answer_rows:
+            cell = accumulator.cell(row.question_id, row.age_group, row.month_key or None)
+            if row.metric == "answers":
+                cell.answers += row.count
+            elif row.metric == "vote":
+                cell.add_votes(UUID(row.option_key), row.count)
+            elif row.metric == "rating":
+                cell.add_ratings(int(row.option_key), row.count)
+            elif row.metric == "percentage":
+                cell.add_percentages(row.option_key, row.value_sum, row.count)
+
+        return accumulator
+
+    @staticmethod
+    def _recompute(
+        db: Session,
+        survey_id: UUID
+    ) -> Tuple[Dict[RespondentKey, int], Dict[AnswerKey, List[float]]]:
+        """Recalcula las filas de rollup desde survey_responses y answers"""
+        respondents = SurveyResultsAggregator.respondents_subquery(db, survey_id)
+        month_key = func.coalesce(respondents.c.month_key, "")
+
+        respondent_deltas: Dict[RespondentKey, int] = {
+            (age_group, city, neighborhood, month): count
+            for age_group, city, neighborhood, month, count in db.query(
+                respondents.c.age_group,
+                respondents.c.city,
+                respondents.c.neighborhood,
+                month_key,
+                func.count(),
+            ).group_by(
+                respondents.c.age_group,
+                respondents.c.city,
+                respondents.c.neighborhood,
+                month_key,
+            ).all()
+        }
+
+        accumulator = SurveyResultsAggregator.aggregate(db, survey_id)
+        answer_deltas: Dict[AnswerKey, List[float]] = {}
+        for question_id, question_cells in accumulator.cells.items():
+            for (age_group, month), cell in question_cells.items():
+                prefix = (question_id, age_group, month or "")
+                if cell.answers:
+                    answer_deltas[prefix + ("answers", "")] = [cell.answers, 0.0]
+                for option_id, count in cell.votes.items():
+                    answer_deltas[prefix + ("vote", str(option_id))] = [count, 0.0]
+                for rating, count in cell.ratings.items():
+                    answer_deltas[prefix + ("rating", str(rating))] = [count, 0.0]
+                for key, (total, count) in cell.percentages.items():
+                    answer_deltas[prefix + ("percentage", key)] = [count, total]
+
+        return respondent_deltas, answer_deltas
+
+    @staticmethod
+    def _stored(
+        db: Session,
+        survey_id: UUID
+    ) -> Tuple[Dict[RespondentKey, int], Dict[AnswerKey, List[float]]]:
+        """Filas de rollup guardadas para la encuesta"""
+        respondent_rows = {
+            (row.age_group, row.city, row.neighborhood, row.month_key): row.response_count
+            for row in db.query(SurveyRespondentRollup).filter(
+                SurveyRespondentRollup.survey_id == survey_id
+            ).all()
+        }
+        answer_rows = {
+            (row.question_id, row.age_group, row.month_key, row.metric, row.option_key): [row.count, row.value_sum]
+            for row in db.query(SurveyAnswerRollup).filter(
+                SurveyAnswerRollup.survey_id == survey_id
+            ).all()
+        }
+        return respondent_rows, answer_rows
+
+    @staticmethod
+    def check_consistency(db: Session, survey_id: UUID, tolerance: float = 0.01) -> List[Dict[str, Any]]:
+        """
+        Compara los rollups contra un recálculo completo.
+        Retorna la lista de diferencias (vacía si son consistentes).
+        """
+        stored_respondents, stored_answers = SurveyRollupService._stored(db, survey_id)
+        expected_respondents, expected_answers = SurveyRollupService._recompute(db, survey_id)
+
+        differences = []
+
+        for key in sorted(set(stored_respondents) | set(expected_respondents)):
+            stored = stored_respondents.get(key, 0)
+            expected = expected_respondents.get(key, 0)
+            if stored != expected:
+                differences.append({
+                    "table": SurveyRespondentRollup.__tablename__,
+                    "key": list(key),
+                    "stored": stored,
+                    "expected": expected,
+                })
+
+        for key in sorted(set(stored_answers) | set(expected_answers), key=lambda k: (str(k[0]),) + k[1:]):
+            stored_count, stored_sum = stored_answers.get(key, (0, 0.0))
+            expected_count, expected_sum = expected_answers.get(key, (0, 0.0))
+            if stored_count != expected_count or abs(stored_sum - expected_sum) > tolerance:
+                differences.append({
+                    "table": SurveyAnswerRollup.__tablename__,
+                    "key": [str(key[0])] + list(key[1:]),
+                    "stored": {"count": stored_count, "value_sum": stored_sum},
+                    "expected": {"count": expected_count, "value_sum": expected_sum},
+                })
+
+        return differences
+
+    @staticmethod
+    def rebuild(db: Session, survey_id: UUID):
+        """
+        Regenera los rollups de la encuesta desde cero y hace commit.
+        Bloquea las tablas de rollup para que los envíos concurrentes esperen
+        y se sumen después del recálculo.
+        """
+        db.execute(text(
+            "LOCK TABLE survey_respondent_rollups, survey_answer_rollups IN SHARE ROW EXCLUSIVE MODE"
+        ))
+        respondent_deltas, answer_deltas = SurveyRollupService._recompute(db, survey_id)
+
+        db.query(SurveyRespondentRollup).filter(
+            SurveyRespondentRollup.survey_id == survey_id
+        ).delete(synchronize_session=False)
+        db.query(SurveyAnswerRollup).filter(
+            SurveyAnswerRollup.survey_id == survey_id
+        ).delete(synchronize_session=False)
+
+        SurveyRollupService._upsert(db, survey_id, respondent_deltas, answer_deltas)
+        db.commit()
@@ -0,0 +1,243 @@
+"""
+Ingesta diferida de respuestas (SUBMISSION_INGESTION_MODE=queue).
+
+El endpoint valida el envío, lo agrega a la tabla submission_queue y responde
+202 con un comprobante. Los workers toman lotes de pendientes con
+SELECT ... FOR UPDATE SKIP LOCKED (varios workers no se pisan), los agrupan
+por encuesta y los persisten con SurveyService.persist_responses_bulk en la
+misma transacción que marca los ítems como procesados.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from pydantic import ValidationError
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from uuid import UUID
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.submission_queue import SubmissionQueueItem
+from app.schemas.response import SurveyResponseCreate, BulkSurveyResponseItem
+from app.services.survey_service import SurveyService
+
+logger = logging.getLogger(__name__)
+
+# Segundos durante los que se reutiliza el conteo de pendientes
+PENDING_COUNT_TTL = 1.0
+
+# Segundos entre purgas de comprobantes procesados
+PURGE_INTERVAL = 300
+
+
+class SubmissionQueueService:
+    """Encola envíos de respuestas y los persiste en lotes"""
+
+    _pending_count = 0
+    _pending_counted_at = 0.0
+    _pending_lock = threading.Lock()
+
+    @staticmethod
+    def pending_count(db: Session) -> int:
+        """Cantidad de envíos pendientes (cacheada PENDING_COUNT_TTL segundos)"""
+        cls = SubmissionQueueService
+        with cls._pending_lock:
+            if time.monotonic() - cls._pending_counted_at < PENDING_COUNT_TTL:
+                return cls._pending_count
+        count = db.query(func.count(SubmissionQueueItem.id)).filter(
+            SubmissionQueueItem.status == "pending"
+        ).scalar()
+        with cls._pending_lock:
+            cls._pending_count = count
+            cls._pending_counted_at = time.monotonic()
+        return count
+
+    @staticmethod
+    def is_full(db: Session) -> bool:
+        """Indica si la cola superó el umbral de back-pressure"""
+        return SubmissionQueueService.pending_count(db) >= settings.SUBMISSION_QUEUE_MAX_PENDING
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        response_data: SurveyResponseCreate,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> SubmissionQueueItem:
+        """Agrega un envío ya validado a la cola y hace commit"""
+        item = SubmissionQueueItem(
+            survey_id=response_data.survey_id,
+            user_id=response_data.user_id,
+            payload=response_data.model_dump(mode="json"),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        db.add(item)
+        db.commit()
+        return item
+
+    @staticmethod
+    def get_receipt(db: Session, receipt_id: UUID) -> Optional[SubmissionQueueItem]:
+        """Obtiene un envío encolado por su comprobante"""
+        return db.query(SubmissionQueueItem).filter(SubmissionQueueItem.id == receipt_id).first()
+
+    @staticmethod
+    def drain(db: Session, batch_size: Optional[int] = None) -> int:
+        """
+        Procesa un lote de envíos pendientes y hace commit.
+        Retorna la cantidad de ítems tomados (0 si la cola está vacía).
+        """
+        batch_size = batch_size or settings.SUBMISSION_QUEUE_BATCH_SIZE
+        items = db.query(SubmissionQueueItem).filter(
+            SubmissionQueueItem.status == "pending"
+        ).order_by(
+            SubmissionQueueItem.created_at
+        ).limit(batch_size).with_for_update(skip_locked=True).all()
+
+        if not items:
+            db.rollback()
+            return 0
+
+        by_survey: Dict[UUID, List[SubmissionQueueItem]] = {}
+        for item in items:
+            by_survey.setdefault(item.survey_id, []).append(item)
+
+        now = datetime.now()
+        completed_surveys = set()
+
+        for survey_id, survey_items in by_survey.items():
+            results = SubmissionQueueService._persist_batch(db, survey_id, survey_items)
+            if results is None and len(survey_items) > 1:
+                # Un ítem con un error inesperado no debe gastar los intentos del
+                # resto del lote: se reintenta de a uno
+                results = [
+                    (SubmissionQueueService._persist_batch(db, survey_id, [item]) or [None])[0]
+                    for item in survey_items
+                ]
+            elif results is None:
+                results = [None]
+
+            for item, result in zip(survey_items, results):
+                item.attempts += 1
+                if result is None:
+                    if item.attempts >= settings.SUBMISSION_QUEUE_MAX_ATTEMPTS:
+                        item.status = "failed"
+                        item.error = "Error al procesar la respuesta"
+                        item.processed_at = now
+                    continue
+
+                item.processed_at = now
+                if result["success"]:
+                    item.status = "done"
+                    item.response_id = result["response_id"]
+                    if item.payload.get("completed"):
+                        completed_surveys.add(survey_id)
+                else:
+                    item.status = "failed"
+                    item.error = result["error"]
+
+        db.commit()
+
+        for survey_id in completed_surveys:
+            SurveyService.invalidate_results_cache(survey_id)
+        return len(items)
+
+    @staticmethod
+    def _persist_batch(
+        db: Session,
+        survey_id: UUID,
+        items: List[SubmissionQueueItem]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Persiste los ítems de una encuesta en un savepoint. Retorna un resultado
+        por ítem, o None si falló por un error inesperado (se deshace el lote).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        positions, bulk_items, sources = [], [], []
+        for index, item in enumerate(items):
+            try:
+                data = SurveyResponseCreate.model_validate(item.payload)
+            except ValidationError:
+                # El payload se validó al encolarlo: solo falla si cambió el schema
+                results[index] = {"success": False, "error": "Envío inválido", "response_id": None}
+                continue
+            positions.append(index)
+            bulk_items.append(BulkSurveyResponseItem(
+                user_id=data.user_id,
+                answers=data.answers,
+                completed=data.completed,
+                client_ref=str(item.id),
+                completed_at=item.created_at,
+            ))
+            sources.append((item.ip_address and str(item.ip_address), item.user_agent))
+        if not bulk_items:
+            return results
+
+        savepoint = db.begin_nested()
+        try:
+            persisted = SurveyService.persist_responses_bulk(db, survey_id, bulk_items, sources)
+            savepoint.commit()
+        except ValueError as e:
+            # La encuesta ya no existe o se desactivó: no tiene sentido reintentar
+            savepoint.rollback()
+            persisted = [{"success": False, "error": str(e), "response_id": None}] * len(bulk_items)
+        except Exception:
+            savepoint.rollback()
+            logger.exception("submission_queue.batch_failed survey_id=%s items=%s", survey_id, len(items))
+            return None
+
+        for index, result in zip(positions, persisted):
+            results[index] = result
+        return results
+
+    @staticmethod
+    def purge(db: Session, retention: Optional[timedelta] = None) -> int:
+        """Borra los comprobantes procesados más viejos que la retención"""
+        retention = retention or timedelta(hours=settings.SUBMISSION_QUEUE_RETENTION_HOURS)
+        deleted = db.query(SubmissionQueueItem).filter(
+            SubmissionQueueItem.status != "pending",
+            SubmissionQueueItem.processed_at < datetime.now() - retention
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+
+def receipt_payload(item: SubmissionQueueItem) -> Dict[str, Any]:
+    """Estado de un comprobante para el cliente"""
+    return {
+        "receipt_id": str(item.id),
+        "survey_id": str(item.survey_id),
+        "status": item.status,
+        "response_id": str(item.response_id) if item.response_id else None,
+        "error": item.error,
+        "created_at": item.created_at,
+        "processed_at": item.processed_at,
+    }
+
+
+def run_worker(stop_event: threading.Event, poll_seconds: Optional[float] = None):
+    """
+    Procesa la cola hasta que se active stop_event. Mientras haya pendientes
+    drena lotes seguidos; con la cola vacía espera poll_seconds (y cada
+    PURGE_INTERVAL segundos purga comprobantes viejos).
+    """
+    poll_seconds = poll_seconds or settings.SUBMISSION_QUEUE_POLL_SECONDS
+    last_purge = time.monotonic()
+    while not stop_event.is_set():
+        db = SessionLocal()
+        try:
+            processed = SubmissionQueueService.drain(db)
+            if processed == 0 and time.monotonic() - last_purge >= PURGE_INTERVAL:
+                SubmissionQueueService.purge(db)
+                last_purge = time.monotonic()
+        except Exception:
+            db.rollback()
+            logger.exception("submission_queue.worker_error")
+            processed = 0
+        finally:
+            db.close()
+
+        if processed == 0:
+            stop_event.wait(poll_seconds)
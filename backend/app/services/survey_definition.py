@@ -0,0 +1,217 @@
+"""
+Definición compilada e inmutable de una encuesta para el envío de respuestas.
+
+Se carga una vez por encuesta (encuesta, preguntas y opciones en una sola
+consulta) y se guarda en un cache LRU en proceso con TTL. Con ella
+submit_response valida y puntúa las answers sin volver a consultar la base.
+
+Cada entrada lleva la versión de la encuesta guardada en el cache compartido;
+invalidate borra esa versión, así que un cambio hecho en otro worker (por
+ejemplo activar o desactivar la encuesta) se ve en todos en cuanto expira el
+tier local del cache (CACHE_LOCAL_TTL_SECONDS), no al vencer el TTL.
+"""
+from sqlalchemy.orm import Session, joinedload
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from collections import OrderedDict
+from types import MappingProxyType
+from uuid import UUID, uuid4
+import threading
+import time
+
+from app.core.cache import cache, cache_key
+from app.core.config import settings
+from app.models.survey import Survey, Question, QuestionType
+
+
+class _Frozen:
+    """Base para objetos que no se pueden modificar después de construidos"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+
+class CompiledQuestion(_Frozen):
+    """Pregunta compilada con sus opciones y su validador"""
+
+    __slots__ = ("id", "question_type", "is_required", "option_values")
+
+    def __init__(self, question: Question):
+        self._init(
+            id=question.id,
+            question_type=question.question_type,
+            is_required=question.is_required,
+            # option_id -> option_value
+            option_values=MappingProxyType({opt.id: opt.option_value for opt in question.options}),
+        )
+
+    @property
+    def allows_multiple_answers(self) -> bool:
+        return self.question_type == QuestionType.MULTIPLE_CHOICE
+
+    def validate(self, answer) -> Optional[str]:
+        """Retorna el error de la answer para esta pregunta, o None si es válida"""
+        if answer.option_id is not None:
+            if self.question_type not in (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE):
+                return f"La pregunta {self.id} no admite opciones"
+            if answer.option_id not in self.option_values:
+                return f"La opción {answer.option_id} no pertenece a la pregunta {self.id}"
+
+        if answer.rating is not None and self.question_type != QuestionType.RATING:
+            return f"La pregunta {self.id} no admite calificación"
+
+        if answer.percentage_data is not None:
+            if self.question_type != QuestionType.PERCENTAGE_DISTRIBUTION:
+                return f"La pregunta {self.id} no admite distribución porcentual"
+            # Las claves son ids de opción (o option_value en datos anteriores)
+            valid_keys = {str(option_id) for option_id in self.option_values}
+            valid_keys.update(value for value in self.option_values.values() if value)
+            unknown = [key for key in answer.percentage_data if key not in valid_keys]
+            if unknown:
+                return f"Claves de distribución inválidas para la pregunta {self.id}: {', '.join(unknown)}"
+
+        return None
+
+
+class CompiledSurvey(_Frozen):
+    """Definición inmutable de una encuesta: preguntas, opciones y reglas de puntaje"""
+
+    __slots__ = (
+        "id", "client_id", "status", "is_active", "expires_at",
+        "points_per_question", "bonus_points", "max_responses_per_user",
+        "questions", "required_question_ids", "option_values", "compiled_at",
+    )
+
+    def __init__(self, survey: Survey):
+        questions = {question.id: CompiledQuestion(question) for question in survey.questions}
+        option_values: Dict[UUID, Optional[str]] = {}
+        for question in questions.values():
+            option_values.update(question.option_values)
+
+        self._init(
+            id=survey.id,
+            client_id=survey.client_id,
+            status=survey.status,
+            is_active=survey.is_active,
+            expires_at=survey.expires_at,
+            points_per_question=survey.points_per_question,
+            bonus_points=survey.bonus_points,
+            max_responses_per_user=survey.max_responses_per_user or 0,
+            questions=MappingProxyType(questions),
+            required_question_ids=frozenset(q.id for q in questions.values() if q.is_required),
+            # option_id -> option_value de todas las preguntas
+            option_values=MappingProxyType(option_values),
+            compiled_at=time.monotonic(),
+        )
+
+    def validate_answers(self, answers: Iterable[Any]) -> Optional[str]:
+        """Retorna el primer error de las answers, o None si todas son válidas"""
+        answered = set()
+        chosen_options = set()
+        for answer in answers:
+            question = self.questions.get(answer.question_id)
+            if question is None:
+                return f"La pregunta {answer.question_id} no pertenece a la encuesta"
+            if answer.question_id in answered and not question.allows_multiple_answers:
+                return f"La pregunta {answer.question_id} tiene más de una respuesta"
+            answered.add(answer.question_id)
+
+            # Una fila por opción (answers uq_answers_response_question_option)
+            if (answer.question_id, answer.option_id) in chosen_options:
+                return f"La pregunta {answer.question_id} tiene la misma respuesta repetida"
+            chosen_options.add((answer.question_id, answer.option_id))
+
+            error = question.validate(answer)
+            if error:
+                return error
+        return None
+
+    def score(self, answers: List[Any], completed: bool) -> int:
+        """
+        Puntos por las answers: points_per_question por respuesta y bonus si
+        completó al menos tantas respuestas como preguntas requeridas.
+        """
+        questions_answered = len(answers)
+        points = questions_answered * self.points_per_question
+        if completed and questions_answered >= len(self.required_question_ids):
+            points += self.bonus_points
+        return points
+
+
+class SurveyDefinitionCache:
+    """Cache LRU con TTL de encuestas compiladas"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # survey_id -> (versión, encuesta compilada)
+        self._surveys: "OrderedDict[UUID, Tuple[str, CompiledSurvey]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version_key(survey_id: UUID) -> str:
+        return cache_key("survey-definition-version", survey_id)
+
+    def version(self, survey_id: UUID) -> str:
+        """Versión compartida de la encuesta; si no hay, la crea (solo usa el cache)"""
+        key = self._version_key(survey_id)
+        version = cache.get(key)
+        if version is None:
+            version = uuid4().hex
+            # Si otro worker la creó primero, gana la suya
+            if not cache.add(key, version, ttl=settings.CACHE_SURVEY_TTL_SECONDS):
+                version = cache.get(key) or version
+        return version
+
+    def get(self, db: Session, survey_id: UUID, version: Optional[str] = None) -> Optional[CompiledSurvey]:
+        """
+        Obtiene la encuesta compilada, cargándola si no está, venció o cambió su
+        versión. Los endpoints async pasan la versión leída fuera del event loop,
+        así get solo toca la base.
+        """
+        version = version or self.version(survey_id)
+        with self._lock:
+            entry = self._surveys.get(survey_id)
+            if entry is not None:
+                cached_version, compiled = entry
+                if cached_version == version and time.monotonic() - compiled.compiled_at < self.ttl_seconds:
+                    self._surveys.move_to_end(survey_id)
+                    return compiled
+
+        survey = db.query(Survey).options(
+            joinedload(Survey.questions).joinedload(Question.options)
+        ).filter(Survey.id == survey_id).first()
+        if survey is None:
+            return None
+
+        compiled = CompiledSurvey(survey)
+        with self._lock:
+            self._surveys[survey_id] = (version, compiled)
+            self._surveys.move_to_end(survey_id)
+            while len(self._surveys) > self.max_size:
+                self._surveys.popitem(last=False)
+        return compiled
+
+    def invalidate(self, survey_id: Optional[UUID] = None):
+        """
+        Descarta la encuesta compilada en todos los workers (borrando su versión
+        compartida), o todas las de este proceso si no se pasa survey_id.
+        """
+        with self._lock:
+            if survey_id is None:
+                self._surveys.clear()
+            else:
+                self._surveys.pop(survey_id, None)
+        if survey_id is not None:
+            cache.delete(self._version_key(survey_id))
+
+
+survey_definitions = SurveyDefinitionCache(
+    settings.SURVEY_DEFINITION_CACHE_SIZE,
+    settings.SURVEY_DEFINITION_TTL_SECONDS
+)
@@ -0,0 +1,738 @@
+"""
+Motor de agregación de resultados de encuestas.
+
+Los resultados se acumulan en celdas (pregunta, grupo de edad, mes) que luego
+SurveyService convierte en el payload que consumen el dashboard y ai_insights.
+Las celdas se calculan con consultas agrupadas en PostgreSQL, de modo que el
+costo en memoria depende de la cantidad de celdas y no de la cantidad de
+respuestas.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, Float, true, cast
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from datetime import datetime, date, timedelta
+from uuid import UUID
+
+from app.models.survey import Question, QuestionType
+from app.models.response import SurveyResponse, Answer
+from app.models.user import User
+
+UNSPECIFIED = "Sin especificar"
+
+# Grupos de edad que se muestran en la evolución histórica
+EVOLUTION_AGE_GROUPS = ["18-30", "31-45", "46-60", "60+"]
+
+MONTH_NAMES = {
+    "01": "Ene", "02": "Feb", "03": "Mar", "04": "Abr",
+    "05": "May", "06": "Jun", "07": "Jul", "08": "Ago",
+    "09": "Sep", "10": "Oct", "11": "Nov", "12": "Dic"
+}
+
+
+def calculate_age(birth_date: Optional[date], on: Optional[date] = None) -> Optional[int]:
+    """Calcula la edad en años cumplidos a la fecha `on` (por defecto, hoy)"""
+    if not birth_date:
+        return None
+    on = on or date.today()
+    return on.year - birth_date.year - ((on.month, on.day) < (birth_date.month, birth_date.day))
+
+
+def get_age_group(age: Optional[int]) -> str:
+    """Agrupa una edad en los rangos del dashboard"""
+    if age is None:
+        return UNSPECIFIED
+    if age < 18:
+        return "Menor de 18"
+    elif age < 31:
+        return "18-30"
+    elif age < 46:
+        return "31-45"
+    elif age < 61:
+        return "46-60"
+    else:
+        return "60+"
+
+
+def response_age_group(birth_date: Optional[date], answered_at: Optional[datetime]) -> str:
+    """
+    Grupo de edad del encuestado a la fecha de la respuesta (started_at, o
+    completed_at si falta; hoy si no tiene ninguna). Es la única definición
+    que usan los rollups, el recálculo y todos los motores de resultados: no
+    cambia con el tiempo, así que los rollups no quedan desfasados cuando el
+    encuestado cumple años.
+    """
+    return get_age_group(calculate_age(birth_date, answered_at.date() if answered_at else None))
+
+
+def response_date_expression():
+    """Fecha de la respuesta en SQL: started_at, o completed_at si falta"""
+    return func.coalesce(SurveyResponse.started_at, SurveyResponse.completed_at)
+
+
+def age_group_expression(birth_date_column):
+    """Expresión SQL equivalente a response_age_group(birth_date, fecha de la respuesta)"""
+    age = func.date_part(
+        "year",
+        func.age(func.coalesce(response_date_expression(), func.current_date()), birth_date_column)
+    )
+    return case(
+        (birth_date_column.is_(None), UNSPECIFIED),
+        (age < 18, "Menor de 18"),
+        (age < 31, "18-30"),
+        (age < 46, "31-45"),
+        (age < 61, "46-60"),
+        else_="60+"
+    )
+
+
+def unspecified_if_empty(column):
+    """Expresión SQL equivalente a `valor or "Sin especificar"`"""
+    return func.coalesce(func.nullif(column, ""), UNSPECIFIED)
+
+
+def month_expression():
+    """Mes (YYYY-MM) de la respuesta, igual que en la evolución histórica"""
+    return func.to_char(response_date_expression(), "YYYY-MM")
+
+
+# Granularidades de la serie temporal (unidades válidas de date_trunc)
+TIMESERIES_GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_expression(granularity: str):
+    """Inicio del período (YYYY-MM-DD) de completed_at truncado con date_trunc"""
+    return func.to_char(
+        func.date_trunc(granularity, SurveyResponse.completed_at),
+        "YYYY-MM-DD"
+    )
+
+
+def truncate_date(value: date, granularity: str) -> date:
+    """Equivalente en Python de date_trunc para day, week (lunes) y month"""
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    return value
+
+
+def bucket_keys(granularity: str, start: date, end: date) -> List[str]:
+    """Claves (YYYY-MM-DD) de todos los períodos entre start y end inclusive"""
+    keys = []
+    current = truncate_date(start, granularity)
+    while current <= end:
+        keys.append(current.isoformat())
+        if granularity == "month":
+            current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return keys
+
+
+def get_bucket_label(bucket_key: str, granularity: str) -> str:
+    """Convierte "2025-03-10" en "10/03" (día/semana) o "Mar" (mes)"""
+    if granularity == "month":
+        return get_month_label(bucket_key)
+    _, month, day = bucket_key.split("-")
+    return f"{day}/{month}"
+
+
+def get_month_label(month_key: str) -> str:
+    """Convierte "2025-03" en "Mar" """
+    month_num = month_key.split("-")[1]
+    return MONTH_NAMES.get(month_num, month_num)
+
+
+class AnswerCell:
+    """Contadores de respuestas de una pregunta para un grupo de edad y mes"""
+
+    __slots__ = ("answers", "votes", "ratings", "percentages")
+
+    def __init__(self):
+        self.answers = 0
+        # option_id -> cantidad de votos
+        self.votes: Dict[UUID, int] = {}
+        # rating -> cantidad de calificaciones
+        self.ratings: Dict[int, int] = {}
+        # clave de percentage_data -> [suma, cantidad]
+        self.percentages: Dict[str, List[float]] = {}
+
+    def add_votes(self, option_id: UUID, count: int = 1):
+        self.votes[option_id] = self.votes.get(option_id, 0) + count
+
+    def add_ratings(self, rating: int, count: int = 1):
+        self.ratings[rating] = self.ratings.get(rating, 0) + count
+
+    def add_percentages(self, key: str, total: float, count: int = 1):
+        entry = self.percentages.setdefault(key, [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+
+    def merge(self, other: "AnswerCell"):
+        self.answers += other.answers
+        for option_id, count in other.votes.items():
+            self.add_votes(option_id, count)
+        for rating, count in other.ratings.items():
+            self.add_ratings(rating, count)
+        for key, (total, count) in other.percentages.items():
+            self.add_percentages(key, total, count)
+
+
+class ResultsAccumulator:
+    """
+    Acumula los datos necesarios para armar los resultados de una encuesta:
+    conteos demográficos por respuesta y celdas de respuestas por
+    (pregunta, grupo de edad, mes).
+    """
+
+    def __init__(self):
+        self.total_responses = 0
+        self.monthly_responses = 0
+        self.by_age_group: Dict[str, int] = {}
+        self.by_city: Dict[str, int] = {}
+        self.by_neighborhood: Dict[str, int] = {}
+        # question_id -> {(age_group, month_key): AnswerCell}
+        self.cells: Dict[UUID, Dict[Tuple[str, Optional[str]], AnswerCell]] = {}
+
+    def add_respondents(
+        self,
+        age_group: str,
+        city: str,
+        neighborhood: str,
+        count: int = 1,
+        monthly: int = 0
+    ):
+        """Suma `count` respuestas completadas con los datos demográficos dados"""
+        self.total_responses += count
+        self.monthly_responses += monthly
+        self.by_age_group[age_group] = self.by_age_group.get(age_group, 0) + count
+        self.by_city[city] = self.by_city.get(city, 0) + count
+        self.by_neighborhood[neighborhood] = self.by_neighborhood.get(neighborhood, 0) + count
+
+    def cell(self, question_id: UUID, age_group: str, month_key: Optional[str]) -> AnswerCell:
+        """Obtiene (o crea) la celda de una pregunta para un grupo de edad y mes"""
+        question_cells = self.cells.setdefault(question_id, {})
+        key = (age_group, month_key)
+        cell = question_cells.get(key)
+        if cell is None:
+            cell = question_cells[key] = AnswerCell()
+        return cell
+
+    def collapse(
+        self,
+        question_id: UUID,
+        age_group: Optional[str] = None,
+        month_key: Optional[str] = None
+    ) -> AnswerCell:
+        """Suma las celdas de una pregunta, filtrando opcionalmente por edad y/o mes"""
+        result = AnswerCell()
+        for (cell_age, cell_month), cell in self.cells.get(question_id, {}).items():
+            if age_group is not None and cell_age != age_group:
+                continue
+            if month_key is not None and cell_month != month_key:
+                continue
+            result.merge(cell)
+        return result
+
+    def age_groups(self, question_id: UUID) -> List[str]:
+        """Grupos de edad con respuestas para la pregunta"""
+        seen: Dict[str, None] = {}
+        for age_group, _ in self.cells.get(question_id, {}):
+            seen[age_group] = None
+        return list(seen)
+
+    def months(self) -> List[str]:
+        """Meses (YYYY-MM) con al menos una respuesta, ordenados"""
+        months = set()
+        for question_cells in self.cells.values():
+            for (_, month_key), cell in question_cells.items():
+                if month_key and cell.answers:
+                    months.add(month_key)
+        return sorted(months)
+
+
+def percentages_by_value(question: Question, cell: AnswerCell) -> Dict[Any, List[float]]:
+    """
+    Reagrupa las claves de percentage_data (ids de opción) por option_value.
+    Las claves que no corresponden a una opción se conservan tal cual.
+    """
+    option_id_map = {str(opt.id): opt.option_value for opt in question.options}
+    grouped: Dict[Any, List[float]] = {}
+    for key, (total, count) in cell.percentages.items():
+        option_key = option_id_map[key] if key in option_id_map else key
+        entry = grouped.setdefault(option_key, [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+    return grouped
+
+
+def format_percentage_results(question: Question, cell: AnswerCell) -> Dict[str, Any]:
+    """Promedio de cada categoría de una distribución porcentual"""
+    results = {}
+    for key, (total, count) in percentages_by_value(question, cell).items():
+        avg = total / count if count > 0 else 0
+        option_text = key
+        for opt in question.options:
+            if opt.option_value == key:
+                option_text = opt.option_text
+                break
+        results[key] = {
+            "label": option_text,
+            "percentage": round(avg, 1)
+        }
+    return results
+
+
+def format_choice_results(question: Question, cell: AnswerCell) -> Dict[str, Any]:
+    """Votos y porcentaje de cada opción de una pregunta de selección única"""
+    total_votes = sum(cell.votes.values())
+    results = {}
+    for opt in question.options:
+        count = cell.votes.get(opt.id)
+        if not count:
+            continue
+        percentage = (count / total_votes * 100) if total_votes > 0 else 0
+        results[opt.option_value] = {
+            "label": opt.option_text,
+            "votes": count,
+            "percentage": round(percentage, 1)
+        }
+    return results
+
+
+def format_rating_results(cell: AnswerCell) -> Dict[str, Any]:
+    """Promedio y distribución de una pregunta de calificación"""
+    total_ratings = sum(cell.ratings.values())
+    rating_sum = sum(rating * count for rating, count in cell.ratings.items())
+    avg_rating = rating_sum / total_ratings if total_ratings else 0
+    return {
+        "average": round(avg_rating, 2),
+        "total_ratings": total_ratings,
+        "distribution": {str(r): cell.ratings.get(r, 0) for r in range(1, 6)}
+    }
+
+
+def format_question_results(question: Question, cell: AnswerCell) -> Dict[str, Any]:
+    """Resultados de una pregunta según su tipo ({} si el tipo no se resume)"""
+    if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
+        return format_percentage_results(question, cell)
+    elif question.question_type == QuestionType.SINGLE_CHOICE:
+        return format_choice_results(question, cell)
+    elif question.question_type == QuestionType.RATING:
+        return format_rating_results(cell)
+    return {}
+
+
+def cell_has_results(question: Question, cell: AnswerCell) -> bool:
+    """Indica si la celda tiene datos para el tipo de la pregunta"""
+    if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
+        return bool(cell.percentages)
+    elif question.question_type == QuestionType.SINGLE_CHOICE:
+        return bool(cell.votes)
+    elif question.question_type == QuestionType.RATING:
+        return bool(cell.ratings)
+    return False
+
+
+class Dimension:
+    """Dimensión demográfica por la que se pueden desglosar los resultados"""
+
+    __slots__ = ("name", "expression")
+
+    def __init__(self, name: str, expression: Callable[[], Any]):
+        self.name = name
+        # Expresión SQL sobre SurveyResponse/User que da el valor de la dimensión
+        self.expression = expression
+
+
+# Dimensiones registradas, por nombre (ver register_dimension)
+DIMENSIONS: Dict[str, Dimension] = {}
+
+
+def register_dimension(name: str, expression: Callable[[], Any]):
+    """Registra una dimensión para group_by en los desgloses de resultados"""
+    DIMENSIONS[name] = Dimension(name, expression)
+
+
+register_dimension("age_group", lambda: age_group_expression(User.birth_date))
+register_dimension("gender", lambda: unspecified_if_empty(User.gender))
+register_dimension("city", lambda: unspecified_if_empty(User.city))
+register_dimension("neighborhood", lambda: unspecified_if_empty(User.neighborhood))
+
+
+class BreakdownAccumulator:
+    """
+    Celdas de respuestas por (pregunta, combinación de dimensiones). Las
+    combinaciones son tuplas de valores en el orden de `dimensions`; los
+    desgloses por un subconjunto de dimensiones se obtienen sumando celdas.
+    """
+
+    def __init__(self, dimensions: List[str]):
+        self.dimensions = list(dimensions)
+        # combinación -> cantidad de respuestas completadas
+        self.respondents: Dict[Tuple[str, ...], int] = {}
+        # question_id -> {combinación: AnswerCell}
+        self.cells: Dict[UUID, Dict[Tuple[str, ...], AnswerCell]] = {}
+
+    def cell(self, question_id: UUID, group: Tuple[str, ...]) -> AnswerCell:
+        """Obtiene (o crea) la celda de una pregunta para una combinación"""
+        question_cells = self.cells.setdefault(question_id, {})
+        cell = question_cells.get(group)
+        if cell is None:
+            cell = question_cells[group] = AnswerCell()
+        return cell
+
+    def _positions(self, dimensions: List[str]) -> List[int]:
+        return [self.dimensions.index(name) for name in dimensions]
+
+    def respondents_by(self, dimensions: List[str]) -> Dict[Tuple[str, ...], int]:
+        """Respuestas completadas agrupadas por un subconjunto de dimensiones"""
+        positions = self._positions(dimensions)
+        result: Dict[Tuple[str, ...], int] = {}
+        for group, count in self.respondents.items():
+            key = tuple(group[i] for i in positions)
+            result[key] = result.get(key, 0) + count
+        return result
+
+    def cells_by(self, question_id: UUID, dimensions: List[str]) -> Dict[Tuple[str, ...], AnswerCell]:
+        """Celdas de una pregunta sumadas por un subconjunto de dimensiones"""
+        positions = self._positions(dimensions)
+        result: Dict[Tuple[str, ...], AnswerCell] = {}
+        for group, cell in self.cells.get(question_id, {}).items():
+            key = tuple(group[i] for i in positions)
+            merged = result.get(key)
+            if merged is None:
+                merged = result[key] = AnswerCell()
+            merged.merge(cell)
+        return result
+
+
+class SurveyResultsAggregator:
+    """Calcula las celdas de resultados con consultas agrupadas en PostgreSQL"""
+
+    @staticmethod
+    def respondents_subquery(
+        db: Session,
+        survey_id: UUID,
+        granularity: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ):
+        """
+        Respuestas completadas con su grupo de edad, ciudad, barrio y período.
+        Sin granularidad el período es el mes de la evolución histórica; con
+        granularidad es completed_at truncado. start/end (end excluido) filtran
+        por completed_at usando el índice (survey_id, completed_at).
+        """
+        bucket = bucket_expression(granularity) if granularity else month_expression()
+        query = db.query(
+            SurveyResponse.id.label("response_id"),
+            SurveyResponse.started_at.label("started_at"),
+            age_group_expression(User.birth_date).label("age_group"),
+            unspecified_if_empty(User.city).label("city"),
+            unspecified_if_empty(User.neighborhood).label("neighborhood"),
+            bucket.label("month_key"),
+        ).join(
+            User, SurveyResponse.user_id == User.id
+        ).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.completed == True
+        )
+        if start is not None:
+            query = query.filter(SurveyResponse.completed_at >= start)
+        if end is not None:
+            query = query.filter(SurveyResponse.completed_at < end)
+        return query.subquery()
+
+    @staticmethod
+    def aggregate(
+        db: Session,
+        survey_id: UUID,
+        granularity: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> ResultsAccumulator:
+        """
+        Agrega demografía, votos, calificaciones y porcentajes de la encuesta.
+        Con granularidad, las celdas quedan por período en lugar de por mes.
+        """
+        accumulator = ResultsAccumulator()
+        respondents = SurveyResultsAggregator.respondents_subquery(
+            db, survey_id, granularity, start, end
+        )
+
+        now = datetime.now()
+        first_day_of_month = datetime(now.year, now.month, 1)
+
+        # Demografía: una fila por combinación (edad, ciudad, barrio)
+        demographic_rows = db.query(
+            respondents.c.age_group,
+            respondents.c.city,
+            respondents.c.neighborhood,
+            func.count(),
+            func.count().filter(respondents.c.started_at >= first_day_of_month),
+        ).group_by(
+            respondents.c.age_group,
+            respondents.c.city,
+            respondents.c.neighborhood,
+        ).all()
+
+        for age_group, city, neighborhood, count, monthly in demographic_rows:
+            accumulator.add_respondents(age_group, city, neighborhood, count, monthly)
+
+        if accumulator.total_responses == 0:
+            return accumulator
+
+        SurveyResultsAggregator.aggregate_answers(db, accumulator, respondents)
+        return accumulator
+
+    @staticmethod
+    def count_by_bucket(db: Session, respondents) -> Dict[str, int]:
+        """Cantidad de respuestas completadas por período de un respondents_subquery"""
+        return dict(db.query(
+            respondents.c.month_key,
+            func.count(),
+        ).group_by(
+            respondents.c.month_key
+        ).all())
+
+    @staticmethod
+    def aggregate_answers(db: Session, accumulator: ResultsAccumulator, respondents):
+        """Suma las answers de las respuestas del subquery a las celdas"""
+        # Votos y calificaciones: COUNT por (pregunta, edad, mes, opción, rating)
+        answer_rows = db.query(
+            Answer.question_id,
+            respondents.c.age_group,
+            respondents.c.month_key,
+            Answer.option_id,
+            Answer.rating,
+            func.count(),
+        ).join(
+            respondents, Answer.response_id == respondents.c.response_id
+        ).group_by(
+            Answer.question_id,
+            respondents.c.age_group,
+            respondents.c.month_key,
+            Answer.option_id,
+            Answer.rating,
+        ).all()
+
+        for question_id, age_group, month_key, option_id, rating, count in answer_rows:
+            cell = accumulator.cell(question_id, age_group, month_key)
+            cell.answers += count
+            if option_id:
+                cell.add_votes(option_id, count)
+            if rating is not None:
+                cell.add_ratings(rating, count)
+
+        # Distribución porcentual: jsonb_each sobre percentage_data
+        entries = func.jsonb_each_text(Answer.percentage_data).table_valued(
+            "key", "value"
+        ).lateral("entries")
+        entry_value = cast(entries.c.value, Float)
+
+        percentage_rows = db.query(
+            Answer.question_id,
+            respondents.c.age_group,
+            respondents.c.month_key,
+            entries.c.key,
+            func.sum(entry_value),
+            func.count(entry_value),
+        ).select_from(Answer).join(
+            respondents, Answer.response_id == respondents.c.response_id
+        ).join(
+            entries, true()
+        ).filter(
+            func.jsonb_typeof(Answer.percentage_data) == "object"
+        ).group_by(
+            Answer.question_id,
+            respondents.c.age_group,
+            respondents.c.month_key,
+            entries.c.key,
+        ).all()
+
+        for question_id, age_group, month_key, key, total, count in percentage_rows:
+            cell = accumulator.cell(question_id, age_group, month_key)
+            cell.add_percentages(key, float(total or 0), count)
+
+
+class SurveyBreakdownAggregator:
+    """
+    Desglose de resultados por cualquier combinación de dimensiones
+    registradas, en una sola pasada agrupada en PostgreSQL.
+    """
+
+    @staticmethod
+    def aggregate(db: Session, survey_id: UUID, dimensions: List[str]) -> BreakdownAccumulator:
+        """Agrega respuestas y answers por (pregunta, dimensiones)"""
+        accumulator = BreakdownAccumulator(dimensions)
+
+        respondents = db.query(
+            SurveyResponse.id.label("response_id"),
+            *[DIMENSIONS[name].expression().label(f"dim_{i}") for i, name in enumerate(dimensions)],
+        ).join(
+            User, SurveyResponse.user_id == User.id
+        ).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.completed == True
+        ).subquery()
+        group_columns = [respondents.c[f"dim_{i}"] for i in range(len(dimensions))]
+        width = len(group_columns)
+
+        for row in db.query(*group_columns, func.count()).group_by(*group_columns).all():
+            accumulator.respondents[tuple(row[:width])] = row[width]
+
+        if not accumulator.respondents:
+            return accumulator
+
+        # Votos y calificaciones
+        answer_rows = db.query(
+            Answer.question_id,
+            *group_columns,
+            Answer.option_id,
+            Answer.rating,
+            func.count(),
+        ).join(
+            respondents, Answer.response_id == respondents.c.response_id
+        ).group_by(
+            Answer.question_id,
+            *group_columns,
+            Answer.option_id,
+            Answer.rating,
+        ).all()
+
+        for row in answer_rows:
+            question_id, group = row[0], tuple(row[1:1 + width])
+            option_id, rating, count = row[1 + width:]
+            cell = accumulator.cell(question_id, group)
+            cell.answers += count
+            if option_id:
+                cell.add_votes(option_id, count)
+            if rating is not None:
+                cell.add_ratings(rating, count)
+
+        # Distribución porcentual
+        entries = func.jsonb_each_text(Answer.percentage_data).table_valued(
+            "key", "value"
+        ).lateral("entries")
+        entry_value = cast(entries.c.value, Float)
+
+        percentage_rows = db.query(
+            Answer.question_id,
+            *group_columns,
+            entries.c.key,
+            func.sum(entry_value),
+            func.count(entry_value),
+        ).select_from(Answer).join(
+            respondents, Answer.response_id == respondents.c.response_id
+        ).join(
+            entries, true()
+        ).filter(
+            func.jsonb_typeof(Answer.percentage_data) == "object"
+        ).group_by(
+            Answer.question_id,
+            *group_columns,
+            entries.c.key,
+        ).all()
+
+        for row in percentage_rows:
+            question_id, group = row[0], tuple(row[1:1 + width])
+            key, total, count = row[1 + width:]
+            accumulator.cell(question_id, group).add_percentages(key, float(total or 0), count)
+
+        return accumulator
+
+
+# Filas por lote del cursor del lado del servidor
+STREAM_BATCH_SIZE = 5000
+
+
+class SurveyResultsStreamer:
+    """
+    Calcula las celdas de resultados en una sola pasada sobre un cursor del
+    lado del servidor. La memoria queda acotada por la cantidad de celdas y el
+    tamaño de lote, sin importar cuántas respuestas tenga la encuesta.
+    """
+
+    @staticmethod
+    def stream_rows(db: Session, survey_id: UUID, batch_size: int = STREAM_BATCH_SIZE):
+        """Answers unidas a su respuesta y usuario, ordenadas por respuesta"""
+        return db.query(
+            SurveyResponse.id,
+            SurveyResponse.started_at,
+            SurveyResponse.completed_at,
+            User.birth_date,
+            User.city,
+            User.neighborhood,
+            Answer.question_id,
+            Answer.option_id,
+            Answer.rating,
+            Answer.percentage_data,
+        ).join(
+            User, SurveyResponse.user_id == User.id
+        ).outerjoin(
+            Answer, Answer.response_id == SurveyResponse.id
+        ).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.completed == True
+        ).order_by(
+            SurveyResponse.id
+        ).execution_options(
+            stream_results=True,
+            yield_per=batch_size
+        )
+
+    @staticmethod
+    def fold(
+        rows,
+        accumulator: Optional[ResultsAccumulator] = None,
+        now: Optional[datetime] = None
+    ) -> ResultsAccumulator:
+        """
+        Acumula filas (response_id, started_at, completed_at, birth_date, city,
+        neighborhood, question_id, option_id, rating, percentage_data) agrupadas
+        por response_id. Las respuestas sin answers llegan con question_id NULL.
+        """
+        accumulator = accumulator or ResultsAccumulator()
+        now = now or datetime.now()
+        first_day_of_month = datetime(now.year, now.month, 1)
+
+        current_response = None
+        age_group = month_key = None
+
+        for (response_id, started_at, completed_at, birth_date, city, neighborhood,
+             question_id, option_id, rating, percentage_data) in rows:
+            if response_id != current_response:
+                current_response = response_id
+                response_date = started_at or completed_at
+                age_group = response_age_group(birth_date, response_date)
+                month_key = response_date.strftime("%Y-%m") if response_date else None
+                monthly = 1 if started_at and started_at.replace(tzinfo=None) >= first_day_of_month else 0
+                accumulator.add_respondents(
+                    age_group,
+                    city or UNSPECIFIED,
+                    neighborhood or UNSPECIFIED,
+                    1,
+                    monthly
+                )
+
+            if question_id is None:
+                continue
+
+            cell = accumulator.cell(question_id, age_group, month_key)
+            cell.answers += 1
+            if option_id:
+                cell.add_votes(option_id)
+            if rating is not None:
+                cell.add_ratings(rating)
+            if isinstance(percentage_data, dict):
+                for key, value in percentage_data.items():
+                    if value is not None:
+                        cell.add_percentages(str(key), float(value))
+
+        return accumulator
+
+    @staticmethod
+    def aggregate(db: Session, survey_id: UUID) -> ResultsAccumulator:
+        """Agrega la encuesta recorriendo un cursor del lado del servidor"""
+        return SurveyResultsStreamer.fold(SurveyResultsStreamer.stream_rows(db, survey_id))
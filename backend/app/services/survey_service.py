@@ -1,16 +1,62 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, func
-from typing import Optional, List, Dict, Any
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, insert, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi.encoders import jsonable_encoder
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta, date
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.models.survey import Survey, Question, QuestionOption, QuestionType
-from app.models.response import SurveyResponse, Answer
+from app.models.response import SurveyResponse, Answer, UserSurveyResponseCount
 from app.models.user import User
 from app.models.client import Client
-from app.models.points import UserPoints, PointTransaction
-from app.schemas.survey import SurveyCreate
-from app.schemas.response import SurveyResponseCreate, AnswerCreate
+from app.schemas.survey import SurveyCreate, SurveyResponse as SurveyResponseSchema
+from app.schemas.response import (
+    SurveyResponseCreate,
+    SurveyResponsePatch,
+    AnswerCreate,
+    BulkSurveyResponseItem,
+)
+from app.core.config import settings
+from app.core.cache import cache, cache_key
+from app.core.etag import make_etag
+from app.services.rollup_service import SurveyRollupService
+from app.services.points_service import PointsService
+from app.services.response_cube import response_cubes
+from app.services.survey_definition import CompiledSurvey, survey_definitions
+from app.services.survey_results import (
+    EVOLUTION_AGE_GROUPS,
+    TIMESERIES_GRANULARITIES,
+    ResultsAccumulator,
+    SurveyResultsAggregator,
+    SurveyResultsStreamer,
+    DIMENSIONS,
+    SurveyBreakdownAggregator,
+    cell_has_results,
+    format_question_results,
+    format_rating_results,
+    bucket_keys,
+    get_bucket_label,
+    get_month_label,
+    percentages_by_value,
+)
+
+# Máximo de períodos de una serie temporal (p. ej. un año de días)
+MAX_TIMESERIES_BUCKETS = 400
+
+# Máximo de dimensiones combinadas en un desglose cruzado
+MAX_CROSS_DIMENSIONS = 3
+
+
+def _nest(groups: Dict[Tuple[str, ...], Any]) -> Dict[str, Any]:
+    """Convierte {(v1, v2): x} en {v1: {v2: x}}, con claves ordenadas"""
+    nested: Dict[str, Any] = {}
+    for group in sorted(groups):
+        level = nested
+        for value in group[:-1]:
+            level = level.setdefault(value, {})
+        level[group[-1]] = groups[group]
+    return nested
 
 
 class SurveyService:
@@ -29,6 +75,111 @@ class SurveyService:
         """Obtiene una encuesta por ID"""
         return db.query(Survey).filter(Survey.id == survey_id).first()
 
+    @staticmethod
+    def _serialize_definition(survey: Survey) -> Dict[str, Any]:
+        """Definición serializada de la encuesta con su ETag"""
+        payload = SurveyResponseSchema.model_validate(survey).model_dump(mode="json")
+        return {
+            "etag": make_etag(*SurveyService.get_definition_version(survey)),
+            "payload": payload,
+        }
+
+    @staticmethod
+    def definition_cache_key(survey_id: Optional[UUID] = None) -> str:
+        """Clave de la definición serializada de una encuesta (o de la activa)"""
+        return cache_key("survey-definition", survey_id or "active")
+
+    @staticmethod
+    def load_survey_definition(db: Session, survey_id: UUID) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Carga de la base la definición serializada de una encuesta ({"etag",
+        "payload"}) y su TTL en el cache, sin tocar el cache: el endpoint la
+        guarda en definition_cache_key hasta que la encuesta se active/desactive.
+        """
+        survey = db.query(Survey).options(
+            selectinload(Survey.questions).selectinload(Question.options),
+            joinedload(Survey.client)
+        ).filter(Survey.id == survey_id).first()
+        if not survey:
+            return None
+        return SurveyService._serialize_definition(survey), settings.CACHE_SURVEY_TTL_SECONDS
+
+    @staticmethod
+    def load_active_survey_definition(db: Session) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Como load_survey_definition, para la encuesta activa"""
+        survey = SurveyService.get_active_survey(db)
+        if not survey:
+            return None
+
+        ttl = settings.CACHE_SURVEY_TTL_SECONDS
+        if survey.expires_at:
+            # No servir la encuesta cacheada después de que venza
+            remaining = (survey.expires_at.replace(tzinfo=None) - datetime.now()).total_seconds()
+            ttl = max(1, min(ttl, int(remaining)))
+        return SurveyService._serialize_definition(survey), ttl
+
+    @staticmethod
+    def invalidate_survey_cache(survey_id: Optional[UUID] = None):
+        """Descarta las definiciones cacheadas (la encuesta dada y la activa) y su cubo"""
+        keys = [SurveyService.definition_cache_key()]
+        if survey_id:
+            keys.append(SurveyService.definition_cache_key(survey_id))
+            survey_definitions.invalidate(survey_id)
+            response_cubes.invalidate(survey_id)
+        cache.delete(*keys)
+
+    @staticmethod
+    def invalidate_results_cache(survey_id: UUID):
+        """Descarta los resultados cacheados de una encuesta"""
+        cache.delete(cache_key("survey-results", survey_id))
+
+    @staticmethod
+    def get_definition_version(survey: Survey) -> tuple:
+        """
+        Versión de la definición de una encuesta, para ETags.
+        Las preguntas y opciones no se editan después de crear la encuesta,
+        así que alcanza con los campos de la fila de surveys.
+        """
+        return (
+            "survey",
+            str(survey.id),
+            survey.title,
+            survey.description,
+            survey.status,
+            survey.is_active,
+            str(survey.client_id) if survey.client_id else None,
+            survey.points_per_question,
+            survey.bonus_points,
+            survey.max_responses_per_user,
+            survey.created_at.isoformat() if survey.created_at else None,
+            survey.expires_at.isoformat() if survey.expires_at else None,
+        )
+
+    @staticmethod
+    def get_results_version(db: Session, survey_id: UUID) -> tuple:
+        """
+        Versión de los resultados de una encuesta, para ETags: cantidad de
+        respuestas completadas y la última fecha de completado. Incluye el día
+        y el mes actuales porque los grupos de edad y monthly_responses dependen
+        de la fecha.
+        """
+        response_count, last_completed_at = db.query(
+            func.count(SurveyResponse.id),
+            func.max(SurveyResponse.completed_at)
+        ).filter(
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.completed == True
+        ).one()
+
+        return (
+            "results",
+            str(survey_id),
+            response_count,
+            last_completed_at.isoformat() if last_completed_at else None,
+            date.today().isoformat(),
+            settings.RESULTS_ENGINE,
+        )
+
     @staticmethod
     def get_all_surveys(db: Session, client_id: Optional[UUID] = None) -> List[Survey]:
         """
@@ -93,67 +244,119 @@ class SurveyService:
 
         db.commit()
         db.refresh(survey)
+        SurveyService.invalidate_survey_cache(survey.id)
+        return survey
+
+    @staticmethod
+    def set_survey_active(db: Session, survey: Survey, is_active: bool) -> Survey:
+        """Activa o desactiva una encuesta"""
+        survey.is_active = is_active
+        survey.status = "active" if is_active else "inactive"
+        db.commit()
+        db.refresh(survey)
+        SurveyService.invalidate_survey_cache(survey.id)
         return survey
 
     @staticmethod
-    def user_can_respond(db: Session, user_id: UUID, survey_id: UUID) -> bool:
+    def user_can_respond(
+        db: Session,
+        user_id: UUID,
+        survey_id: UUID,
+        definition: Optional[CompiledSurvey] = None
+    ) -> bool:
         """
         Verifica si el usuario puede responder la encuesta.
         Regla: Si max_responses_per_user = 0, puede responder ilimitadamente.
                Si max_responses_per_user > 0, ese es el límite de respuestas.
         """
-        # Obtener la encuesta
-        survey = db.query(Survey).filter(Survey.id == survey_id).first()
-        if not survey:
+        # Obtener la encuesta compilada (cacheada)
+        definition = definition or survey_definitions.get(db, survey_id)
+        if not definition:
             return False
 
         # Si max_responses_per_user es 0, puede responder ilimitadamente
-        if survey.max_responses_per_user == 0:
+        if definition.max_responses_per_user == 0:
             return True
 
-        # Contar respuestas completadas del usuario para esta encuesta
-        response_count = db.query(SurveyResponse).filter(
-            and_(
-                SurveyResponse.user_id == user_id,
-                SurveyResponse.survey_id == survey_id,
-                SurveyResponse.completed == True
-            )
-        ).count()
+        # Verificar si alcanzó el límite (lectura por clave primaria del contador)
+        return SurveyService.get_completed_count(db, user_id, survey_id) < definition.max_responses_per_user
 
-        # Verificar si alcanzó el límite
-        return response_count < survey.max_responses_per_user
+    @staticmethod
+    def get_completed_count(db: Session, user_id: UUID, survey_id: UUID) -> int:
+        """Respuestas completadas del usuario para la encuesta, según el contador"""
+        count = db.query(UserSurveyResponseCount.completed_count).filter(
+            UserSurveyResponseCount.user_id == user_id,
+            UserSurveyResponseCount.survey_id == survey_id
+        ).scalar()
+        return count or 0
+
+    @staticmethod
+    def reserve_response_slot(
+        db: Session,
+        user_id: UUID,
+        survey_id: UUID,
+        max_responses: int
+    ) -> bool:
+        """
+        Suma una respuesta completada al contador del usuario solo si sigue por
+        debajo del límite (0 = ilimitado). El upsert condicional toma el lock de
+        la fila hasta el commit, así dos envíos concurrentes no pueden pasar
+        ambos el límite. No hace commit; retorna False si se alcanzó el límite.
+        """
+        stmt = pg_insert(UserSurveyResponseCount).values(
+            user_id=user_id,
+            survey_id=survey_id,
+            completed_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserSurveyResponseCount.user_id, UserSurveyResponseCount.survey_id],
+            set_={
+                "completed_count": UserSurveyResponseCount.completed_count + 1,
+                "updated_at": func.now(),
+            },
+            where=(UserSurveyResponseCount.completed_count < max_responses) if max_responses > 0 else None
+        ).returning(UserSurveyResponseCount.completed_count)
+        return db.execute(stmt).first() is not None
 
     @staticmethod
     def submit_response(
         db: Session,
         response_data: SurveyResponseCreate,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
+        user_agent: Optional[str] = None,
+        definition: Optional[CompiledSurvey] = None,
+        invalidate_cache: bool = True
     ) -> SurveyResponse:
         """
-        Envía una respuesta de encuesta y calcula los puntos ganados
+        Envía una respuesta de encuesta y calcula los puntos ganados.
+        Valida y puntúa las answers con la definición compilada de la encuesta.
+        Con invalidate_cache=False no toca el cache: el caller descarta los
+        resultados cacheados por su cuenta (los endpoints async, fuera del event loop).
         """
-        # Verificar que el usuario puede responder
-        if not SurveyService.user_can_respond(db, response_data.user_id, response_data.survey_id):
-            raise ValueError("Ya alcanzaste el límite de respuestas para esta encuesta")
-
-        # Obtener encuesta
-        survey = SurveyService.get_survey_by_id(db, response_data.survey_id)
-        if not survey:
+        # Obtener encuesta compilada (cacheada)
+        definition = definition or survey_definitions.get(db, response_data.survey_id)
+        if not definition:
             raise ValueError("Encuesta no encontrada")
 
-        # Calcular puntos
-        questions_answered = len(response_data.answers)
-        points_earned = questions_answered * survey.points_per_question
+        # Validar las answers contra las preguntas y opciones de la encuesta
+        error = definition.validate_answers(response_data.answers)
+        if error:
+            raise ValueError(error)
 
-        # Si completó todas las preguntas requeridas, dar bonus
-        total_required_questions = db.query(Question).filter(
-            Question.survey_id == survey.id,
-            Question.is_required == True
-        ).count()
+        # Verificar que el usuario puede responder; si completa, reservar su
+        # lugar en el contador de forma atómica
+        if response_data.completed:
+            can_respond = SurveyService.reserve_response_slot(
+                db, response_data.user_id, definition.id, definition.max_responses_per_user
+            )
+        else:
+            can_respond = SurveyService.user_can_respond(db, response_data.user_id, definition.id, definition)
+        if not can_respond:
+            db.rollback()
+            raise ValueError("Ya alcanzaste el límite de respuestas para esta encuesta")
 
-        if response_data.completed and questions_answered >= total_required_questions:
-            points_earned += survey.bonus_points
+        # Calcular puntos (con bonus si completó todas las preguntas requeridas)
+        points_earned = definition.score(response_data.answers, response_data.completed)
 
         # Crear respuesta
         survey_response = SurveyResponse(
@@ -180,74 +383,403 @@ class SurveyService:
             )
             db.add(answer)
 
-        # Actualizar puntos del usuario
+        # Actualizar puntos del usuario y rollups de resultados
         if response_data.completed:
-            SurveyService._update_user_points(
+            PointsService.award(
                 db,
                 response_data.user_id,
                 points_earned,
                 survey_response.id
             )
+            SurveyRollupService.record_responses(
+                db,
+                definition.id,
+                [(response_data.user_id, response_data.answers, None)]
+            )
 
         db.commit()
         db.refresh(survey_response)
+
+        if response_data.completed and invalidate_cache:
+            SurveyService.invalidate_results_cache(definition.id)
         return survey_response
 
     @staticmethod
-    def _update_user_points(
+    def _lock_user_response(db: Session, response_id: UUID, user_id: UUID) -> Optional[SurveyResponse]:
+        """Respuesta del usuario bloqueada (FOR UPDATE) hasta el commit"""
+        return db.query(SurveyResponse).filter(
+            SurveyResponse.id == response_id,
+            SurveyResponse.user_id == user_id
+        ).with_for_update().first()
+
+    @staticmethod
+    def get_draft_response(db: Session, user_id: UUID, survey_id: UUID) -> Optional[SurveyResponse]:
+        """Última respuesta sin completar del usuario para la encuesta, con sus answers"""
+        return db.query(SurveyResponse).options(
+            selectinload(SurveyResponse.answers)
+        ).filter(
+            SurveyResponse.user_id == user_id,
+            SurveyResponse.survey_id == survey_id,
+            SurveyResponse.completed == False
+        ).order_by(SurveyResponse.started_at.desc()).first()
+
+    @staticmethod
+    def update_response_answers(
         db: Session,
+        response_id: UUID,
         user_id: UUID,
-        points: int,
-        response_id: UUID
-    ):
-        """Actualiza los puntos del usuario"""
-        # Obtener o crear registro de puntos
-        user_points = db.query(UserPoints).filter(UserPoints.user_id == user_id).first()
-
-        if not user_points:
-            user_points = UserPoints(user_id=user_id)
-            db.add(user_points)
-            db.flush()
+        patch: SurveyResponsePatch
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Autoguardado de una respuesta en curso: reemplaza solo las answers de
+        las preguntas incluidas en el patch (un DELETE y un INSERT multi-fila,
+        sin importar cuántas answers tenga la respuesta). No suma puntos ni
+        toca los rollups; eso lo hace finalize_response.
+        Retorna None si la respuesta no existe o no es del usuario.
+        """
+        survey_response = SurveyService._lock_user_response(db, response_id, user_id)
+        if not survey_response:
+            return None
+        if survey_response.completed:
+            db.rollback()
+            raise ValueError("Esta respuesta ya fue finalizada")
+
+        definition = survey_definitions.get(db, survey_response.survey_id)
+        if not definition or not definition.is_active:
+            db.rollback()
+            raise ValueError("Esta encuesta no está disponible actualmente")
+
+        error = definition.validate_answers(patch.answers)
+        if not error:
+            unknown = [str(q) for q in patch.cleared_question_ids if q not in definition.questions]
+            if unknown:
+                error = f"Preguntas que no pertenecen a la encuesta: {', '.join(unknown)}"
+        if error:
+            db.rollback()
+            raise ValueError(error)
+
+        changed_questions = {answer.question_id for answer in patch.answers}
+        changed_questions.update(patch.cleared_question_ids)
+        if changed_questions:
+            db.query(Answer).filter(
+                Answer.response_id == response_id,
+                Answer.question_id.in_(changed_questions)
+            ).delete(synchronize_session=False)
+        if patch.answers:
+            db.execute(insert(Answer), [
+                {
+                    "id": uuid4(),
+                    "response_id": response_id,
+                    "question_id": answer.question_id,
+                    "option_id": answer.option_id,
+                    "answer_text": answer.answer_text,
+                    "rating": answer.rating,
+                    "percentage_data": answer.percentage_data,
+                }
+                for answer in patch.answers
+            ])
 
-        # Actualizar puntos
-        user_points.total_points += points
-        user_points.available_points += points
+        answered_questions = db.query(func.count(func.distinct(Answer.question_id))).filter(
+            Answer.response_id == response_id
+        ).scalar()
+        db.commit()
 
-        # Crear transacción
-        transaction = PointTransaction(
-            user_id=user_id,
-            transaction_type="earned",
-            amount=points,
-            description=f"Encuesta completada",
-            related_response_id=response_id,
+        return {
+            "id": response_id,
+            "survey_id": survey_response.survey_id,
+            "completed": False,
+            "updated_questions": len(changed_questions),
+            "answered_questions": answered_questions,
+        }
+
+    @staticmethod
+    def finalize_response(db: Session, response_id: UUID, user_id: UUID) -> Optional[SurveyResponse]:
+        """
+        Completa una respuesta guardada con autoguardado: calcula y acredita los
+        puntos, suma la respuesta al contador del usuario y a los rollups.
+        La fila queda bloqueada durante la transacción, así los puntos se
+        acreditan una sola vez aunque el cliente reintente; finalizar una
+        respuesta ya completada la retorna sin cambios.
+        Retorna None si la respuesta no existe o no es del usuario.
+        """
+        survey_response = SurveyService._lock_user_response(db, response_id, user_id)
+        if not survey_response:
+            return None
+        if survey_response.completed:
+            db.rollback()
+            return survey_response
+
+        definition = survey_definitions.get(db, survey_response.survey_id)
+        if not definition or not definition.is_active:
+            db.rollback()
+            raise ValueError("Esta encuesta no está disponible actualmente")
+
+        if not SurveyService.reserve_response_slot(
+            db, user_id, definition.id, definition.max_responses_per_user
+        ):
+            db.rollback()
+            raise ValueError("Ya alcanzaste el límite de respuestas para esta encuesta")
+
+        answers = db.query(Answer).filter(Answer.response_id == response_id).all()
+        points_earned = definition.score(answers, True)
+
+        survey_response.completed = True
+        survey_response.completed_at = datetime.now()
+        survey_response.points_earned = points_earned
+
+        PointsService.award(db, user_id, points_earned, response_id)
+        # Mes y edad a started_at, como el recálculo y los demás motores, no a hoy
+        SurveyRollupService.record_responses(
+            db, definition.id, [(user_id, answers, survey_response.started_at)]
         )
-        db.add(transaction)
+
+        db.commit()
+        db.refresh(survey_response)
+
+        SurveyService.invalidate_results_cache(definition.id)
+        return survey_response
 
     @staticmethod
-    def get_survey_results(db: Session, survey_id: UUID) -> Dict[str, Any]:
+    def _lock_response_counts(db: Session, survey_id: UUID, user_ids) -> Dict[UUID, int]:
         """
-        Obtiene los resultados y estadísticas demográficas de una encuesta.
-        Retorna KPIs por edad, ciudad y barrio, más resumen de respuestas por pregunta.
+        Crea los contadores que falten y los bloquea (FOR UPDATE, en orden
+        estable) hasta el commit. Retorna {user_id: completed_count}.
         """
-        # Obtener todas las respuestas completadas con datos del usuario
-        responses = db.query(SurveyResponse, User).join(
-            User, SurveyResponse.user_id == User.id
+        if not user_ids:
+            return {}
+        ordered_ids = sorted(user_ids, key=str)
+        db.execute(
+            pg_insert(UserSurveyResponseCount).values([
+                {"user_id": user_id, "survey_id": survey_id, "completed_count": 0}
+                for user_id in ordered_ids
+            ]).on_conflict_do_nothing()
+        )
+        rows = db.query(
+            UserSurveyResponseCount.user_id,
+            UserSurveyResponseCount.completed_count
         ).filter(
-            SurveyResponse.survey_id == survey_id,
-            SurveyResponse.completed == True
-        ).all()
+            UserSurveyResponseCount.survey_id == survey_id,
+            UserSurveyResponseCount.user_id.in_(ordered_ids)
+        ).order_by(UserSurveyResponseCount.user_id).with_for_update().all()
+        return {user_id: count for user_id, count in rows}
 
-        total_responses = len(responses)
+    @staticmethod
+    def submit_responses_bulk(
+        db: Session,
+        survey_id: UUID,
+        items: List[BulkSurveyResponseItem],
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Envía muchas respuestas de una misma encuesta en una sola transacción.
+        Valida cada una contra la definición compilada de la encuesta y retorna
+        un resultado por ítem; las válidas se insertan con INSERTs multi-fila y
+        los puntos se suman con un único upsert.
+        """
+        sources = [(ip_address, user_agent)] * len(items)
+        results = SurveyService.persist_responses_bulk(db, survey_id, items, sources)
+        db.commit()
+
+        if any(result["success"] and item.completed for result, item in zip(results, items)):
+            SurveyService.invalidate_results_cache(survey_id)
+        return results
+
+    @staticmethod
+    def _server_time(value: datetime) -> datetime:
+        """Fecha informada por el cliente en la hora local del servidor (sin zona), como datetime.now()"""
+        if value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _offline_time_error(completed_at: Optional[datetime], now: datetime) -> Optional[str]:
+        """Error si el completed_at informado está en el futuro o fuera de la ventana offline"""
+        if completed_at is None:
+            return None
+        completed_at = SurveyService._server_time(completed_at)
+        if completed_at > now + timedelta(seconds=settings.BULK_CLOCK_SKEW_SECONDS):
+            return "La fecha de respuesta está en el futuro"
+        if completed_at < now - timedelta(days=settings.BULK_OFFLINE_MAX_AGE_DAYS):
+            return f"La fecha de respuesta tiene más de {settings.BULK_OFFLINE_MAX_AGE_DAYS} días"
+        return None
+
+    @staticmethod
+    def persist_responses_bulk(
+        db: Session,
+        survey_id: UUID,
+        items: List[BulkSurveyResponseItem],
+        sources: List[Tuple[Optional[str], Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Inserta las respuestas válidas de submit_responses_bulk sin hacer commit.
+        `sources` tiene el (ip_address, user_agent) de cada ítem.
+
+        El completed_at informado (respuestas offline) se valida contra la ventana
+        offline y se usa como started_at y completed_at: la respuesta cae en el
+        mes en que se respondió y con la edad que tenía el encuestado, en los
+        rollups y en los demás motores. Sin completed_at se usa la hora del servidor.
+        """
+        definition = survey_definitions.get(db, survey_id)
+        if not definition:
+            raise ValueError("Encuesta no encontrada")
+        if not definition.is_active:
+            raise ValueError("Esta encuesta no está disponible actualmente")
+        max_responses = definition.max_responses_per_user
+
+        # Usuarios existentes y sus contadores de respuestas, bloqueados hasta el commit
+        user_ids = {item.user_id for item in items}
+        existing_users = {
+            row.id for row in db.query(User.id).filter(User.id.in_(user_ids)).all()
+        }
+        completed_counts = SurveyService._lock_response_counts(db, survey_id, existing_users)
 
-        # Calcular respuestas de este mes
         now = datetime.now()
-        first_day_of_month = datetime(now.year, now.month, 1)
-        monthly_responses = sum(
-            1 for response, _ in responses
-            if response.started_at and response.started_at.replace(tzinfo=None) >= first_day_of_month
+        results: List[Dict[str, Any]] = []
+        response_rows: List[Dict[str, Any]] = []
+        answer_rows: List[Dict[str, Any]] = []
+        point_awards: List[Tuple[UUID, int, UUID]] = []
+        rollup_responses: List[Tuple[UUID, List[AnswerCreate], datetime]] = []
+
+        for index, (item, (ip_address, user_agent)) in enumerate(zip(items, sources)):
+            result = {
+                "index": index,
+                "client_ref": item.client_ref,
+                "success": False,
+                "response_id": None,
+                "points_earned": 0,
+                "error": None,
+            }
+            results.append(result)
+
+            error = None
+            if item.user_id not in existing_users:
+                error = "Usuario no encontrado"
+            elif max_responses > 0 and completed_counts.get(item.user_id, 0) >= max_responses:
+                error = "Ya alcanzaste el límite de respuestas para esta encuesta"
+            else:
+                error = (
+                    SurveyService._offline_time_error(item.completed_at, now)
+                    or definition.validate_answers(item.answers)
+                )
+            if error:
+                result["error"] = error
+                continue
+
+            points_earned = definition.score(item.answers, item.completed)
+
+            answered_at = SurveyService._server_time(item.completed_at) if item.completed_at else now
+            response_id = uuid4()
+            response_rows.append({
+                "id": response_id,
+                "survey_id": survey_id,
+                "user_id": item.user_id,
+                "completed": item.completed,
+                "points_earned": points_earned,
+                "started_at": answered_at,
+                "completed_at": answered_at if item.completed else None,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            })
+            answer_rows.extend(
+                {
+                    "id": uuid4(),
+                    "response_id": response_id,
+                    "question_id": answer.question_id,
+                    "option_id": answer.option_id,
+                    "answer_text": answer.answer_text,
+                    "rating": answer.rating,
+                    "percentage_data": answer.percentage_data,
+                }
+                for answer in item.answers
+            )
+
+            if item.completed:
+                completed_counts[item.user_id] = completed_counts.get(item.user_id, 0) + 1
+                point_awards.append((item.user_id, points_earned, response_id))
+                rollup_responses.append((item.user_id, item.answers, answered_at))
+
+            result.update(success=True, response_id=response_id, points_earned=points_earned)
+
+        if not response_rows:
+            return results
+
+        db.execute(insert(SurveyResponse), response_rows)
+        if answer_rows:
+            db.execute(insert(Answer), answer_rows)
+
+        PointsService.award_many(db, point_awards)
+
+        SurveyRollupService.record_responses(db, survey_id, rollup_responses)
+
+        if point_awards:
+            # Los contadores están bloqueados: se escriben los valores finales
+            completed_users = {user_id for user_id, _, _ in point_awards}
+            db.execute(
+                UserSurveyResponseCount.__table__.update().where(
+                    UserSurveyResponseCount.survey_id == survey_id,
+                    UserSurveyResponseCount.user_id == bindparam("counter_user_id")
+                ).values(completed_count=bindparam("counter_count"), updated_at=func.now()),
+                [
+                    {"counter_user_id": user_id, "counter_count": count}
+                    for user_id, count in sorted(completed_counts.items(), key=lambda entry: str(entry[0]))
+                    if user_id in completed_users
+                ]
+            )
+        return results
+
+    @staticmethod
+    def get_survey_results(
+        db: Session,
+        survey_id: UUID,
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Obtiene los resultados y estadísticas demográficas de una encuesta.
+        Retorna KPIs por edad, ciudad y barrio, más resumen de respuestas por pregunta.
+
+        El payload se cachea hasta la próxima respuesta completada; si se pasa
+        `version` (el ETag de get_results_version) solo se usa el cache de esa versión.
+        """
+        key = cache_key("survey-results", survey_id)
+        cached = cache.get(key)
+        if cached is not None and (version is None or cached["version"] == version):
+            return cached["payload"]
+
+        # Se cachea ya serializado a JSON para que sea igual en memoria y en Redis
+        results = jsonable_encoder(SurveyService._compute_survey_results(db, survey_id))
+        cache.set(
+            key,
+            {"version": version, "payload": results},
+            ttl=settings.CACHE_RESULTS_TTL_SECONDS
         )
+        return results
+
+    @staticmethod
+    def _compute_survey_results(db: Session, survey_id: UUID) -> Dict[str, Any]:
+        """
+        Calcula los resultados con el motor elegido en RESULTS_ENGINE: rollups
+        incrementales, recálculo agrupado en PostgreSQL, cubo columnar en
+        memoria o una pasada sobre un cursor del lado del servidor.
+        """
+        if settings.RESULTS_ENGINE == "cube":
+            accumulator = response_cubes.accumulate(db, survey_id)
+        elif settings.RESULTS_ENGINE == "sql":
+            accumulator = SurveyResultsAggregator.aggregate(db, survey_id)
+        elif settings.RESULTS_ENGINE == "stream":
+            accumulator = SurveyResultsStreamer.aggregate(db, survey_id)
+        else:
+            accumulator = SurveyRollupService.load(db, survey_id)
+        return SurveyService._build_results(db, survey_id, accumulator)
 
-        if total_responses == 0:
+    @staticmethod
+    def _build_results(
+        db: Session,
+        survey_id: UUID,
+        accumulator: ResultsAccumulator
+    ) -> Dict[str, Any]:
+        """Arma el payload de resultados a partir de las celdas acumuladas"""
+        if accumulator.total_responses == 0:
             return {
                 "survey_id": str(survey_id),
                 "total_responses": 0,
@@ -260,332 +792,146 @@ class SurveyService:
                 "questions_summary": []
             }
 
-        # Calcular edad y agrupar
-        def calculate_age(birth_date: date) -> Optional[int]:
-            if not birth_date:
-                return None
-            today = date.today()
-            return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-
-        def get_age_group(age: Optional[int]) -> str:
-            if age is None:
-                return "Sin especificar"
-            if age < 18:
-                return "Menor de 18"
-            elif age < 31:
-                return "18-30"
-            elif age < 46:
-                return "31-45"
-            elif age < 61:
-                return "46-60"
-            else:
-                return "60+"
-
-        # Contadores demográficos
-        age_groups: Dict[str, int] = {}
-        cities: Dict[str, int] = {}
-        neighborhoods: Dict[str, int] = {}
-
-        # Mapeo usuario -> grupo de edad para filtrar respuestas
-        user_age_groups: Dict[UUID, str] = {}
-
-        for response, user in responses:
-            # Por grupo de edad
-            age = calculate_age(user.birth_date)
-            age_group = get_age_group(age)
-            age_groups[age_group] = age_groups.get(age_group, 0) + 1
-            user_age_groups[user.id] = age_group
-
-            # Por ciudad
-            city = user.city or "Sin especificar"
-            cities[city] = cities.get(city, 0) + 1
-
-            # Por barrio
-            neighborhood = user.neighborhood or "Sin especificar"
-            neighborhoods[neighborhood] = neighborhoods.get(neighborhood, 0) + 1
-
         # Obtener preguntas de la encuesta con sus opciones
-        questions = db.query(Question).filter(
+        questions = db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(
             Question.survey_id == survey_id
         ).order_by(Question.order_index).all()
 
-        # Obtener todas las respuestas (answers) para esta encuesta
-        response_ids = [r.id for r, _ in responses]
-        all_answers = db.query(Answer).filter(
-            Answer.response_id.in_(response_ids)
-        ).all()
-
-        # Crear mapeo response_id -> user_id para obtener grupo de edad
-        response_user_map = {r.id: u.id for r, u in responses}
-
         # Construir resumen por pregunta
         questions_summary = []
 
         for question in questions:
-            question_answers = [a for a in all_answers if a.question_id == question.id]
-
-            # Obtener opciones de la pregunta
-            options = {opt.id: {"text": opt.option_text, "value": opt.option_value}
-                      for opt in question.options}
+            overall = accumulator.collapse(question.id)
 
             question_data = {
                 "question_id": str(question.id),
                 "question_text": question.question_text,
                 "question_type": question.question_type.value,
-                "total_answers": len(question_answers),
+                "total_answers": overall.answers,
                 "results": {},
                 "results_by_age": {}
             }
 
-            if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
-                # Crear mapeo de option_id (UUID string) -> option_value y option_text
-                option_id_map = {}
-                for opt in question.options:
-                    option_id_map[str(opt.id)] = {
-                        "value": opt.option_value,
-                        "text": opt.option_text
-                    }
-
-                # Promediar los porcentajes de todas las respuestas
-                percentage_totals: Dict[str, float] = {}
-                percentage_counts: Dict[str, int] = {}
-
-                # También por grupo de edad
-                percentage_by_age: Dict[str, Dict[str, List[float]]] = {}
-
-                for answer in question_answers:
-                    if answer.percentage_data:
-                        user_id = response_user_map.get(answer.response_id)
-                        user_age = user_age_groups.get(user_id, "Sin especificar")
-
-                        for key, value in answer.percentage_data.items():
-                            # Convertir UUID key a option_value
-                            option_info = option_id_map.get(key)
-                            if option_info:
-                                option_key = option_info["value"]
-                            else:
-                                option_key = key  # Fallback si no se encuentra
-
-                            # General
-                            percentage_totals[option_key] = percentage_totals.get(option_key, 0) + value
-                            percentage_counts[option_key] = percentage_counts.get(option_key, 0) + 1
-
-                            # Por edad
-                            if user_age not in percentage_by_age:
-                                percentage_by_age[user_age] = {}
-                            if option_key not in percentage_by_age[user_age]:
-                                percentage_by_age[user_age][option_key] = []
-                            percentage_by_age[user_age][option_key].append(value)
-
-                # Calcular promedios generales
-                results = {}
-                for key in percentage_totals:
-                    avg = percentage_totals[key] / percentage_counts[key] if percentage_counts[key] > 0 else 0
-                    # Buscar el texto de la opción por option_value
-                    option_text = key
-                    for opt in question.options:
-                        if opt.option_value == key:
-                            option_text = opt.option_text
-                            break
-                    results[key] = {
-                        "label": option_text,
-                        "percentage": round(avg, 1)
-                    }
-
-                question_data["results"] = results
-
-                # Calcular promedios por grupo de edad
-                results_by_age = {}
-                for age_grp, categories in percentage_by_age.items():
-                    results_by_age[age_grp] = {}
-                    for key, values in categories.items():
-                        avg = sum(values) / len(values) if values else 0
-                        option_text = key
-                        for opt in question.options:
-                            if opt.option_value == key:
-                                option_text = opt.option_text
-                                break
-                        results_by_age[age_grp][key] = {
-                            "label": option_text,
-                            "percentage": round(avg, 1)
-                        }
-
-                question_data["results_by_age"] = results_by_age
-
-            elif question.question_type == QuestionType.SINGLE_CHOICE:
-                # Contar votos por opción
-                vote_counts: Dict[str, int] = {}
-                votes_by_age: Dict[str, Dict[str, int]] = {}
-
-                for answer in question_answers:
-                    if answer.option_id:
-                        opt_id = str(answer.option_id)
-                        vote_counts[opt_id] = vote_counts.get(opt_id, 0) + 1
-
-                        # Por grupo de edad
-                        user_id = response_user_map.get(answer.response_id)
-                        user_age = user_age_groups.get(user_id, "Sin especificar")
-
-                        if user_age not in votes_by_age:
-                            votes_by_age[user_age] = {}
-                        votes_by_age[user_age][opt_id] = votes_by_age[user_age].get(opt_id, 0) + 1
-
-                total_votes = sum(vote_counts.values())
-
-                # Resultados generales
-                results = {}
-                for opt_id, count in vote_counts.items():
-                    opt_uuid = UUID(opt_id)
-                    if opt_uuid in options:
-                        opt_info = options[opt_uuid]
-                        percentage = (count / total_votes * 100) if total_votes > 0 else 0
-                        results[opt_info["value"]] = {
-                            "label": opt_info["text"],
-                            "votes": count,
-                            "percentage": round(percentage, 1)
-                        }
-
-                question_data["results"] = results
-
-                # Resultados por grupo de edad
-                results_by_age = {}
-                for age_grp, age_votes in votes_by_age.items():
-                    age_total = sum(age_votes.values())
-                    results_by_age[age_grp] = {}
-                    for opt_id, count in age_votes.items():
-                        opt_uuid = UUID(opt_id)
-                        if opt_uuid in options:
-                            opt_info = options[opt_uuid]
-                            percentage = (count / age_total * 100) if age_total > 0 else 0
-                            results_by_age[age_grp][opt_info["value"]] = {
-                                "label": opt_info["text"],
-                                "votes": count,
-                                "percentage": round(percentage, 1)
-                            }
-
-                question_data["results_by_age"] = results_by_age
-
-            elif question.question_type == QuestionType.RATING:
-                # Calcular promedio de calificaciones
-                ratings = [a.rating for a in question_answers if a.rating is not None]
-                avg_rating = sum(ratings) / len(ratings) if ratings else 0
-
-                # Distribución de calificaciones
-                rating_dist = {}
-                for r in range(1, 6):
-                    rating_dist[str(r)] = sum(1 for rating in ratings if rating == r)
-
-                question_data["results"] = {
-                    "average": round(avg_rating, 2),
-                    "total_ratings": len(ratings),
-                    "distribution": rating_dist
-                }
-
-                # Por grupo de edad
-                ratings_by_age: Dict[str, List[int]] = {}
-                for answer in question_answers:
-                    if answer.rating is not None:
-                        user_id = response_user_map.get(answer.response_id)
-                        user_age = user_age_groups.get(user_id, "Sin especificar")
-                        if user_age not in ratings_by_age:
-                            ratings_by_age[user_age] = []
-                        ratings_by_age[user_age].append(answer.rating)
-
-                results_by_age = {}
-                for age_grp, age_ratings in ratings_by_age.items():
-                    avg = sum(age_ratings) / len(age_ratings) if age_ratings else 0
-                    # Distribución por grupo de edad
-                    age_rating_dist = {}
-                    for r in range(1, 6):
-                        age_rating_dist[str(r)] = sum(1 for rating in age_ratings if rating == r)
-                    results_by_age[age_grp] = {
-                        "average": round(avg, 2),
-                        "total_ratings": len(age_ratings),
-                        "distribution": age_rating_dist
-                    }
+            question_data["results"] = format_question_results(question, overall)
 
-                question_data["results_by_age"] = results_by_age
+            results_by_age = {}
+            for age_grp in accumulator.age_groups(question.id):
+                age_cell = accumulator.collapse(question.id, age_group=age_grp)
+                if cell_has_results(question, age_cell):
+                    results_by_age[age_grp] = format_question_results(question, age_cell)
+            question_data["results_by_age"] = results_by_age
 
             questions_summary.append(question_data)
 
         # Calcular evolución histórica por mes
-        evolution_data = SurveyService._calculate_evolution_data(
-            responses, all_answers, questions, user_age_groups, response_user_map
-        )
+        evolution_data = SurveyService._calculate_evolution_data(questions, accumulator)
 
         return {
             "survey_id": str(survey_id),
-            "total_responses": total_responses,
-            "monthly_responses": monthly_responses,
+            "total_responses": accumulator.total_responses,
+            "monthly_responses": accumulator.monthly_responses,
             "demographics": {
-                "by_age_group": age_groups,
-                "by_city": cities,
-                "by_neighborhood": neighborhoods
+                "by_age_group": accumulator.by_age_group,
+                "by_city": accumulator.by_city,
+                "by_neighborhood": accumulator.by_neighborhood
             },
             "questions_summary": questions_summary,
             "evolution_data": evolution_data
         }
 
     @staticmethod
-    def _calculate_evolution_data(
-        responses: List,
-        all_answers: List[Answer],
-        questions: List[Question],
-        user_age_groups: Dict[UUID, str],
-        response_user_map: Dict[UUID, UUID]
+    def get_results_breakdown(
+        db: Session,
+        survey_id: UUID,
+        group_by: List[str],
+        cross: bool = False
     ) -> Dict[str, Any]:
         """
-        Calcula la evolución histórica de respuestas por mes.
-        Agrupa los datos por mes para cada tipo de pregunta.
+        Resultados por pregunta desglosados por dimensiones demográficas
+        (ver survey_results.register_dimension). Con cross=False hay un desglose
+        por cada dimensión; con cross=True uno solo por su producto cruzado,
+        anidado en el orden de group_by. Todo sale de una única agregación.
         """
-        # Crear mapeo de response_id -> fecha de respuesta
-        response_dates = {r.id: r.started_at or r.completed_at for r, _ in responses}
-
-        # Agrupar respuestas por mes
-        from collections import defaultdict
-
-        # Estructura: {month_key: {question_id: [answers]}}
-        answers_by_month: Dict[str, Dict[UUID, List[Answer]]] = defaultdict(lambda: defaultdict(list))
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Dimensiones desconocidas: {', '.join(unknown)} "
+                f"(disponibles: {', '.join(DIMENSIONS)})"
+            )
+        group_by = list(dict.fromkeys(group_by))
+        if not group_by:
+            raise ValueError("Indica al menos una dimensión en group_by")
+        if cross and len(group_by) > MAX_CROSS_DIMENSIONS:
+            raise ValueError(f"El desglose cruzado admite hasta {MAX_CROSS_DIMENSIONS} dimensiones")
 
-        # También por edad: {age_group: {month_key: {question_id: [answers]}}}
-        answers_by_age_month: Dict[str, Dict[str, Dict[UUID, List[Answer]]]] = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(list))
-        )
+        accumulator = SurveyBreakdownAggregator.aggregate(db, survey_id, group_by)
+        breakdowns = [group_by] if cross else [[name] for name in group_by]
 
-        for answer in all_answers:
-            response_date = response_dates.get(answer.response_id)
-            if response_date:
-                # Convertir a naive si tiene timezone
-                if hasattr(response_date, 'replace') and response_date.tzinfo:
-                    response_date = response_date.replace(tzinfo=None)
+        questions = db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(
+            Question.survey_id == survey_id
+        ).order_by(Question.order_index).all()
 
-                month_key = response_date.strftime("%Y-%m")
-                answers_by_month[month_key][answer.question_id].append(answer)
+        questions_summary = []
+        for question in questions:
+            question_breakdowns = {}
+            for dimensions in breakdowns:
+                question_breakdowns[",".join(dimensions)] = _nest({
+                    group: format_question_results(question, cell)
+                    for group, cell in accumulator.cells_by(question.id, dimensions).items()
+                    if cell_has_results(question, cell)
+                })
+
+            questions_summary.append({
+                "question_id": str(question.id),
+                "question_text": question.question_text,
+                "question_type": question.question_type.value,
+                "total_answers": sum(cell.answers for cell in accumulator.cells.get(question.id, {}).values()),
+                "breakdowns": question_breakdowns
+            })
 
-                # Por grupo de edad
-                user_id = response_user_map.get(answer.response_id)
-                age_group = user_age_groups.get(user_id, "Sin especificar")
-                answers_by_age_month[age_group][month_key][answer.question_id].append(answer)
+        return {
+            "survey_id": str(survey_id),
+            "group_by": group_by,
+            "cross": cross,
+            "total_responses": sum(accumulator.respondents.values()),
+            "respondents": {
+                ",".join(dimensions): _nest(accumulator.respondents_by(dimensions))
+                for dimensions in breakdowns
+            },
+            "questions_summary": questions_summary
+        }
 
+    @staticmethod
+    def _calculate_evolution_data(
+        questions: List[Question],
+        accumulator: ResultsAccumulator
+    ) -> Dict[str, Any]:
+        """
+        Calcula la evolución histórica de respuestas por mes.
+        Agrupa los datos por mes para cada tipo de pregunta.
+        """
         # Obtener los últimos 8 meses con datos (o los que haya)
-        sorted_months = sorted(answers_by_month.keys())[-8:]
+        sorted_months = accumulator.months()[-8:]
+        months_labels = [get_month_label(m) for m in sorted_months]
 
-        # Formatear nombres de meses en español
-        month_names = {
-            "01": "Ene", "02": "Feb", "03": "Mar", "04": "Abr",
-            "05": "May", "06": "Jun", "07": "Jul", "08": "Ago",
-            "09": "Sep", "10": "Oct", "11": "Nov", "12": "Dic"
+        return {
+            "months": months_labels,
+            **SurveyService._evolution_series(questions, accumulator, sorted_months)
         }
 
-        def get_month_label(month_key: str) -> str:
-            month_num = month_key.split("-")[1]
-            return month_names.get(month_num, month_num)
-
-        months_labels = [get_month_label(m) for m in sorted_months]
-
+    @staticmethod
+    def _evolution_series(
+        questions: List[Question],
+        accumulator: ResultsAccumulator,
+        buckets: List[str]
+    ) -> Dict[str, Any]:
+        """Series por tipo de pregunta y por grupo de edad para los períodos dados"""
         # Calcular datos de evolución por tipo de pregunta
         evolution_result = {
-            "months": months_labels,
             "percentage_distribution": {},
             "single_choice": {},
             "rating": {},
@@ -593,186 +939,158 @@ class SurveyService:
         }
 
         for question in questions:
-            if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
-                # Crear mapeo option_id -> option_value
-                option_id_map = {str(opt.id): opt.option_value for opt in question.options}
-                option_labels = {opt.option_value: opt.option_text for opt in question.options}
-
-                # Calcular promedio por mes para cada opción
-                option_data: Dict[str, List[float]] = {opt.option_value: [] for opt in question.options}
-
-                for month_key in sorted_months:
-                    month_answers = answers_by_month[month_key].get(question.id, [])
-
-                    # Agregar porcentajes por opción
-                    month_totals: Dict[str, List[float]] = defaultdict(list)
-
-                    for answer in month_answers:
-                        if answer.percentage_data:
-                            for key, value in answer.percentage_data.items():
-                                option_value = option_id_map.get(key, key)
-                                month_totals[option_value].append(value)
-
-                    # Calcular promedio de este mes para cada opción
-                    for opt_value in option_data.keys():
-                        values = month_totals.get(opt_value, [])
-                        avg = sum(values) / len(values) if values else 0
-                        option_data[opt_value].append(round(avg, 1))
-
-                evolution_result["percentage_distribution"] = {
-                    "question_id": str(question.id),
-                    "question_text": question.question_text,
-                    "categories": [
-                        {
-                            "name": option_labels.get(opt_value, opt_value),
-                            "key": opt_value,
-                            "data": data
-                        }
-                        for opt_value, data in option_data.items()
-                    ]
-                }
-
-            elif question.question_type == QuestionType.SINGLE_CHOICE:
-                option_labels = {str(opt.id): opt.option_text for opt in question.options}
-                option_values = {str(opt.id): opt.option_value for opt in question.options}
-
-                # Calcular porcentaje de votos por mes para cada opción
-                option_data: Dict[str, List[float]] = {str(opt.id): [] for opt in question.options}
-
-                for month_key in sorted_months:
-                    month_answers = answers_by_month[month_key].get(question.id, [])
-
-                    # Contar votos por opción
-                    vote_counts: Dict[str, int] = defaultdict(int)
-                    for answer in month_answers:
-                        if answer.option_id:
-                            vote_counts[str(answer.option_id)] += 1
-
-                    total_votes = sum(vote_counts.values())
-
-                    # Calcular porcentaje para cada opción
-                    for opt_id in option_data.keys():
-                        count = vote_counts.get(opt_id, 0)
-                        percentage = (count / total_votes * 100) if total_votes > 0 else 0
-                        option_data[opt_id].append(round(percentage, 1))
-
-                evolution_result["single_choice"] = {
-                    "question_id": str(question.id),
-                    "question_text": question.question_text,
-                    "projects": [
-                        {
-                            "name": option_labels.get(opt_id, ""),
-                            "key": option_values.get(opt_id, opt_id),
-                            "data": data
-                        }
-                        for opt_id, data in option_data.items()
-                    ]
-                }
-
-            elif question.question_type == QuestionType.RATING:
-                # Calcular promedio de calificación por mes
-                rating_data: List[float] = []
+            series = SurveyService._question_evolution(question, accumulator, buckets)
+            if series is None:
+                continue
 
-                for month_key in sorted_months:
-                    month_answers = answers_by_month[month_key].get(question.id, [])
-                    ratings = [a.rating for a in month_answers if a.rating is not None]
-                    avg = sum(ratings) / len(ratings) if ratings else 0
-                    rating_data.append(round(avg, 2))
-
-                evolution_result["rating"] = {
-                    "question_id": str(question.id),
-                    "question_text": question.question_text,
-                    "data": rating_data
-                }
+            key, data = series
+            evolution_result[key] = {
+                "question_id": str(question.id),
+                "question_text": question.question_text,
+                **data
+            }
 
         # Calcular evolución por grupo de edad
-        age_groups_list = ["18-30", "31-45", "46-60", "60+"]
-
-        for age_group in age_groups_list:
+        for age_group in EVOLUTION_AGE_GROUPS:
             age_evolution = {
                 "percentage_distribution": {},
                 "single_choice": {},
                 "rating": {}
             }
 
-            age_months_data = answers_by_age_month.get(age_group, {})
-
             for question in questions:
-                if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
-                    option_id_map = {str(opt.id): opt.option_value for opt in question.options}
-                    option_labels = {opt.option_value: opt.option_text for opt in question.options}
-                    option_data: Dict[str, List[float]] = {opt.option_value: [] for opt in question.options}
-
-                    for month_key in sorted_months:
-                        month_answers = age_months_data.get(month_key, {}).get(question.id, [])
-                        month_totals: Dict[str, List[float]] = defaultdict(list)
-
-                        for answer in month_answers:
-                            if answer.percentage_data:
-                                for key, value in answer.percentage_data.items():
-                                    option_value = option_id_map.get(key, key)
-                                    month_totals[option_value].append(value)
-
-                        for opt_value in option_data.keys():
-                            values = month_totals.get(opt_value, [])
-                            avg = sum(values) / len(values) if values else 0
-                            option_data[opt_value].append(round(avg, 1))
-
-                    age_evolution["percentage_distribution"] = {
-                        "categories": [
-                            {
-                                "name": option_labels.get(opt_value, opt_value),
-                                "key": opt_value,
-                                "data": data
-                            }
-                            for opt_value, data in option_data.items()
-                        ]
-                    }
+                series = SurveyService._question_evolution(
+                    question, accumulator, buckets, age_group=age_group
+                )
+                if series is not None:
+                    key, data = series
+                    age_evolution[key] = data
 
-                elif question.question_type == QuestionType.SINGLE_CHOICE:
-                    option_labels = {str(opt.id): opt.option_text for opt in question.options}
-                    option_values = {str(opt.id): opt.option_value for opt in question.options}
-                    option_data: Dict[str, List[float]] = {str(opt.id): [] for opt in question.options}
-
-                    for month_key in sorted_months:
-                        month_answers = age_months_data.get(month_key, {}).get(question.id, [])
-                        vote_counts: Dict[str, int] = defaultdict(int)
-
-                        for answer in month_answers:
-                            if answer.option_id:
-                                vote_counts[str(answer.option_id)] += 1
-
-                        total_votes = sum(vote_counts.values())
-
-                        for opt_id in option_data.keys():
-                            count = vote_counts.get(opt_id, 0)
-                            percentage = (count / total_votes * 100) if total_votes > 0 else 0
-                            option_data[opt_id].append(round(percentage, 1))
-
-                    age_evolution["single_choice"] = {
-                        "projects": [
-                            {
-                                "name": option_labels.get(opt_id, ""),
-                                "key": option_values.get(opt_id, opt_id),
-                                "data": data
-                            }
-                            for opt_id, data in option_data.items()
-                        ]
-                    }
+            evolution_result["by_age"][age_group] = age_evolution
 
-                elif question.question_type == QuestionType.RATING:
-                    rating_data: List[float] = []
+        return evolution_result
 
-                    for month_key in sorted_months:
-                        month_answers = age_months_data.get(month_key, {}).get(question.id, [])
-                        ratings = [a.rating for a in month_answers if a.rating is not None]
-                        avg = sum(ratings) / len(ratings) if ratings else 0
-                        rating_data.append(round(avg, 2))
+    @staticmethod
+    def get_results_timeseries(
+        db: Session,
+        survey_id: UUID,
+        granularity: str = "month",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Serie temporal de resultados por día, semana o mes de completed_at.
+        Los períodos se calculan con date_trunc en PostgreSQL; start/end
+        (end excluido) acotan la ventana con un range scan sobre el índice
+        (survey_id, completed_at). Los períodos sin respuestas se completan con 0.
+        """
+        if granularity not in TIMESERIES_GRANULARITIES:
+            raise ValueError(f"Granularidad inválida: {granularity}")
+        if start and end and start >= end:
+            raise ValueError("El inicio de la ventana debe ser anterior al fin")
 
-                    age_evolution["rating"] = {
-                        "data": rating_data
+        respondents = SurveyResultsAggregator.respondents_subquery(
+            db, survey_id, granularity, start, end
+        )
+        responses_by_bucket = SurveyResultsAggregator.count_by_bucket(db, respondents)
+
+        accumulator = ResultsAccumulator()
+        if responses_by_bucket:
+            SurveyResultsAggregator.aggregate_answers(db, accumulator, respondents)
+
+        # Todos los períodos de la ventana (o entre el primero y el último con datos)
+        first_day = start.date() if start else None
+        last_day = (end - timedelta(microseconds=1)).date() if end else None
+        if responses_by_bucket:
+            first_day = first_day or date.fromisoformat(min(responses_by_bucket))
+            last_day = last_day or date.fromisoformat(max(responses_by_bucket))
+
+        buckets = bucket_keys(granularity, first_day, last_day) if first_day and last_day else []
+        if len(buckets) > MAX_TIMESERIES_BUCKETS:
+            raise ValueError(
+                f"La ventana tiene {len(buckets)} períodos (máximo {MAX_TIMESERIES_BUCKETS}); "
+                "usa una granularidad mayor o una ventana más corta"
+            )
+
+        questions = db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(
+            Question.survey_id == survey_id
+        ).order_by(Question.order_index).all()
+
+        return {
+            "survey_id": str(survey_id),
+            "granularity": granularity,
+            "from": start.isoformat() if start else None,
+            "to": end.isoformat() if end else None,
+            "buckets": buckets,
+            "labels": [get_bucket_label(b, granularity) for b in buckets],
+            "responses": [responses_by_bucket.get(b, 0) for b in buckets],
+            **SurveyService._evolution_series(questions, accumulator, buckets)
+        }
+
+    @staticmethod
+    def _question_evolution(
+        question: Question,
+        accumulator: ResultsAccumulator,
+        months: List[str],
+        age_group: Optional[str] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Serie por período de una pregunta, opcionalmente filtrada por grupo de edad"""
+        month_cells = [
+            accumulator.collapse(question.id, age_group=age_group, month_key=m)
+            for m in months
+        ]
+
+        if question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION:
+            # Calcular promedio por mes para cada opción
+            option_data: Dict[str, List[float]] = {opt.option_value: [] for opt in question.options}
+            option_labels = {opt.option_value: opt.option_text for opt in question.options}
+
+            for cell in month_cells:
+                month_totals = percentages_by_value(question, cell)
+                for opt_value in option_data.keys():
+                    total, count = month_totals.get(opt_value, (0, 0))
+                    avg = total / count if count else 0
+                    option_data[opt_value].append(round(avg, 1))
+
+            return "percentage_distribution", {
+                "categories": [
+                    {
+                        "name": option_labels.get(opt_value, opt_value),
+                        "key": opt_value,
+                        "data": data
                     }
+                    for opt_value, data in option_data.items()
+                ]
+            }
 
-            evolution_result["by_age"][age_group] = age_evolution
+        elif question.question_type == QuestionType.SINGLE_CHOICE:
+            # Calcular porcentaje de votos por mes para cada opción
+            option_data: Dict[UUID, List[float]] = {opt.id: [] for opt in question.options}
+
+            for cell in month_cells:
+                total_votes = sum(cell.votes.values())
+                for opt_id in option_data.keys():
+                    count = cell.votes.get(opt_id, 0)
+                    percentage = (count / total_votes * 100) if total_votes > 0 else 0
+                    option_data[opt_id].append(round(percentage, 1))
+
+            return "single_choice", {
+                "projects": [
+                    {
+                        "name": opt.option_text,
+                        "key": opt.option_value,
+                        "data": option_data[opt.id]
+                    }
+                    for opt in question.options
+                ]
+            }
 
-        return evolution_result
+        elif question.question_type == QuestionType.RATING:
+            # Calcular promedio de calificación por mes
+            return "rating", {
+                "data": [format_rating_results(cell)["average"] for cell in month_cells]
+            }
+
+        return None
@@ -5,6 +5,7 @@ from uuid import UUID
 from app.models.user import User
 from app.models.points import UserPoints
 from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import cache, cache_key
 
 
 class UserService:
@@ -55,6 +56,7 @@ class UserService:
 
         db.commit()
         db.refresh(user)
+        cache.delete(cache_key("me", "user", user.id))
         return user
 
     @staticmethod
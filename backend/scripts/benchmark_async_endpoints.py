@@ -0,0 +1,104 @@
+"""
+Benchmark de capacidad de los endpoints de lectura contra un servidor corriendo.
+
+Dispara GETs con distintos niveles de concurrencia y reporta requests por
+segundo y latencias p50/p95 por endpoint. Sirve para comparar un worker con el
+engine async contra el mismo worker en una versión anterior (endpoints sync en
+el threadpool), por ejemplo con `uvicorn app.main:app --workers 1`.
+
+Ejecutar:
+    python -m scripts.benchmark_async_endpoints                          # localhost:8000
+    python -m scripts.benchmark_async_endpoints --base-url http://host:8000 \\
+        --concurrency 10 50 200 --requests 2000 --token <access token>
+
+Sin --token solo se miden los endpoints públicos (/surveys/active y /surveys/{id});
+con un token de usuario se mide también /responses/my-responses.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+API_PREFIX = "/api/v1"
+
+
+async def run_level(client: httpx.AsyncClient, path: str, requests: int, concurrency: int, headers: dict):
+    """Hace `requests` GETs a `path` con `concurrency` en vuelo; retorna (req/s, latencias, errores)"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            began = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    return requests / elapsed, latencies, errors
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def benchmark(args):
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        active = await client.get(f"{API_PREFIX}/surveys/active")
+        if active.status_code != 200:
+            print(f"❌ GET /surveys/active respondió {active.status_code}; ¿hay una encuesta activa?")
+            sys.exit(1)
+
+        endpoints = [
+            ("/surveys/active", {}),
+            (f"/surveys/{active.json()['id']}", {}),
+        ]
+        if args.token:
+            endpoints.append(("/responses/my-responses", {"Authorization": f"Bearer {args.token}"}))
+
+        # Calentar caches y pools de conexiones
+        for path, headers in endpoints:
+            await run_level(client, f"{API_PREFIX}{path}", max(args.concurrency), max(args.concurrency), headers)
+
+        print(f"{args.requests} requests por medición contra {args.base_url}\n")
+        print(f"{'endpoint':<28}  {'concurrencia':>12}  {'req/s':>8}  {'p50 ms':>7}  {'p95 ms':>7}  {'errores':>7}")
+        for path, headers in endpoints:
+            for concurrency in args.concurrency:
+                rate, latencies, errors = await run_level(
+                    client, f"{API_PREFIX}{path}", args.requests, concurrency, headers
+                )
+                label = path if len(path) <= 28 else path[:25] + "..."
+                print(f"{label:<28}  {concurrency:>12}  {rate:>8.0f}  "
+                      f"{percentile(latencies, 0.5) * 1000:>7.1f}  {percentile(latencies, 0.95) * 1000:>7.1f}  "
+                      f"{errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests por medición")
+    parser.add_argument("--token", help="Access token de un usuario para medir /responses/my-responses")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
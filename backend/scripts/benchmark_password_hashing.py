@@ -0,0 +1,66 @@
+"""
+Benchmark del hashing de contraseñas (bcrypt).
+
+Mide inicios de sesión por segundo (verificaciones de bcrypt) para cada costo:
+en el mismo proceso (un core) y con el pool de procesos dedicado que usa la API
+(PasswordHasherPool), con varios threads concurrentes como los del threadpool
+de FastAPI. Sirve para elegir BCRYPT_ROUNDS y BCRYPT_POOL_SIZE.
+
+Ejecutar:
+    python -m scripts.benchmark_password_hashing                      # costos 10-12
+    python -m scripts.benchmark_password_hashing --rounds 12 13 --workers 4 --logins 200
+"""
+
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import PasswordHasherPool, _checkpw, _hashpw
+
+PASSWORD = b"benchmark-password"
+
+
+def inline_rate(hashed: bytes, logins: int) -> float:
+    """Verificaciones por segundo en el proceso actual"""
+    began = time.perf_counter()
+    for _ in range(logins):
+        _checkpw(PASSWORD, hashed)
+    return logins / (time.perf_counter() - began)
+
+
+def pool_rate(pool: PasswordHasherPool, hashed: bytes, logins: int, concurrency: int) -> float:
+    """Verificaciones por segundo a través del pool, con `concurrency` threads"""
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: pool.run(_checkpw, PASSWORD, hashed), range(logins)))
+    return logins / (time.perf_counter() - began)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool")
+    parser.add_argument("--concurrency", type=int, default=None, help="Threads que piden hashes (default: 4 × workers)")
+    parser.add_argument("--logins", type=int, default=100, help="Verificaciones por medición")
+    args = parser.parse_args()
+    concurrency = args.concurrency or args.workers * 4
+
+    pool = PasswordHasherPool(args.workers, max_pending=concurrency)
+    # Levantar los procesos antes de medir
+    pool.run(_hashpw, PASSWORD, 4)
+
+    print(f"{args.logins} logins por medición, pool de {args.workers} procesos, {concurrency} threads\n")
+    print(f"{'costo':>5}  {'ms/login':>9}  {'logins/s/core':>13}  {'logins/s pool':>13}  {'por proceso':>11}")
+    for rounds in args.rounds:
+        hashed = _hashpw(PASSWORD, rounds)
+        single = inline_rate(hashed, args.logins)
+        pooled = pool_rate(pool, hashed, args.logins * args.workers, concurrency)
+        print(f"{rounds:>5}  {1000 / single:>9.1f}  {single:>13.1f}  {pooled:>13.1f}  {pooled / args.workers:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de memoria del cálculo de resultados en modo streaming.
+
+Compara el pico de memoria de SurveyResultsStreamer.fold consumiendo las filas
+de a una (como lo hace con un cursor del lado del servidor) contra materializar
+todas las filas antes de acumular (como hacía get_survey_results con .all()).
+
+Ejecutar:
+    python -m scripts.benchmark_results_memory                  # datos sintéticos
+    python -m scripts.benchmark_results_memory --answers 1000000
+    python -m scripts.benchmark_results_memory --survey-id <id> # encuesta real
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.survey_results import SurveyResultsStreamer
+
+ANSWERS_PER_RESPONSE = 10
+NEIGHBORHOODS = [f"Barrio {i}" for i in range(30)]
+
+
+def synthetic_rows(total_answers: int, seed: int = 42):
+    """Filas como las devuelve stream_rows, agrupadas por respuesta"""
+    rng = random.Random(seed)
+    questions = [uuid.UUID(int=q + 1) for q in range(ANSWERS_PER_RESPONSE)]
+    options = [[uuid.UUID(int=1000 + q * 10 + o) for o in range(5)] for q in range(ANSWERS_PER_RESPONSE)]
+    start = datetime(2025, 1, 1)
+
+    for _ in range(total_answers // ANSWERS_PER_RESPONSE):
+        response_id = uuid.UUID(int=rng.getrandbits(128))
+        started_at = start + timedelta(minutes=rng.randrange(60 * 24 * 365))
+        birth_date = date(rng.randint(1940, 2007), rng.randint(1, 12), rng.randint(1, 28))
+        neighborhood = rng.choice(NEIGHBORHOODS)
+
+        for q, question_id in enumerate(questions):
+            kind = q % 3
+            yield (
+                response_id, started_at, started_at, birth_date, "Alta Gracia", neighborhood,
+                question_id,
+                rng.choice(options[q]) if kind == 0 else None,
+                rng.randint(1, 5) if kind == 1 else None,
+                {str(options[q][0]): 40.0, str(options[q][1]): 60.0} if kind == 2 else None,
+            )
+
+
+def measure(label: str, func):
+    """Ejecuta func y reporta tiempo y pico de memoria (tracemalloc)"""
+    tracemalloc.start()
+    began = time.perf_counter()
+    accumulator = func()
+    elapsed = time.perf_counter() - began
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<14} respuestas={accumulator.total_responses:>8}  "
+          f"pico={peak / 1024 / 1024:8.1f} MB  tiempo={elapsed:6.2f} s")
+    return peak
+
+
+def run_synthetic(sizes):
+    print("Datos sintéticos (pico de memoria durante la agregación)")
+    for total_answers in sizes:
+        print(f"{total_answers} answers:")
+        measure("streaming", lambda: SurveyResultsStreamer.fold(synthetic_rows(total_answers)))
+        measure("materializado", lambda: SurveyResultsStreamer.fold(list(synthetic_rows(total_answers))))
+
+
+def run_database(survey_id: uuid.UUID):
+    from app.db.base import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Encuesta {survey_id}:")
+        measure("streaming", lambda: SurveyResultsStreamer.aggregate(db, survey_id))
+        db.rollback()
+        measure("materializado", lambda: SurveyResultsStreamer.fold(
+            SurveyResultsStreamer.stream_rows(db, survey_id).all()
+        ))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, action="append",
+                        help="Cantidad de answers sintéticas (repetible)")
+    parser.add_argument("--survey-id", type=uuid.UUID, help="Medir contra una encuesta de la base")
+    args = parser.parse_args()
+
+    if args.survey_id:
+        run_database(args.survey_id)
+    else:
+        run_synthetic(args.answers or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,55 @@
+"""
+Compara los rollups de resultados contra un recálculo completo.
+
+Ejecutar:
+    python -m scripts.check_result_rollups            # todas las encuestas
+    python -m scripts.check_result_rollups <id>       # una encuesta
+    python -m scripts.check_result_rollups --fix      # regenera las inconsistentes
+"""
+
+import sys
+import os
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.base import SessionLocal
+from app.models.survey import Survey
+from app.services.rollup_service import SurveyRollupService
+
+
+def check(survey_ids, fix: bool = False) -> int:
+    """Retorna la cantidad de encuestas con rollups inconsistentes"""
+    db = SessionLocal()
+    inconsistent = 0
+    try:
+        if not survey_ids:
+            survey_ids = [row.id for row in db.query(Survey.id).all()]
+
+        for survey_id in survey_ids:
+            differences = SurveyRollupService.check_consistency(db, survey_id)
+            db.rollback()
+
+            if not differences:
+                print(f"✓ {survey_id}: consistente")
+                continue
+
+            inconsistent += 1
+            print(f"✗ {survey_id}: {len(differences)} diferencias")
+            for diff in differences[:20]:
+                print(f"    {diff['table']} {diff['key']}: guardado={diff['stored']} esperado={diff['expected']}")
+
+            if fix:
+                SurveyRollupService.rebuild(db, survey_id)
+                print("  → rollups regenerados")
+    finally:
+        db.close()
+
+    return inconsistent
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fix = "--fix" in args
+    ids = [UUID(arg) for arg in args if arg != "--fix"]
+    sys.exit(1 if check(ids, fix=fix) and not fix else 0)
@@ -0,0 +1,52 @@
+"""
+Worker de la cola de envíos (SUBMISSION_INGESTION_MODE=queue).
+
+Levanta N threads que drenan submission_queue en lotes; se pueden correr
+varios procesos en paralelo (FOR UPDATE SKIP LOCKED reparte los lotes).
+
+Ejecutar:
+    python -m scripts.run_submission_worker
+    python -m scripts.run_submission_worker --threads 4
+"""
+
+import sys
+import os
+import argparse
+import logging
+import signal
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.submission_queue import run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        print("Deteniendo workers...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    threads = [
+        threading.Thread(target=run_worker, args=(stop_event,), name=f"submission-worker-{i}")
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"✅ {len(threads)} workers de submission_queue corriendo")
+
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
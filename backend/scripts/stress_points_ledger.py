@@ -0,0 +1,175 @@
+"""
+Stress test del libro de puntos.
+
+Crea un usuario temporal, dispara envíos completados concurrentes de una
+encuesta (cada uno en su propia sesión, como requests paralelos) y verifica que
+user_points.total_points y available_points sean iguales a la suma de las
+point_transactions del usuario y a lo esperado por los envíos aceptados.
+
+Al terminar borra el usuario y sus respuestas y regenera los rollups de la
+encuesta (salvo --keep).
+
+Ejecutar:
+    python -m scripts.stress_points_ledger                        # encuesta activa
+    python -m scripts.stress_points_ledger --survey-id <id> --submissions 500 --workers 50
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app.db.base import SessionLocal
+from app.models.user import User
+from app.models.response import SurveyResponse, UserSurveyResponseCount
+from app.models.points import UserPoints, PointTransaction
+from app.models.survey import QuestionType
+from app.schemas.response import SurveyResponseCreate, AnswerCreate
+from app.services.survey_service import SurveyService
+from app.services.survey_definition import survey_definitions
+from app.services.rollup_service import SurveyRollupService
+
+
+def build_answers(definition):
+    """Una answer válida por pregunta de la encuesta"""
+    answers = []
+    for question in definition.questions.values():
+        option_ids = list(question.option_values)
+        if question.question_type in (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE) and option_ids:
+            answers.append(AnswerCreate(question_id=question.id, option_id=option_ids[0]))
+        elif question.question_type == QuestionType.RATING:
+            answers.append(AnswerCreate(question_id=question.id, rating=random.randint(1, 5)))
+        elif question.question_type == QuestionType.PERCENTAGE_DISTRIBUTION and option_ids:
+            answers.append(AnswerCreate(question_id=question.id, percentage_data={str(option_ids[0]): 100.0}))
+        elif question.question_type == QuestionType.OPEN_TEXT:
+            answers.append(AnswerCreate(question_id=question.id, answer_text="stress test"))
+    return answers
+
+
+def create_user(db) -> uuid.UUID:
+    """Usuario temporal que no puede iniciar sesión"""
+    marker = uuid.uuid4().hex[:12]
+    user = User(
+        cuil=f"99{random.randint(0, 10**9 - 1):09d}",
+        email=f"stress-{marker}@example.invalid",
+        hashed_password="!",
+        name=f"Stress test {marker}",
+    )
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def submit(survey_id: uuid.UUID, user_id: uuid.UUID, answers) -> bool:
+    """Un envío completado en su propia sesión; False si fue rechazado"""
+    db = SessionLocal()
+    try:
+        SurveyService.submit_response(
+            db,
+            SurveyResponseCreate(survey_id=survey_id, user_id=user_id, answers=answers, completed=True),
+            user_agent="stress_points_ledger"
+        )
+        return True
+    except ValueError:
+        return False
+    finally:
+        db.close()
+
+
+def cleanup(db, survey_id: uuid.UUID, user_id: uuid.UUID):
+    """Borra los datos del usuario temporal y regenera los rollups de la encuesta"""
+    db.query(PointTransaction).filter(PointTransaction.user_id == user_id).delete(synchronize_session=False)
+    db.query(UserPoints).filter(UserPoints.user_id == user_id).delete(synchronize_session=False)
+    db.query(UserSurveyResponseCount).filter(
+        UserSurveyResponseCount.user_id == user_id
+    ).delete(synchronize_session=False)
+    db.query(SurveyResponse).filter(SurveyResponse.user_id == user_id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    db.commit()
+    SurveyRollupService.rebuild(db, survey_id)
+    SurveyService.invalidate_results_cache(survey_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--survey-id", type=uuid.UUID, help="Encuesta a usar (default: la activa)")
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="No borrar el usuario ni sus respuestas")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        survey_id = args.survey_id
+        if survey_id is None:
+            survey = SurveyService.get_active_survey(db)
+            if not survey:
+                print("❌ No hay encuesta activa; usa --survey-id")
+                sys.exit(1)
+            survey_id = survey.id
+
+        definition = survey_definitions.get(db, survey_id)
+        if not definition:
+            print(f"❌ Encuesta {survey_id} no encontrada")
+            sys.exit(1)
+
+        answers = build_answers(definition)
+        points_per_submission = definition.score(answers, True)
+        limit = definition.max_responses_per_user
+        expected_accepted = min(args.submissions, limit) if limit else args.submissions
+
+        user_id = create_user(db)
+        print(f"Encuesta {survey_id}: {len(answers)} answers, {points_per_submission} puntos por envío, "
+              f"límite {limit or 'ilimitado'}")
+        print(f"Usuario temporal {user_id}: {args.submissions} envíos con {args.workers} workers...")
+
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            outcomes = list(executor.map(
+                lambda _: submit(survey_id, user_id, answers),
+                range(args.submissions)
+            ))
+        elapsed = time.perf_counter() - began
+        accepted = sum(outcomes)
+
+        balance = db.query(UserPoints).filter(UserPoints.user_id == user_id).first()
+        transactions_total, transactions_count = db.query(
+            func.coalesce(func.sum(PointTransaction.amount), 0),
+            func.count(PointTransaction.id)
+        ).filter(PointTransaction.user_id == user_id).one()
+        total_points = balance.total_points if balance else 0
+        available_points = balance.available_points if balance else 0
+
+        print(f"\n{accepted} envíos aceptados, {len(outcomes) - accepted} rechazados en {elapsed:.2f}s "
+              f"({len(outcomes) / elapsed:.0f} envíos/s)")
+        print(f"total_points={total_points} available_points={available_points} "
+              f"suma de transacciones={transactions_total} ({transactions_count} transacciones)")
+
+        checks = [
+            ("total_points == suma de transacciones", total_points == transactions_total),
+            ("available_points == suma de transacciones", available_points == transactions_total),
+            ("una transacción por envío aceptado", transactions_count == accepted),
+            ("puntos == envíos aceptados × puntos por envío", total_points == accepted * points_per_submission),
+            ("envíos aceptados respetan el límite", accepted == expected_accepted),
+        ]
+        for label, passed in checks:
+            print(f"{'✅' if passed else '❌'} {label}")
+
+        if not args.keep:
+            cleanup(db, survey_id, user_id)
+            print("\nDatos temporales borrados y rollups regenerados")
+
+        if not all(passed for _, passed in checks):
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 import { API_URL } from "@/lib/config";
+import { authFetch, logout } from "@/lib/auth";
 
 interface Client {
   id: string;
@@ -46,7 +47,7 @@ export default function AdminDashboard() {
     const fetchData = async () => {
       try {
         // Verify user is admin
-        const userResponse = await fetch(
+        const userResponse = await authFetch(
           `${API_URL}/api/v1/auth/me`,
           {
             headers: {
@@ -73,7 +74,7 @@ export default function AdminDashboard() {
         }
 
         // Fetch all surveys
-        const surveysResponse = await fetch(
+        const surveysResponse = await authFetch(
           `${API_URL}/api/v1/surveys/`,
           {
             headers: {
@@ -88,7 +89,7 @@ export default function AdminDashboard() {
         }
 
         // Fetch all clients
-        const clientsResponse = await fetch(
+        const clientsResponse = await authFetch(
           `${API_URL}/api/v1/admin/clients/`,
           {
             headers: {
@@ -112,8 +113,8 @@ export default function AdminDashboard() {
     fetchData();
   }, [router]);
 
-  const handleLogout = () => {
-    localStorage.removeItem("access_token");
+  const handleLogout = async () => {
+    await logout();
     router.push("/auth/admin-login");
   };
 
@@ -122,7 +123,7 @@ export default function AdminDashboard() {
     if (!token) return;
 
     try {
-      const response = await fetch(
+      const response = await authFetch(
         `${API_URL}/api/v1/surveys/${surveyId}/toggle`,
         {
           method: "PATCH",
@@ -4,6 +4,7 @@ import { useState } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
 import { API_URL } from "@/lib/config";
+import { storeTokens } from "@/lib/auth";
 
 export default function AdminLoginPage() {
   const router = useRouter();
@@ -43,7 +44,7 @@ export default function AdminLoginPage() {
       }
 
       const data = await response.json();
-      localStorage.setItem("access_token", data.access_token);
+      storeTokens(data);
 
       // Verificar el rol del usuario
       const userResponse = await fetch(
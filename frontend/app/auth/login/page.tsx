@@ -4,6 +4,7 @@ import { useState, Suspense } from "react";
 import { useRouter, useSearchParams } from "next/navigation";
 import Link from "next/link";
 import { API_URL } from "@/lib/config";
+import { storeTokens } from "@/lib/auth";
 
 function LoginForm() {
   const router = useRouter();
@@ -65,7 +66,7 @@ function LoginForm() {
       }
 
       const data = await response.json();
-      localStorage.setItem("access_token", data.access_token);
+      storeTokens(data);
       router.push(redirect);
     } catch (err: any) {
       setError(err.message);
@@ -124,7 +125,7 @@ function LoginForm() {
 
       if (loginResponse.ok) {
         const data = await loginResponse.json();
-        localStorage.setItem("access_token", data.access_token);
+        storeTokens(data);
         router.push("/");
       } else {
         router.push("/auth/login");
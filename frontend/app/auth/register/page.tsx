@@ -4,6 +4,7 @@ import { useState } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
 import { API_URL } from "@/lib/config";
+import { storeTokens } from "@/lib/auth";
 
 export default function RegisterPage() {
   const router = useRouter();
@@ -81,7 +82,7 @@ export default function RegisterPage() {
 
       if (loginResponse.ok) {
         const data = await loginResponse.json();
-        localStorage.setItem("access_token", data.access_token);
+        storeTokens(data);
         router.push("/dashboard");
       } else {
         router.push("/auth/login");
@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 import { API_URL } from "@/lib/config";
+import { authFetch, logout } from "@/lib/auth";
 
 interface Survey {
   id: string;
@@ -35,7 +36,7 @@ export default function ClientDashboard() {
 
     const fetchData = async () => {
       try {
-        const userResponse = await fetch(
+        const userResponse = await authFetch(
           `${API_URL}/api/v1/auth/me`,
           {
             headers: {
@@ -59,7 +60,7 @@ export default function ClientDashboard() {
           setUserName(userData.name || "Cliente");
         }
 
-        const surveysResponse = await fetch(
+        const surveysResponse = await authFetch(
           `${API_URL}/api/v1/surveys/`,
           {
             headers: {
@@ -83,8 +84,8 @@ export default function ClientDashboard() {
     fetchData();
   }, [router]);
 
-  const handleLogout = () => {
-    localStorage.removeItem("access_token");
+  const handleLogout = async () => {
+    await logout();
     router.push("/auth/admin-login");
   };
 
@@ -104,7 +105,7 @@ export default function ClientDashboard() {
     if (!token) return;
 
     try {
-      const response = await fetch(
+      const response = await authFetch(
         `${API_URL}/api/v1/surveys/${surveyId}/toggle`,
         {
           method: "PATCH",
@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import { useRouter, useParams } from "next/navigation";
 import { API_URL } from "@/lib/config";
+import { authFetch } from "@/lib/auth";
 import dynamic from "next/dynamic";
 
 // Importar el componente del mapa dinámicamente para evitar problemas de SSR
@@ -137,7 +138,7 @@ export default function SurveyResultsPage() {
 
     const fetchResults = async () => {
       try {
-        const response = await fetch(
+        const response = await authFetch(
           `${process.env.NEXT_PUBLIC_API_URL}/api/v1/surveys/${surveyId}/results`,
           {
             headers: {
@@ -179,7 +180,7 @@ export default function SurveyResultsPage() {
     const loadCachedInsights = async () => {
       try {
         const token = localStorage.getItem("access_token");
-        const response = await fetch(
+        const response = await authFetch(
           `${process.env.NEXT_PUBLIC_API_URL}/api/v1/surveys/${surveyId}/ai-insights`,
           {
             method: "GET",
@@ -1987,7 +1988,7 @@ export default function SurveyResultsPage() {
 
     try {
       const token = localStorage.getItem("access_token");
-      const response = await fetch(
+      const response = await authFetch(
         `${process.env.NEXT_PUBLIC_API_URL}/api/v1/surveys/${surveyId}/ai-predictions`,
         {
           method: "POST",
@@ -2017,7 +2018,7 @@ export default function SurveyResultsPage() {
 
     try {
       const token = localStorage.getItem("access_token");
-      const response = await fetch(
+      const response = await authFetch(
         `${process.env.NEXT_PUBLIC_API_URL}/api/v1/surveys/${surveyId}/ai-insights`,
         {
           method: "POST",
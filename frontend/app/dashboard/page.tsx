@@ -4,6 +4,7 @@ import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
 import { API_URL } from "@/lib/config";
+import { authFetch, clearTokens, logout, storeTokens } from "@/lib/auth";
 
 interface SurveyResponse {
   id: string;
@@ -82,8 +83,8 @@ export default function DashboardPage() {
   const [selectedResponse, setSelectedResponse] = useState<ResponseDetail | null>(null);
   const [loadingDetail, setLoadingDetail] = useState(false);
 
-  const handleLogout = () => {
-    localStorage.removeItem("access_token");
+  const handleLogout = async () => {
+    await logout();
     router.push("/auth/login");
   };
 
@@ -92,7 +93,7 @@ export default function DashboardPage() {
     if (!token) return;
     setLoadingDetail(true);
     try {
-      const res = await fetch(`${API_URL}/api/v1/responses/my-responses/${responseId}`, {
+      const res = await authFetch(`${API_URL}/api/v1/responses/my-responses/${responseId}`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       if (res.ok) {
@@ -145,7 +146,7 @@ export default function DashboardPage() {
     const token = localStorage.getItem("access_token");
     if (!token) return;
     try {
-      const response = await fetch(`${API_URL}/api/v1/users/me`, {
+      const response = await authFetch(`${API_URL}/api/v1/users/me`, {
         method: "PUT",
         headers: { "Content-Type": "application/json", Authorization: `Bearer ${token}` },
         body: JSON.stringify({ name: editData.name, email: editData.email, phone: editData.phone, gender: editData.gender, address: editData.address, neighborhood: editData.neighborhood, city: editData.city, postal_code: editData.postal_code }),
@@ -168,12 +169,14 @@ export default function DashboardPage() {
     const token = localStorage.getItem("access_token");
     if (!token) return;
     try {
-      const response = await fetch(`${API_URL}/api/v1/users/change-password`, {
+      const response = await authFetch(`${API_URL}/api/v1/users/change-password`, {
         method: "PUT",
         headers: { "Content-Type": "application/json", Authorization: `Bearer ${token}` },
         body: JSON.stringify({ current_password: passwordData.currentPassword, new_password: passwordData.newPassword }),
       });
       if (response.ok) {
+        // Changing the password revokes the other sessions and returns new tokens
+        storeTokens(await response.json());
         setIsChangingPassword(false);
         setPasswordData({ currentPassword: "", newPassword: "", confirmPassword: "" });
         alert("Contraseña actualizada exitosamente");
@@ -189,10 +192,10 @@ export default function DashboardPage() {
     if (!token) { router.push("/auth/login"); return; }
     const fetchData = async () => {
       try {
-        const userResponse = await fetch(`${API_URL}/api/v1/auth/me`, { headers: { Authorization: `Bearer ${token}` } });
+        const userResponse = await authFetch(`${API_URL}/api/v1/auth/me`, { headers: { Authorization: `Bearer ${token}` } });
         if (userResponse.ok) { const ud = await userResponse.json(); setUserName(ud.name || "Usuario"); setUserData(ud); }
-        const responsesResponse = await fetch(`${API_URL}/api/v1/responses/my-responses`, { headers: { Authorization: `Bearer ${token}` } });
-        if (!responsesResponse.ok) { if (responsesResponse.status === 401) { localStorage.removeItem("access_token"); router.push("/auth/login"); return; } throw new Error("Error al cargar las respuestas"); }
+        const responsesResponse = await authFetch(`${API_URL}/api/v1/responses/my-responses`, { headers: { Authorization: `Bearer ${token}` } });
+        if (!responsesResponse.ok) { if (responsesResponse.status === 401) { clearTokens(); router.push("/auth/login"); return; } throw new Error("Error al cargar las respuestas"); }
         const data = await responsesResponse.json();
         setResponses(data);
         const completedResponses = data.filter((r: SurveyResponse) => r.completed);
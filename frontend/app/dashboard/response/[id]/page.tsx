@@ -4,6 +4,7 @@ import { useState, useEffect } from "react";
 import { useRouter, useParams } from "next/navigation";
 import Link from "next/link";
 import { API_URL } from "@/lib/config";
+import { authFetch, clearTokens } from "@/lib/auth";
 
 interface Answer {
   id: string;
@@ -48,7 +49,7 @@ export default function ResponseDetailPage() {
 
     const fetchResponseDetail = async () => {
       try {
-        const res = await fetch(
+        const res = await authFetch(
           `${process.env.NEXT_PUBLIC_API_URL}/api/v1/responses/my-responses/${responseId}`,
           {
             headers: {
@@ -59,7 +60,7 @@ export default function ResponseDetailPage() {
 
         if (!res.ok) {
           if (res.status === 401) {
-            localStorage.removeItem("access_token");
+            clearTokens();
             router.push("/auth/login");
             return;
           }
@@ -4,6 +4,7 @@ import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { surveysApi } from "@/lib/api";
 import type { Survey } from "@/types";
+import { logout } from "@/lib/auth";
 
 export default function Home() {
   const router = useRouter();
@@ -26,8 +27,8 @@ export default function Home() {
     router.push("/dashboard");
   }, [router]);
 
-  const handleLogout = () => {
-    localStorage.removeItem("access_token");
+  const handleLogout = async () => {
+    await logout();
     setIsLoggedIn(false);
     router.push("/auth/login");
   };
@@ -7,6 +7,7 @@ import { useSurveyStore } from "@/lib/store";
 import { QuestionRenderer } from "@/components/QuestionRenderer";
 import type { Survey, Answer, User } from "@/types";
 import { API_URL } from "@/lib/config";
+import { authFetch } from "@/lib/auth";
 
 export default function QuestionsPage() {
   const router = useRouter();
@@ -39,7 +40,7 @@ export default function QuestionsPage() {
         setUser(userResponse.data);
 
         // Load specific survey by ID
-        const surveyResponse = await fetch(
+        const surveyResponse = await authFetch(
           `${API_URL}/api/v1/surveys/${surveyId}`,
           {
             headers: {
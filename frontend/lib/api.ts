@@ -1,4 +1,4 @@
-import axios from "axios";
+import axios, { type AxiosError, type InternalAxiosRequestConfig } from "axios";
 import type {
   Survey,
   SurveyResponseCreate,
@@ -8,6 +8,7 @@ import type {
   UserPoints,
 } from "@/types";
 import { API_V1 } from "./config";
+import { getAccessToken, refreshAccessToken } from "./auth";
 
 const api = axios.create({
   baseURL: API_V1,
@@ -19,7 +20,7 @@ const api = axios.create({
 // Add token to requests if available
 api.interceptors.request.use((config) => {
   if (typeof window !== "undefined") {
-    const token = localStorage.getItem("access_token");
+    const token = getAccessToken();
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
@@ -27,6 +28,21 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// On 401, rotate the refresh token and retry the request once
+api.interceptors.response.use(undefined, async (error: AxiosError) => {
+  const config = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+  if (error.response?.status !== 401 || !config || config._retried) {
+    return Promise.reject(error);
+  }
+  const token = await refreshAccessToken();
+  if (!token) {
+    return Promise.reject(error);
+  }
+  config._retried = true;
+  config.headers.Authorization = `Bearer ${token}`;
+  return api.request(config);
+});
+
 // Auth
 export const authApi = {
   me: () => api.get<User>("/auth/me"),
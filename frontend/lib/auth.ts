@@ -0,0 +1,108 @@
+// Token storage and authenticated requests.
+// The access token is short-lived: on a 401 the refresh token is rotated
+// once through /auth/refresh and the request is retried with the new token.
+
+import { API_V1 } from "./config";
+
+const ACCESS_TOKEN_KEY = "access_token";
+const REFRESH_TOKEN_KEY = "refresh_token";
+
+export interface AuthTokens {
+  access_token: string;
+  refresh_token?: string | null;
+}
+
+export const getAccessToken = () => localStorage.getItem(ACCESS_TOKEN_KEY);
+
+export const storeTokens = (tokens: AuthTokens) => {
+  localStorage.setItem(ACCESS_TOKEN_KEY, tokens.access_token);
+  if (tokens.refresh_token) {
+    localStorage.setItem(REFRESH_TOKEN_KEY, tokens.refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem(ACCESS_TOKEN_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
+};
+
+// Rotates the stored refresh token, unless another tab already rotated the
+// one this tab started with: then its new tokens are used as they are
+const rotate = async (startedWith: string | null): Promise<string | null> => {
+  const refreshToken = localStorage.getItem(REFRESH_TOKEN_KEY);
+  if (!refreshToken) return null;
+  if (startedWith && refreshToken !== startedWith) return getAccessToken();
+  try {
+    const response = await fetch(`${API_V1}/auth/refresh`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+    if (!response.ok) {
+      // Keep tokens another tab stored while this request was in flight
+      if (localStorage.getItem(REFRESH_TOKEN_KEY) !== refreshToken) return getAccessToken();
+      clearTokens();
+      return null;
+    }
+    const tokens: AuthTokens = await response.json();
+    storeTokens(tokens);
+    return tokens.access_token;
+  } catch {
+    return null;
+  }
+};
+
+// Shared so that concurrent 401s in this tab rotate the refresh token only
+// once; the Web Lock does the same across tabs, which share localStorage
+let pendingRefresh: Promise<string | null> | null = null;
+
+export const refreshAccessToken = (): Promise<string | null> => {
+  if (!pendingRefresh) {
+    pendingRefresh = (async () => {
+      const startedWith = localStorage.getItem(REFRESH_TOKEN_KEY);
+      try {
+        if (typeof navigator !== "undefined" && navigator.locks) {
+          return await navigator.locks.request("auth-refresh", () => rotate(startedWith));
+        }
+        return await rotate(startedWith);
+      } finally {
+        pendingRefresh = null;
+      }
+    })();
+  }
+  return pendingRefresh;
+};
+
+const withToken = (init: RequestInit, token: string | null): RequestInit => {
+  const headers = new Headers(init.headers);
+  if (token) {
+    headers.set("Authorization", `Bearer ${token}`);
+  }
+  return { ...init, headers };
+};
+
+// fetch with the stored access token; refreshes and retries once on 401
+export const authFetch = async (input: RequestInfo | URL, init: RequestInit = {}) => {
+  const response = await fetch(input, withToken(init, getAccessToken()));
+  if (response.status !== 401) return response;
+
+  const token = await refreshAccessToken();
+  if (!token) return response;
+  return fetch(input, withToken(init, token));
+};
+
+// Revokes the refresh token on the server and forgets both tokens
+export const logout = async () => {
+  const refreshToken = localStorage.getItem(REFRESH_TOKEN_KEY);
+  clearTokens();
+  if (!refreshToken) return;
+  try {
+    await fetch(`${API_V1}/auth/logout`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+  } catch {
+    // The tokens are already gone locally; the refresh token expires on its own
+  }
+};
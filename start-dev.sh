@@ -111,6 +111,10 @@ if check_port 8000; then
     sleep 2
 fi
 
+# Aplicar migraciones pendientes
+echo "   🗄️  Aplicando migraciones (alembic upgrade head)"
+alembic upgrade head
+
 # Iniciar backend en background
 echo "   🚀 Iniciando servidor FastAPI en http://localhost:8000"
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 > /tmp/pad-backend.log 2>&1 &